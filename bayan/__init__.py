@@ -12,7 +12,8 @@ import sys as _sys
 
 _submods = [
     'lexer', 'parser', 'logical_engine', 'hybrid_interpreter', 'traditional_interpreter',
-    'ast_nodes', 'object_system', 'import_system', 'builtins', 'entity_engine'
+    'ast_nodes', 'object_system', 'import_system', 'builtins', 'entity_engine', 'kb_store',
+    'parallel', 'compiler'
 ]
 for _name in _submods:
     try:
@@ -33,11 +33,19 @@ class Block(ASTNode):
     def __repr__(self):
         return f"Block({len(self.statements)} statements)"
 
+def dotted_name(name):
+    """The (object, attribute) names of an ``obj.attr`` reference, or None for a plain name"""
+    if '.' not in name:
+        return None
+    parts = name.split('.')
+    return parts[0], parts[1]
+
 class Assignment(ASTNode):
     """Variable assignment: x = 5"""
     def __init__(self, name, value):
         self.name = name
         self.value = value
+        self.attribute = dotted_name(name)
 
     def __repr__(self):
         return f"Assignment({self.name}, {self.value})"
@@ -89,6 +97,7 @@ class Variable(ASTNode):
     """Variable reference"""
     def __init__(self, name):
         self.name = name
+        self.attribute = dotted_name(name)
 
     def __repr__(self):
         return f"Variable({self.name})"
@@ -162,6 +171,7 @@ class AsyncFunctionDef(ASTNode):
         self.name = name
         self.params = params
         self.body = body
+        self.signature = CallSignature(params, f"function {name}")
 
     def __repr__(self):
         return f"AsyncFunctionDef({self.name}, {len(self.params)} params)"
@@ -251,6 +261,81 @@ class Parameter(ASTNode):
             return f"Parameter({prefix}{self.name}={self.default_value})"
         return f"Parameter({prefix}{self.name})"
 
+class CallSignature:
+    """How the parameters of a function take the arguments of a call.
+
+    Worked out once, when the function is defined: the regular parameter
+    names in order, their defaults, and the *args and **kwargs names.
+    Literal defaults are kept as values; other defaults are evaluated on
+    each call that needs them.
+    Parameters can be Parameter objects or plain names (old format); plain
+    names have no default and are never reported missing. The signature of
+    a method leaves out its 'self' parameter.
+    """
+    def __init__(self, parameters, label, skip_self=False):
+        names = []
+        rest = []
+        self.varargs = None
+        self.kwargs = None
+        for param in parameters:
+            if isinstance(param, Parameter):
+                if param.is_kwargs:
+                    self.kwargs = param.name
+                    continue
+                if param.is_varargs:
+                    self.varargs = param.name
+                    continue
+                name, default, required = param.name, param.default_value, True
+            else:
+                name, default, required = param, None, False
+            if skip_self and name == 'self':
+                continue
+            names.append(name)
+            constant = isinstance(default, (Number, String, Boolean))
+            rest.append((name, default.value if constant else default, constant, required))
+        self.names = tuple(names)
+        self.name_set = frozenset(names)
+        # (name, default value or expression, constant, required) of each regular parameter
+        self.rest = tuple(rest)
+        self.label = label
+
+    def bind(self, interpreter, env, args, named_args=None):
+        """Bind the arguments of a call into env, evaluating defaults with the interpreter.
+
+        Extra positional arguments go to *args (a list) and unknown named
+        arguments to **kwargs (a dict); without them, and for a missing
+        required parameter, RuntimeError is raised.
+        """
+        names = self.names
+        given = len(args)
+        env.update(zip(names, args))
+        if self.varargs is not None:
+            env[self.varargs] = list(args[len(names):])
+        elif given > len(names):
+            raise RuntimeError(f"Too many positional arguments for {self.label}")
+        if self.kwargs is not None:
+            extra = env[self.kwargs] = {}
+        if named_args:
+            name_set = self.name_set
+            for name, value in named_args.items():
+                if name in name_set:
+                    env[name] = value
+                elif self.kwargs is not None:
+                    extra[name] = value
+                else:
+                    raise RuntimeError(f"Unexpected keyword argument: {name}")
+        rest = self.rest
+        for index in range(given, len(rest)):
+            name, default, constant, required = rest[index]
+            if named_args and name in named_args:
+                continue
+            if constant:
+                env[name] = default
+            elif default is not None:
+                env[name] = interpreter.interpret(default)
+            elif required:
+                raise RuntimeError(f"Missing required parameter: {name}")
+
 class NamedArgument(ASTNode):
     """Named argument in function call: func(name=value)"""
     def __init__(self, name, value):
@@ -278,6 +363,11 @@ class FunctionDef(ASTNode):
         self.parameters = parameters
         self.body = body
         self.decorators = decorators if decorators is not None else []
+        self.signature = CallSignature(parameters, f"function {name}")
+        # The signature when called as a method, without 'self'
+        self.method_signature = CallSignature(parameters, f"method {name}", skip_self=True)
+        # Slot index of each local variable, or None when they stay in a dict
+        self.local_slots = local_slots(parameters, body)
 
     def __repr__(self):
         dec_str = f", {len(self.decorators)} decorators" if self.decorators else ""
@@ -504,6 +594,14 @@ class LogicalQuery(ASTNode):
     def __repr__(self):
         return f"LogicalQuery({self.goal})"
 
+class TableDeclaration(ASTNode):
+    """Tabling declaration: table ancestor/2, path."""
+    def __init__(self, predicates):
+        self.predicates = predicates  # List of predicate names
+
+    def __repr__(self):
+        return f"TableDeclaration({', '.join(self.predicates)})"
+
 class LogicalPredicate(ASTNode):
     """Logical predicate: parent(X, Y)"""
     def __init__(self, name, arguments):
@@ -605,3 +703,43 @@ class ApplyActionStmt(ASTNode):
     def __repr__(self):
         return f"ApplyActionStmt({self.actor_name}.{self.action_name}(...))"
 
+
+
+# ============ Local Variable Slots ============
+
+# Nodes a function body may hold and still keep its locals in slots. Apart
+# from Assignment and ForLoop, none of them binds a name in the local
+# environment, so nested functions, lambdas, comprehensions, generators,
+# with/except aliases and imports all leave the locals in a dict.
+_SLOT_NODES = frozenset([
+    Block, Assignment, ForLoop, WhileLoop, IfStatement, ReturnStatement, BreakStatement,
+    ContinueStatement, PrintStatement, RaiseStatement, Variable, Number, String, Boolean,
+    BinaryOp, UnaryOp, List, Tuple, Set, Dict, Slice, AttributeAccess, SubscriptAccess,
+    AttributeAssignment, SubscriptAssignment, FunctionCall, MethodCall,
+])
+
+def local_slots(parameters, body):
+    """The slot index of each local variable of a function, or None to keep its locals in a dict.
+
+    The locals are the parameters and the plain names the body assigns or
+    loops over, numbered in the order they are found.
+    """
+    slots = {}
+    for param in parameters:
+        slots.setdefault(param.name if isinstance(param, Parameter) else param, len(slots))
+    pending = [body]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (list, tuple)):
+            pending.extend(node)
+        elif isinstance(node, dict):
+            pending.extend(node.values())
+        elif isinstance(node, ASTNode):
+            if node.__class__ not in _SLOT_NODES:
+                return None
+            if isinstance(node, Assignment) and node.attribute is None:
+                slots.setdefault(node.name, len(slots))
+            elif isinstance(node, ForLoop):
+                slots.setdefault(node.variable, len(slots))
+            pending.extend(vars(node).values())
+    return slots
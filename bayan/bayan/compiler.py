@@ -0,0 +1,531 @@
+"""
+Closure compiler backend for the traditional interpreter
+مترجم شجرة بيان إلى دوال مغلقة للمفسر التقليدي
+
+With HybridInterpreter(backend="compiled") the statements and expressions
+of a program are turned, once per node, into Python closures that call
+each other directly instead of going back through interpret() for every
+child node. Literals, variables, operators, assignments, blocks, if,
+while, for, return, break, continue, lists, tuples, attribute reads,
+indexing and index assignment are compiled; every other node is run by the interpreter as
+before, and its children are compiled again when it interprets them.
+
+The closures use the interpreter's own environments, helpers and control
+flow exceptions (ReturnValue, BreakException, ContinueException), so a
+program behaves the same under both backends, including the dunder
+methods of BayanObject operands and the Bayan stack of runtime errors.
+
+The body of a function whose FunctionDef has local_slots is compiled once
+more, apart from the shared closures, with its locals kept in a list: a
+load is an index into it, and a store writes the list and local_env both,
+so the nodes the compiler leaves to the interpreter still see every local.
+"""
+
+import operator
+
+from .ast_nodes import (Number, String, Boolean, Variable, BinaryOp, UnaryOp, Assignment, Block,
+                        IfStatement, WhileLoop, ForLoop, ReturnStatement, BreakStatement,
+                        ContinueStatement, List, Tuple, AttributeAccess, SubscriptAccess,
+                        SubscriptAssignment, Slice)
+from .object_system import BayanObject
+
+# Binary operators whose result on plain Python operands is the operator's
+_PLAIN_OPERATORS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv,
+    '%': operator.mod, '==': operator.eq, '!=': operator.ne, '<': operator.lt,
+    '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+}
+
+# Value of a slot whose local has not been assigned yet
+_UNBOUND = object()
+
+
+class ClosureCompiler:
+    """Compiles AST nodes into closures that run against one interpreter.
+
+    closure(node) returns the compiled closure of a node, building it on
+    first use. Each closure takes no arguments and returns the node's
+    value. An error leaving a closure goes through the interpreter's
+    _error_at, as it does when it leaves interpret(), so both backends
+    report the same Bayan stack.
+
+    With slots, the compiler builds the closures of one function body, and
+    loads and stores of the locals named in slots go to interpreter.frame.
+    """
+
+    def __init__(self, interpreter, slots=None):
+        from .traditional_interpreter import (ReturnValue, BreakException, ContinueException,
+                                              _CONTROL_FLOW)
+        self.interpreter = interpreter
+        self.closures = {}
+        # Slot index of each local of the function body being compiled
+        self.slots = slots
+        self.bodies = {}
+        self._return = ReturnValue
+        self._break = BreakException
+        self._continue = ContinueException
+        self._control_flow = _CONTROL_FLOW
+
+    def closure(self, node):
+        """The closure of a node, compiled on first use"""
+        run = self.closures.get(id(node))
+        if run is None:
+            # The closure holds the node, so its id stays unique
+            run = self.closures[id(node)] = self._compile(node)
+        return run
+
+    def function_body(self, func_def):
+        """The closure running the body of a function with local_slots, compiled on first use.
+
+        It is called with the arguments of the call bound in local_env.
+        """
+        entry = self.bodies.get(id(func_def))
+        if entry is None:
+            # The entry holds the definition, so its id stays unique
+            entry = self.bodies[id(func_def)] = (func_def, self._compile_function_body(func_def))
+        return entry[1]
+
+    def _compile_function_body(self, func_def):
+        interpreter = self.interpreter
+        names = tuple(func_def.local_slots)
+        body = ClosureCompiler(interpreter, func_def.local_slots).closure(func_def.body)
+
+        def function_body():
+            env = interpreter.local_env
+            caller_frame = interpreter.frame
+            interpreter.frame = [env.get(name, _UNBOUND) for name in names]
+            try:
+                return body()
+            finally:
+                interpreter.frame = caller_frame
+        return function_body
+
+    def _slot(self, name):
+        """The slot index of a local of the function body being compiled, or None"""
+        return self.slots.get(name) if self.slots is not None else None
+
+    def _compile(self, node):
+        for node_class in type(node).__mro__:
+            compile_node = _COMPILERS.get(node_class)
+            if compile_node is not None:
+                return compile_node(self, node)
+        return self._interpreted(node)
+
+    def _interpreted(self, node):
+        interpret = self.interpreter.interpret
+
+        def interpreted():
+            return interpret(node)
+        return interpreted
+
+    def _visited(self, node, visit_name):
+        """A closure running the tree visitor of a node whose form is not compiled"""
+        visit = getattr(self.interpreter, visit_name)
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def visited():
+            try:
+                return visit(node)
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return visited
+
+    def _compile_literal(self, node):
+        value = node.value
+
+        def literal():
+            return value
+        return literal
+
+    def _compile_variable(self, node):
+        if node.attribute is not None:
+            return self._visited(node, 'visit_variable')
+        interpreter = self.interpreter
+        name = node.name
+
+        def variable():
+            env = interpreter.local_env
+            if env is None:
+                env = interpreter.global_env
+            if name in env:
+                return env[name]
+            if name in interpreter.global_env:
+                return interpreter.global_env[name]
+            raise interpreter._error_at(NameError(interpreter._undefined_name_message(name)), node)
+
+        index = self._slot(name)
+        if index is None:
+            return variable
+
+        def slot_variable():
+            value = interpreter.frame[index]
+            if value is _UNBOUND:
+                # Not assigned yet: look the name up as before
+                return variable()
+            return value
+        return slot_variable
+
+    def _compile_binary_op(self, node):
+        left = self.closure(node.left)
+        right = self.closure(node.right)
+        symbol = node.operator
+        apply_binary = self.interpreter._apply_binary
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+        plain = _PLAIN_OPERATORS.get(symbol)
+        if plain is None:
+            def binary_op():
+                try:
+                    return apply_binary(symbol, left(), right())
+                except control_flow:
+                    raise
+                except Exception as e:
+                    raise error_at(e, node)
+            return binary_op
+
+        def plain_binary_op():
+            try:
+                lhs = left()
+                rhs = right()
+                if isinstance(lhs, BayanObject) or isinstance(rhs, BayanObject):
+                    return apply_binary(symbol, lhs, rhs)
+                return plain(lhs, rhs)
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return plain_binary_op
+
+    def _compile_unary_op(self, node):
+        operand = self.closure(node.operand)
+        symbol = node.operator
+        apply_unary = self.interpreter._apply_unary
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def unary_op():
+            try:
+                return apply_unary(symbol, operand())
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return unary_op
+
+    def _compile_assignment(self, node):
+        if node.attribute is not None:
+            return self._visited(node, 'visit_assignment')
+        interpreter = self.interpreter
+        name = node.name
+        value = self.closure(node.value)
+        error_at = interpreter._error_at
+        control_flow = self._control_flow
+        index = self._slot(name)
+        if index is not None:
+            def slot_assignment():
+                try:
+                    result = value()
+                except control_flow:
+                    raise
+                except Exception as e:
+                    raise error_at(e, node)
+                interpreter.frame[index] = result
+                interpreter.local_env[name] = result
+                return result
+            return slot_assignment
+
+        def assignment():
+            try:
+                result = value()
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+            env = interpreter.local_env
+            if env is None:
+                env = interpreter.global_env
+            env[name] = result
+            return result
+        return assignment
+
+    def _compile_block(self, node):
+        statements = [self.closure(statement) for statement in node.statements]
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def block():
+            result = None
+            try:
+                for statement in statements:
+                    result = statement()
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+            return result
+        return block
+
+    def _compile_if_statement(self, node):
+        condition = self.closure(node.condition)
+        then_branch = self.closure(node.then_branch)
+        else_branch = self.closure(node.else_branch) if node.else_branch else None
+        truthy = self.interpreter._truthy
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def if_statement():
+            try:
+                if truthy(condition()):
+                    return then_branch()
+                elif else_branch is not None:
+                    return else_branch()
+                return None
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return if_statement
+
+    def _compile_while_loop(self, node):
+        condition = self.closure(node.condition)
+        body = self.closure(node.body)
+        truthy = self.interpreter._truthy
+        error_at = self.interpreter._error_at
+        break_exception, continue_exception = self._break, self._continue
+        control_flow = self._control_flow
+
+        def while_loop():
+            result = None
+            try:
+                while truthy(condition()):
+                    try:
+                        result = body()
+                    except break_exception:
+                        break
+                    except continue_exception:
+                        continue
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+            return result
+        return while_loop
+
+    def _compile_for_loop(self, node):
+        interpreter = self.interpreter
+        iterable = self.closure(node.iterable)
+        body = self.closure(node.body)
+        name = node.variable
+        error_at = interpreter._error_at
+        break_exception, continue_exception = self._break, self._continue
+        control_flow = self._control_flow
+        index = self._slot(name)
+        if index is not None:
+            def slot_for_loop():
+                result = None
+                try:
+                    values = interpreter._to_iterable(iterable())
+                    frame = interpreter.frame
+                    env = interpreter.local_env
+                    for item in values:
+                        frame[index] = item
+                        env[name] = item
+                        try:
+                            result = body()
+                        except break_exception:
+                            break
+                        except continue_exception:
+                            continue
+                except control_flow:
+                    raise
+                except Exception as e:
+                    raise error_at(e, node)
+                return result
+            return slot_for_loop
+
+        def for_loop():
+            result = None
+            try:
+                values = interpreter._to_iterable(iterable())
+                env = interpreter.local_env
+                if env is None:
+                    env = interpreter.global_env
+                for item in values:
+                    env[name] = item
+                    try:
+                        result = body()
+                    except break_exception:
+                        break
+                    except continue_exception:
+                        continue
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+            return result
+        return for_loop
+
+    def _compile_return_statement(self, node):
+        value = self.closure(node.value) if node.value else None
+        return_value = self._return
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def return_statement():
+            if value is None:
+                raise return_value(None)
+            try:
+                result = value()
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+            raise return_value(result)
+        return return_statement
+
+    def _compile_break_statement(self, node):
+        break_exception = self._break
+
+        def break_statement():
+            raise break_exception()
+        return break_statement
+
+    def _compile_continue_statement(self, node):
+        continue_exception = self._continue
+
+        def continue_statement():
+            raise continue_exception()
+        return continue_statement
+
+    def _compile_list(self, node):
+        elements = [self.closure(element) for element in node.elements]
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def list_literal():
+            try:
+                return [element() for element in elements]
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return list_literal
+
+    def _compile_tuple(self, node):
+        elements = [self.closure(element) for element in node.elements]
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def tuple_literal():
+            try:
+                return tuple(element() for element in elements)
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return tuple_literal
+
+    def _compile_attribute_access(self, node):
+        target = self.closure(node.object_expr)
+        name = node.attribute_name
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def attribute_access():
+            try:
+                obj = target()
+                if isinstance(obj, BayanObject):
+                    return obj.get_attribute(name)
+                elif isinstance(obj, dict):
+                    return obj.get(name)
+                if hasattr(obj, name):
+                    return getattr(obj, name)
+                raise AttributeError(f"Object has no attribute '{name}'")
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return attribute_access
+
+    def _compile_subscript_access(self, node):
+        if isinstance(node.index_expr, Slice):
+            return self._visited(node, 'visit_subscript_access')
+        target = self.closure(node.object_expr)
+        index = self.closure(node.index_expr)
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def subscript_access():
+            try:
+                obj = target()
+                key = index()
+                if isinstance(obj, BayanObject):
+                    if obj.has_method('__getitem__'):
+                        return obj.call_method('__getitem__', [key])
+                    raise TypeError("Object does not support __getitem__")
+                try:
+                    return obj[key]
+                except Exception as e:
+                    raise TypeError(f"Indexing not supported: {e}")
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return subscript_access
+
+    def _compile_subscript_assignment(self, node):
+        target = self.closure(node.object_expr)
+        index = self.closure(node.index_expr)
+        value = self.closure(node.value)
+        error_at = self.interpreter._error_at
+        control_flow = self._control_flow
+
+        def subscript_assignment():
+            try:
+                obj = target()
+                key = index()
+                result = value()
+                if isinstance(obj, BayanObject):
+                    if obj.has_method('__setitem__'):
+                        obj.call_method('__setitem__', [key, result])
+                        return result
+                    raise TypeError("Object does not support __setitem__")
+                try:
+                    obj[key] = result
+                    return result
+                except Exception as e:
+                    raise TypeError(f"Index assignment not supported: {e}")
+            except control_flow:
+                raise
+            except Exception as e:
+                raise error_at(e, node)
+        return subscript_assignment
+
+
+_COMPILERS = {
+    Number: ClosureCompiler._compile_literal,
+    String: ClosureCompiler._compile_literal,
+    Boolean: ClosureCompiler._compile_literal,
+    Variable: ClosureCompiler._compile_variable,
+    BinaryOp: ClosureCompiler._compile_binary_op,
+    UnaryOp: ClosureCompiler._compile_unary_op,
+    Assignment: ClosureCompiler._compile_assignment,
+    Block: ClosureCompiler._compile_block,
+    IfStatement: ClosureCompiler._compile_if_statement,
+    WhileLoop: ClosureCompiler._compile_while_loop,
+    ForLoop: ClosureCompiler._compile_for_loop,
+    ReturnStatement: ClosureCompiler._compile_return_statement,
+    BreakStatement: ClosureCompiler._compile_break_statement,
+    ContinueStatement: ClosureCompiler._compile_continue_statement,
+    List: ClosureCompiler._compile_list,
+    Tuple: ClosureCompiler._compile_tuple,
+    AttributeAccess: ClosureCompiler._compile_attribute_access,
+    SubscriptAccess: ClosureCompiler._compile_subscript_access,
+    SubscriptAssignment: ClosureCompiler._compile_subscript_assignment,
+}
+
+# Node classes whose interpret() calls run compiled closures
+COMPILED_NODES = tuple(_COMPILERS)
@@ -0,0 +1,466 @@
+"""
+Bottom-up Datalog evaluation for the logical engine
+تقييم داتالوغ تصاعدي للمحرك المنطقي
+
+The Datalog part of a knowledge base - rules whose bodies are plain predicate
+calls and comparisons over ground facts - can be materialized: every derivable
+fact is computed once by semi-naive iteration with hash joins, after which
+queries on derived predicates are lookups. The model is maintained
+incrementally: asserted facts are propagated semi-naively and retracted facts
+are handled by delete-and-rederive (DRed).
+"""
+
+from .logical_engine import Fact, Predicate, Rule, Substitution, Term, atom
+
+# Goals that are evaluated by the engine itself and never materialized
+_BUILTINS = {'findall', 'bagof', 'setof', 'aggregate_all', '^', 'not', '\\+'}
+
+
+class Relation:
+    """The ground tuples of one predicate, with hash indexes on column subsets.
+
+    Tuples and index buckets are kept in insertion order (dicts used as
+    ordered sets), so a materialized predicate answers in the order its
+    tuples were derived, the same on every run.
+    """
+
+    def __init__(self):
+        self.tuples = {}  # {tuple: None}, in insertion order
+        self.base = {}  # {tuple: number of knowledge-base facts stating it}
+        self.indexes = {}  # {column positions: {key: {tuple: None}}}
+
+    def __len__(self):
+        return len(self.tuples)
+
+    def add(self, row):
+        """Add a tuple; returns False if it was already present"""
+        if row in self.tuples:
+            return False
+        self.tuples[row] = None
+        for columns, buckets in self.indexes.items():
+            key = tuple(row[c] for c in columns)
+            buckets.setdefault(key, {})[row] = None
+        return True
+
+    def discard(self, row):
+        if row not in self.tuples:
+            return
+        del self.tuples[row]
+        for columns, buckets in self.indexes.items():
+            key = tuple(row[c] for c in columns)
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.pop(row, None)
+                if not bucket:
+                    del buckets[key]
+
+    def lookup(self, columns, key):
+        """Tuples whose values at ``columns`` equal ``key``"""
+        if not columns:
+            return self.tuples
+        buckets = self.indexes.get(columns)
+        if buckets is None:
+            buckets = {}
+            for row in self.tuples:
+                buckets.setdefault(tuple(row[c] for c in columns), {})[row] = None
+            self.indexes[columns] = buckets
+        return buckets.get(key, ())
+
+
+class _Atom:
+    """A body atom: predicate key plus arguments as ('var', name) / ('const', value)"""
+    __slots__ = ('key', 'args')
+
+    def __init__(self, key, args):
+        self.key = key
+        self.args = args
+
+
+class _Comparison:
+    """A comparison goal, checked as soon as its variables are bound"""
+    __slots__ = ('goal', 'variables')
+
+    def __init__(self, goal, variables):
+        self.goal = goal
+        self.variables = variables
+
+
+class DatalogRule:
+    """A rule compiled for bottom-up evaluation"""
+
+    def __init__(self, head_key, head_args, atoms, comparisons):
+        self.head_key = head_key
+        self.head_args = head_args
+        self.atoms = atoms
+        self.comparisons = comparisons
+
+
+def _ground_value(term):
+    """The hashable value of a constant Term, or raise ValueError"""
+    if not isinstance(term, Term) or term.is_variable:
+        raise ValueError(term)
+    hash(term.value)
+    return term.value
+
+
+def _fact_row(fact):
+    """The tuple a ground fact stands for, or None if it is not ground"""
+    try:
+        return tuple(_ground_value(arg) for arg in fact.predicate.args)
+    except (ValueError, TypeError):
+        return None
+
+
+def _compile_args(args):
+    compiled = []
+    for arg in args:
+        if not isinstance(arg, Term):
+            raise ValueError(arg)
+        if arg.is_variable:
+            compiled.append(('var', arg.value))
+        else:
+            compiled.append(('const', _ground_value(arg)))
+    return compiled
+
+
+def compile_rule(rule):
+    """Compile a rule for bottom-up evaluation, or return None if it is not Datalog"""
+    atoms = []
+    comparisons = []
+    try:
+        head_args = _compile_args(rule.head.args)
+        for goal in rule.body:
+            if not isinstance(goal, Predicate) or goal.name in _BUILTINS:
+                return None
+            args = _compile_args(goal.args)
+            if goal.name.startswith('_compare_'):
+                variables = {value for kind, value in args if kind == 'var'}
+                comparisons.append(_Comparison(goal, variables))
+            else:
+                atoms.append(_Atom((goal.name, len(args)), args))
+    except (ValueError, TypeError):
+        return None
+
+    # Range restriction: every head and comparison variable is bound by an atom
+    bound = {value for body_atom in atoms for kind, value in body_atom.args if kind == 'var'}
+    needed = {value for kind, value in head_args if kind == 'var'}
+    for comparison in comparisons:
+        needed |= comparison.variables
+    if not needed <= bound:
+        return None
+    return DatalogRule((rule.head.name, len(head_args)), head_args, atoms, comparisons)
+
+
+class Materialization:
+    """The materialized model of the Datalog part of a knowledge base"""
+
+    def __init__(self, engine, predicates=None):
+        self.engine = engine
+        self.predicates = predicates  # Names to materialize, with what they read; None for all
+        self.relations = {}  # {(name, arity): Relation}
+        self.rules = []  # [DatalogRule]
+        self.derived = set()  # Names of predicates answered from the model
+        self.inputs = set()  # Names of predicates the model reads
+        self._rules_by_atom = {}  # {(name, arity): [(rule, atom position)]}
+        self._rules_by_head = {}  # {(name, arity): [rule]}
+        self._analyze()
+
+    # ---- construction ----
+
+    def _analyze(self):
+        """Find the predicates whose rules and facts form a Datalog program"""
+        kb = self.engine.knowledge_base
+        compiled = {}
+        excluded = set()
+        for name, clauses in kb.items():
+            for clause in clauses:
+                if isinstance(clause, Rule):
+                    datalog_rule = compile_rule(clause)
+                    if datalog_rule is None:
+                        excluded.add(name)
+                    else:
+                        compiled.setdefault(name, []).append(datalog_rule)
+                elif _fact_row(clause) is None:
+                    excluded.add(name)
+
+        # A rule that reads an excluded predicate cannot be materialized either
+        changed = True
+        while changed:
+            changed = False
+            for name, rules in compiled.items():
+                if name in excluded:
+                    continue
+                if any(body_atom.key[0] in excluded for rule in rules for body_atom in rule.atoms):
+                    excluded.add(name)
+                    changed = True
+
+        wanted = None
+        if self.predicates is not None:
+            # Only the named predicates and the derived predicates they read
+            wanted = set()
+            pending = [name for name in self.predicates if name in compiled]
+            while pending:
+                name = pending.pop()
+                if name in wanted:
+                    continue
+                wanted.add(name)
+                pending.extend(body_atom.key[0] for rule in compiled[name] for body_atom in rule.atoms
+                               if body_atom.key[0] in compiled)
+
+        for name, rules in compiled.items():
+            if name in excluded or (wanted is not None and name not in wanted):
+                continue
+            self.derived.add(name)
+            for rule in rules:
+                self._add_rule(rule)
+
+        for name in self.inputs:
+            for clause in kb.get(name, ()):
+                if isinstance(clause, Fact):
+                    row = _fact_row(clause)
+                    relation = self._relation((name, len(row)))
+                    relation.base[row] = relation.base.get(row, 0) + 1
+
+    def _add_rule(self, rule):
+        self.rules.append(rule)
+        self._rules_by_head.setdefault(rule.head_key, []).append(rule)
+        self._relation(rule.head_key)
+        self.inputs.add(rule.head_key[0])
+        for position, body_atom in enumerate(rule.atoms):
+            self._rules_by_atom.setdefault(body_atom.key, []).append((rule, position))
+            self._relation(body_atom.key)
+            self.inputs.add(body_atom.key[0])
+
+    def _relation(self, key):
+        relation = self.relations.get(key)
+        if relation is None:
+            relation = Relation()
+            self.relations[key] = relation
+        return relation
+
+    def compute(self):
+        """Compute the fixpoint from the base facts"""
+        delta = {}
+        for key, relation in self.relations.items():
+            for row in relation.base:
+                relation.add(row)
+            if relation.tuples:
+                delta[key] = dict(relation.tuples)
+        # Rules without atoms have a ground head and fire exactly once
+        for rule in self.rules:
+            if not rule.atoms:
+                for row in self._evaluate(rule, None, ()):
+                    if self.relations[rule.head_key].add(row):
+                        delta.setdefault(rule.head_key, {})[row] = None
+        self._propagate(delta)
+
+    # ---- evaluation ----
+
+    def _propagate(self, delta):
+        """Semi-naive iteration: only join against the tuples new in the last round"""
+        while delta:
+            new = {}
+            for key, rows in delta.items():
+                delta_relation = Relation()
+                for row in rows:
+                    delta_relation.add(row)
+                for rule, position in self._rules_by_atom.get(key, ()):
+                    head = self.relations[rule.head_key]
+                    for row in self._evaluate(rule, position, delta_relation):
+                        if row not in head.tuples:
+                            new.setdefault(rule.head_key, {})[row] = None
+            for key, rows in new.items():
+                relation = self.relations[key]
+                for row in rows:
+                    relation.add(row)
+            delta = new
+
+    def _evaluate(self, rule, position, source, bindings=None):
+        """Yield the head tuples of a rule, with atom ``position`` read from ``source``.
+
+        The remaining atoms are read from the full relations. Joins probe the
+        hash index on whichever columns are bound when an atom is reached.
+        """
+        atoms = rule.atoms
+        if position is None:
+            order = list(range(len(atoms)))
+        else:
+            order = [position] + [i for i in range(len(atoms)) if i != position]
+        sources = [source if i == position else self.relations[atoms[i].key]
+                   for i in order]
+        atoms = [atoms[i] for i in order]
+        bindings = dict(bindings or {})
+        # Schedule each comparison right after the atom that binds its last variable
+        bound = set(bindings)
+        pending = rule.comparisons
+        ready = [c for c in pending if c.variables <= bound]
+        if not all(self._compare(c, bindings) for c in ready):
+            return
+        pending = [c for c in pending if not c.variables <= bound]
+        checked_after = []
+        for body_atom in atoms:
+            bound.update(value for kind, value in body_atom.args if kind == 'var')
+            checked_after.append([c for c in pending if c.variables <= bound])
+            pending = [c for c in pending if not c.variables <= bound]
+
+        head_args = rule.head_args
+        yield from self._join(atoms, sources, checked_after, 0, bindings, head_args)
+
+    def _join(self, atoms, sources, checked_after, i, bindings, head_args):
+        if i == len(atoms):
+            yield tuple(bindings[value] if kind == 'var' else value
+                        for kind, value in head_args)
+            return
+
+        body_atom = atoms[i]
+        columns = []
+        key = []
+        free = []  # (position, variable) pairs bound by this atom
+        for position, (kind, value) in enumerate(body_atom.args):
+            if kind == 'const':
+                columns.append(position)
+                key.append(value)
+            elif value in bindings:
+                columns.append(position)
+                key.append(bindings[value])
+            else:
+                free.append((position, value))
+
+        arity = len(body_atom.args)
+        for row in sources[i].lookup(tuple(columns), tuple(key)):
+            if len(row) != arity:
+                continue
+            added = []
+            consistent = True
+            for position, variable in free:
+                if variable in bindings:  # Repeated variable within the atom
+                    if bindings[variable] != row[position]:
+                        consistent = False
+                        break
+                else:
+                    bindings[variable] = row[position]
+                    added.append(variable)
+            if consistent and all(self._compare(c, bindings) for c in checked_after[i]):
+                yield from self._join(atoms, sources, checked_after, i + 1, bindings, head_args)
+            for variable in added:
+                del bindings[variable]
+
+    def _compare(self, comparison, bindings):
+        goal = comparison.goal
+        args = [atom(bindings[arg.value]) if arg.is_variable else arg for arg in goal.args]
+        return self.engine._evaluate_comparison(Predicate(goal.name, args), Substitution()) is not None
+
+    def _derivable(self, key, row):
+        """Whether a tuple still follows from the current relations by some rule"""
+        for rule in self._rules_by_head.get(key, ()):
+            bindings = {}
+            consistent = True
+            for (kind, value), item in zip(rule.head_args, row):
+                if kind == 'const':
+                    consistent = value == item
+                elif value in bindings:
+                    consistent = bindings[value] == item
+                else:
+                    bindings[value] = item
+                if not consistent:
+                    break
+            if consistent and next(self._evaluate(rule, None, (), bindings), None) is not None:
+                return True
+        return False
+
+    # ---- maintenance ----
+
+    def fact_added(self, fact):
+        """Propagate an asserted fact; returns False if the model must be rebuilt"""
+        row = _fact_row(fact)
+        if row is None:
+            return False
+        key = (fact.predicate.name, len(row))
+        relation = self._relation(key)
+        relation.base[row] = relation.base.get(row, 0) + 1
+        if relation.add(row):
+            self._propagate({key: {row: None}})
+        return True
+
+    def fact_removed(self, fact):
+        """Retract a fact by delete-and-rederive; returns False if the model must be rebuilt"""
+        row = _fact_row(fact)
+        if row is None:
+            return False
+        key = (fact.predicate.name, len(row))
+        relation = self._relation(key)
+        count = relation.base.get(row, 0)
+        if count > 1:
+            relation.base[row] = count - 1
+            return True
+        relation.base.pop(row, None)
+        if row not in relation.tuples:
+            return True
+
+        # 1. Over-delete everything with a derivation through a deleted tuple
+        deleted = {key: {row: None}}
+        frontier = {key: {row: None}}
+        while frontier:
+            new = {}
+            for atom_key, rows in frontier.items():
+                delta_relation = Relation()
+                for item in rows:
+                    delta_relation.add(item)
+                for rule, position in self._rules_by_atom.get(atom_key, ()):
+                    head = self.relations[rule.head_key]
+                    gone = deleted.setdefault(rule.head_key, {})
+                    for item in self._evaluate(rule, position, delta_relation):
+                        if item in head.tuples and item not in head.base and item not in gone:
+                            gone[item] = None
+                            new.setdefault(rule.head_key, {})[item] = None
+            frontier = new
+        for deleted_key, rows in deleted.items():
+            relation = self.relations[deleted_key]
+            for item in rows:
+                relation.discard(item)
+
+        # 2. Rederive what still has an alternative derivation, then propagate it
+        rederived = {}
+        for deleted_key, rows in deleted.items():
+            for item in rows:
+                if self._derivable(deleted_key, item):
+                    rederived.setdefault(deleted_key, {})[item] = None
+        for rederived_key, rows in rederived.items():
+            relation = self.relations[rederived_key]
+            for item in rows:
+                relation.add(item)
+        self._propagate(rederived)
+        return True
+
+    # ---- queries ----
+
+    def solve(self, goal, substitution):
+        """Yield the live substitution once per model tuple unifying with ``goal``"""
+        relation = self.relations.get((goal.name, len(goal.args)))
+        if relation is None:
+            return
+        columns = []
+        key = []
+        open_positions = []
+        for position, arg in enumerate(goal.args):
+            if isinstance(arg, Term) and not arg.is_variable:
+                try:
+                    hash(arg.value)
+                except TypeError:
+                    return
+                columns.append(position)
+                key.append(arg.value)
+            else:
+                open_positions.append(position)
+
+        unify = self.engine._unify
+        args = goal.args
+        mark = substitution.mark()
+        # Copy the bucket: the caller may assert facts between solutions
+        for row in list(relation.lookup(tuple(columns), tuple(key))):
+            for position in open_positions:
+                if unify(args[position], atom(row[position]), substitution) is None:
+                    break
+            else:
+                yield substitution
+            substitution.undo(mark)
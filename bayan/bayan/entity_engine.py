@@ -31,7 +31,7 @@ import ast as _ast
 import math as _math
 import random as _random
 
-from .logical_engine import Term, Predicate, Fact
+from .logical_engine import Term, Predicate, Fact, atom
 
 
 # ----------------------------- Utilities ---------------------------------
@@ -259,7 +259,7 @@ class EntityEngine:
 
     # --------- Logical KB helpers ---------
     def _assert_fact(self, name: str, *args: Any) -> None:
-        terms = [Term(a, is_variable=False) for a in args]
+        terms = [atom(a) for a in args]
         self.logical.add_fact(Fact(Predicate(name, terms)))
 
     def _retractall(self, name: str, *args: Any) -> None:
@@ -270,7 +270,7 @@ class EntityEngine:
                 # variable to match anything
                 subterms.append(Term('X', is_variable=True))
             else:
-                subterms.append(Term(a, is_variable=False))
+                subterms.append(atom(a))
         self.logical.retractall(Predicate(name, subterms))
 
     def _sync_entity_facts(self, ent: _Entity) -> None:
@@ -308,9 +308,12 @@ class EntityEngine:
         if key not in ent.state_types:
             ent.state_types[key] = self._default_typeinfo('fuzzy')
         val = self._apply_bounds(ent, True, key, value)
+        changed = ent.states.get(key) != val
         ent.states[key] = val
-        self._retractall('state', name, key, None)
-        self._assert_fact('state', name, key, ent.states[key])
+        if changed:
+            # An unchanged value leaves state/3, and everything derived from it, alone
+            self._retractall('state', name, key, None)
+            self._assert_fact('state', name, key, ent.states[key])
         # Enforce equations/constraints if defined
         if not self._in_enforce:
             self._enforce_constraints_for(ent)
@@ -4,19 +4,44 @@ Hybrid Interpreter for Bayan Language
 """
 
 from .ast_nodes import *
-from .traditional_interpreter import TraditionalInterpreter
+from .traditional_interpreter import TraditionalInterpreter, NodeDispatch
 from .logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
 from .entity_engine import EntityEngine
 
+# Node classes handled by HybridInterpreter itself; the rest are delegated
+# to the traditional interpreter
+_NODE_HANDLERS = (
+    (Program, 'visit_program'),
+    (HybridBlock, 'visit_hybrid_block'),
+    (LogicalFact, 'visit_logical_fact'),
+    (LogicalRule, 'visit_logical_rule'),
+    (LogicalQuery, 'visit_logical_query'),
+    (LogicalIfStatement, 'visit_logical_if_statement'),
+    (TableDeclaration, 'visit_table_declaration'),
+    (QueryExpression, 'visit_query_expression'),
+    (PhraseStatement, 'visit_phrase_statement'),
+    (EntityDef, 'visit_entity_def'),
+    (ApplyActionStmt, 'visit_apply_action_stmt'),
+    (ImportStatement, 'visit_import_statement'),
+    (FromImportStatement, 'visit_from_import_statement'),
+)
+
 class HybridInterpreter:
     """Hybrid interpreter combining traditional and logical programming"""
 
-    def __init__(self):
-        self.traditional = TraditionalInterpreter()
+    # How traditional code runs: 'tree' walks the AST, 'compiled' runs it
+    # as closures built once per node (see compiler.py)
+    backend = 'tree'
+
+    def __init__(self, backend=None):
+        if backend is not None:
+            self.backend = backend
+        self.traditional = TraditionalInterpreter(backend=self.backend)
         self.logical = LogicalEngine()
         self.shared_env = {}
         # Share the logical engine with the traditional interpreter
         self.traditional.logical_engine = self.logical
+        self._dispatch = NodeDispatch(self, _NODE_HANDLERS, self.traditional.interpret)
         # Expose useful runtime objects/types in Bayan global env
         env = self.traditional.global_env
         env['EntityEngine'] = EntityEngine
@@ -475,33 +500,11 @@ class HybridInterpreter:
 
     def interpret(self, node):
         """Interpret an AST node"""
-        if isinstance(node, Program):
-            return self.visit_program(node)
-        elif isinstance(node, HybridBlock):
-            return self.visit_hybrid_block(node)
-        elif isinstance(node, LogicalFact):
-            return self.visit_logical_fact(node)
-        elif isinstance(node, LogicalRule):
-            return self.visit_logical_rule(node)
-        elif isinstance(node, LogicalQuery):
-            return self.visit_logical_query(node)
-        elif isinstance(node, LogicalIfStatement):
-            return self.visit_logical_if_statement(node)
-        elif isinstance(node, QueryExpression):
-            return self.visit_query_expression(node)
-        elif isinstance(node, PhraseStatement):
-            return self.visit_phrase_statement(node)
-        elif isinstance(node, EntityDef):
-            return self.visit_entity_def(node)
-        elif isinstance(node, ApplyActionStmt):
-            return self.visit_apply_action_stmt(node)
-        elif isinstance(node, ImportStatement):
-            return self.visit_import_statement(node)
-        elif isinstance(node, FromImportStatement):
-            return self.visit_from_import_statement(node)
-        else:
-            # Delegate to traditional interpreter
-            return self.traditional.interpret(node)
+        dispatch = self._dispatch
+        handler = dispatch.handlers.get(node.__class__)
+        if handler is None:
+            handler = dispatch.resolve(node.__class__)
+        return handler(node)
 
     def visit_phrase_statement(self, node):
         """Evaluate grammar-sugar nominal phrase by delegating to phrase/عبارة env function."""
@@ -529,29 +532,8 @@ class HybridInterpreter:
                     old_local = self._mod.local_env
                     self._mod.local_env = {}
                     try:
-                        # Bind params with support for Parameter objects
-                        from .ast_nodes import Parameter
-
-                        param_names = []
-                        for param in func_def.parameters:
-                            if isinstance(param, Parameter):
-                                param_names.append(param.name)
-                            else:
-                                # Legacy format: parameter is just a string
-                                param_names.append(param)
-
-                        # Bind positional arguments
-                        for i, arg in enumerate(args):
-                            if i < len(param_names):
-                                self._mod.local_env[param_names[i]] = arg
-
-                        # Bind default values for missing parameters
-                        for param in func_def.parameters:
-                            if isinstance(param, Parameter):
-                                if param.name not in self._mod.local_env and param.has_default():
-                                    self._mod.local_env[param.name] = self._mod.interpret(param.default_value)
-
-                        res = self._mod.interpret(func_def.body)
+                        func_def.signature.bind(self._mod, self._mod.local_env, args)
+                        res = self._mod._run_function_body(func_def)
                         return res
                     except Exception as e:
                         if e.__class__.__name__ == 'ReturnValue':
@@ -593,7 +575,7 @@ class HybridInterpreter:
         tokens = lexer.tokenize()
         parser = HybridParser(tokens)
         ast = parser.parse()
-        mod_interp = HybridInterpreter()
+        mod_interp = HybridInterpreter(backend=self.backend)
         mod_interp.interpret(ast)
         proxy = self._BayanModuleProxy(mod_interp)
         self._bayan_module_cache[module_name] = (mod_interp, proxy)
@@ -636,8 +618,14 @@ class HybridInterpreter:
     def visit_program(self, node):
         """Visit a program node"""
         result = None
+        # Each statement is the outermost frame of a Bayan stack
+        stack = self.traditional._call_stack
         for statement in node.statements:
-            result = self.interpret(statement)
+            stack.append(statement)
+            try:
+                result = self.interpret(statement)
+            finally:
+                stack.pop()
         return result
 
     def visit_hybrid_block(self, node):
@@ -665,13 +653,17 @@ class HybridInterpreter:
         self.logical.add_rule(rule)
         return None
 
+    def visit_table_declaration(self, node):
+        """Visit a tabling declaration"""
+        for pred_name in node.predicates:
+            self.logical.table(pred_name)
+        return None
+
     def visit_logical_query(self, node):
         """Visit a logical query"""
-        solutions = self.logical.query(node.goal)
-
-        # Convert solutions to dictionaries
+        # Convert solutions to dictionaries as they are produced
         results = []
-        for substitution in solutions:
+        for substitution in self.logical.solve(node.goal):
             result_dict = {}
             for var_name, value in substitution.bindings.items():
                 # Dereference to get the final bound value (if any)
@@ -725,9 +717,8 @@ class HybridInterpreter:
         """Visit a logical if statement"""
         # Try to solve the condition as a logical query
         if isinstance(node.condition, LogicalQuery):
-            solutions = self.logical.query(node.condition.goal)
-
-            if solutions:
+            # Stop at the first solution; the rest are never needed
+            if self.logical.has_solution(node.condition.goal):
                 # If solutions found, execute then branch
                 return self.interpret(node.then_branch)
             elif node.else_branch:
@@ -746,11 +737,9 @@ class HybridInterpreter:
 
     def visit_query_expression(self, node):
         """Visit a query expression"""
-        solutions = self.logical.query(node.goal)
-
-        # Convert solutions to dictionaries
+        # Convert solutions to dictionaries as they are produced
         results = []
-        for substitution in solutions:
+        for substitution in self.logical.solve(node.goal):
             result_dict = {}
             for var_name, value in substitution.bindings.items():
                 result_dict[var_name] = value
@@ -0,0 +1,541 @@
+"""
+Persistent knowledge bases with memory-mapped fact segments
+قواعد معرفة دائمة بمقاطع حقائق مربوطة بالذاكرة
+
+A store is a directory written by LogicalEngine.save_kb and opened with
+LogicalEngine.load_kb:
+
+    manifest.json     predicates, their segments and the store's settings
+    atoms.bin         the atom dictionary: encoded constants, back to back
+    atoms.off         uint64 offsets of the atoms in atoms.bin
+    atoms.sorted      uint32 atom ids in order of their encoding, for lookups
+    seg-N.dat         a fact segment: one row of uint32 atom ids per fact
+    seg-N.idx         its argument indexes: per column, sorted ids then rows
+    tail-N.dat        facts appended by assertz since the store was written
+    deleted.bin       uint32 (segment, row) pairs of retracted facts
+    clauses.pickle    predicates that are not plain facts (rules, compounds)
+
+Opening a store reads the manifest and maps the files; facts and atoms are
+decoded only when a query reaches them. Bound arguments are looked up in the
+atom dictionary and then in the segment indexes by binary search. Appends and
+retractions are written through to the tail segments and the deleted list, so
+the store stays append-only until it is saved again.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import pickle
+import sys
+from array import array
+
+from .logical_engine import Fact, Predicate, Rule, Term, atom, _index_key, _OPEN
+
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+
+
+def _encode(value):
+    """Encode a constant for the atom dictionary, or return None if it has no encoding"""
+    cls = value.__class__
+    if cls is str:
+        return b's' + value.encode('utf-8')
+    if cls is int:
+        return b'i' + str(value).encode('ascii')
+    if cls is float:
+        return b'f' + repr(value).encode('ascii')
+    if cls is bool:
+        return b'b1' if value else b'b0'
+    return None
+
+
+def _decode(data):
+    tag, body = data[:1], data[1:]
+    if tag == b's':
+        return body.decode('utf-8')
+    if tag == b'i':
+        return int(body)
+    if tag == b'f':
+        return float(body)
+    return body == b'1'
+
+
+def _equivalents(value):
+    """Constants that unify with ``value``: 1 and 1.0 are the same number"""
+    if value.__class__ is int:
+        return (value, float(value))
+    if value.__class__ is float and value.is_integer():
+        return (value, int(value))
+    return (value,)
+
+
+def _storable(clause):
+    """The argument values of a fact the segments can hold, or None"""
+    if not isinstance(clause, Fact) or not clause.predicate.args:
+        return None
+    values = []
+    for arg in clause.predicate.args:
+        if arg.__class__ is not Term or arg.is_variable or _encode(arg.value) is None:
+            return None
+        values.append(arg.value)
+    return values
+
+
+def _map(path, typecode):
+    """Map a file read-only as an array of ``typecode`` items; returns (mmap, view)"""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None, array(typecode)
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return mapped, memoryview(mapped).cast(typecode)
+
+
+def _write_array(path, values):
+    with open(path, 'wb') as f:
+        values.tofile(f)
+
+
+class StoredFact(Fact):
+    """A fact decoded from a segment, remembering where it is stored"""
+    __slots__ = ('segment', 'row')
+
+
+class AtomTable:
+    """The store's atom dictionary, decoded lazily.
+
+    Atoms written by save_kb are found by binary search over ``atoms.sorted``;
+    atoms appended later are kept in a dictionary.
+    """
+
+    def __init__(self, store, sorted_count):
+        self.store = store
+        self._data = store._map('atoms.bin', 'B')[1]
+        self._offsets = store._map('atoms.off', 'Q')[1]
+        self._sorted = store._map('atoms.sorted', 'I')[1]
+        self._mapped = max(len(self._offsets) - 1, 0)
+        self._appended = []  # Values of atoms added since the files were mapped
+        self._recent = {}  # {encoding: id} of atoms missing from atoms.sorted
+        self._values = {}  # {id: value} cache
+        self._terms = {}  # {id: Term} cache
+        for atom_id in range(sorted_count, self._mapped):
+            self._recent[self._encoding(atom_id)] = atom_id
+        self._file = None
+
+    def __len__(self):
+        return self._mapped + len(self._appended)
+
+    def _encoding(self, atom_id):
+        return bytes(self._data[self._offsets[atom_id]:self._offsets[atom_id + 1]])
+
+    def value(self, atom_id):
+        value = self._values.get(atom_id, self)
+        if value is self:
+            if atom_id >= self._mapped:
+                value = self._appended[atom_id - self._mapped]
+            else:
+                value = _decode(self._encoding(atom_id))
+            self._values[atom_id] = value
+        return value
+
+    def term(self, atom_id):
+        """The constant Term of an atom, shared by every fact that holds it"""
+        term = self._terms.get(atom_id)
+        if term is None:
+            term = self._terms[atom_id] = atom(self.value(atom_id))
+        return term
+
+    def find(self, value):
+        """The id of a constant, or None if no stored fact holds it"""
+        encoding = _encode(value)
+        if encoding is None:
+            return None
+        atom_id = self._recent.get(encoding)
+        if atom_id is not None:
+            return atom_id
+        ids = self._sorted
+        lo, hi = 0, len(ids)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._encoding(ids[mid]) < encoding:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(ids) and self._encoding(ids[lo]) == encoding:
+            return ids[lo]
+        return None
+
+    def ids(self, value):
+        """Ids of the atoms a goal constant unifies with"""
+        return {atom_id for atom_id in map(self.find, _equivalents(value)) if atom_id is not None}
+
+    def add(self, value):
+        """The id of a constant, appending it to the dictionary if it is new"""
+        atom_id = self.find(value)
+        if atom_id is not None:
+            return atom_id
+        encoding = _encode(value)
+        if self._file is None:
+            self._file = open(self.store._path('atoms.bin'), 'ab')
+            self._offsets_file = open(self.store._path('atoms.off'), 'ab')
+            self._end = self._file.tell()
+        self._file.write(encoding)
+        self._end += len(encoding)
+        array('Q', [self._end]).tofile(self._offsets_file)
+        self._file.flush()
+        self._offsets_file.flush()
+        atom_id = len(self)
+        self._appended.append(value)
+        self._recent[encoding] = atom_id
+        return atom_id
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._offsets_file.close()
+            self._file = None
+
+
+class Segment:
+    """A run of facts of one arity, stored as rows of atom ids"""
+
+    def __init__(self, store, info):
+        self.id = info['id']
+        self.arity = info['arity']
+        self.tail = info.get('tail', False)
+        if self.tail:
+            # Appended rows are few and unindexed: they are read into memory
+            self.data = array('I')
+            path = store._path(f"tail-{self.id}.dat")
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    self.data.frombytes(f.read())
+            self.index = None
+            self._file = None
+        else:
+            self.data = store._map(f"seg-{self.id}.dat", 'I')[1]
+            self.index = store._map(f"seg-{self.id}.idx", 'I')[1]
+        self.rows = len(self.data) // self.arity
+        self.deleted = store.deleted.setdefault(self.id, set())
+
+    def matching_rows(self, bound):
+        """Rows whose bound columns hold one of the given atom ids, in order"""
+        if not bound:
+            return range(self.rows)
+        if self.index is None:
+            return self._filter(range(self.rows), bound)
+
+        # Use the column whose index gives the fewest rows
+        rows = self.rows
+        best = None
+        for column, ids in bound:
+            start = 2 * column * rows
+            ranges = [(bisect.bisect_left(self.index, atom_id, start, start + rows),
+                       bisect.bisect_right(self.index, atom_id, start, start + rows)) for atom_id in ids]
+            count = sum(hi - lo for lo, hi in ranges)
+            if best is None or count < best[0]:
+                best = (count, column, ranges)
+        _, column, ranges = best
+        selected = []
+        for lo, hi in ranges:
+            selected.extend(self.index[lo + rows:hi + rows])
+        if len(ranges) > 1:
+            selected.sort()
+        rest = [(c, ids) for c, ids in bound if c != column]
+        return self._filter(selected, rest) if rest else selected
+
+    def _filter(self, rows, bound):
+        data = self.data
+        arity = self.arity
+        return [row for row in rows
+                if all(data[row * arity + column] in ids for column, ids in bound)]
+
+    def append(self, store, ids):
+        if self._file is None:
+            self._file = open(store._path(f"tail-{self.id}.dat"), 'ab')
+        row = array('I', ids)
+        row.tofile(self._file)
+        self._file.flush()
+        self.data.extend(row)
+        self.rows += 1
+        return self.rows - 1
+
+    def close(self):
+        if self.tail and self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class StoredClauses:
+    """The facts of one stored predicate, standing in for its clause list.
+
+    The engine asks it for candidate facts by goal arguments; iterating it
+    decodes every live fact in knowledge-base order.
+    """
+
+    def __init__(self, store, name, segments):
+        self.store = store
+        self.name = name
+        self.segments = segments
+
+    def __len__(self):
+        return sum(segment.rows - len(segment.deleted) for segment in self.segments)
+
+    def __iter__(self):
+        for segment in self.segments:
+            yield from self._facts(segment, range(segment.rows))
+
+    def __repr__(self):
+        return f"StoredClauses({self.name}, {len(self)} facts)"
+
+    def statistics(self):
+        """(facts, distinct atoms at each argument position), as LogicalEngine.statistics"""
+        columns = []
+        for segment in self.segments:
+            data = segment.data
+            for column in range(segment.arity):
+                if column == len(columns):
+                    columns.append(set())
+                columns[column].update(data[column::segment.arity])
+        return len(self), [len(ids) for ids in columns]
+
+    def candidates(self, args):
+        """Stored facts that may match goal arguments, in knowledge-base order"""
+        atoms = self.store.atoms
+        bound = []
+        for column, arg in enumerate(args):
+            key = _index_key(arg)
+            if key is _OPEN:
+                continue
+            ids = atoms.ids(key)
+            if not ids:
+                return ()
+            bound.append((column, ids))
+        return self._candidates(len(args), bound)
+
+    def _candidates(self, arity, bound):
+        for segment in self.segments:
+            if segment.arity == arity:
+                yield from self._facts(segment, segment.matching_rows(bound))
+
+    def _facts(self, segment, rows):
+        term = self.store.atoms.term
+        data = segment.data
+        arity = segment.arity
+        deleted = segment.deleted
+        name = self.name
+        for row in rows:
+            if deleted and row in deleted:
+                continue
+            base = row * arity
+            fact = StoredFact(Predicate(name, [term(atom_id) for atom_id in data[base:base + arity]]))
+            fact.segment = segment
+            fact.row = row
+            yield fact
+
+    def append(self, clause):
+        """Write a fact through to the store; returns False if it cannot be stored"""
+        values = _storable(clause)
+        if values is None:
+            return False
+        segment = self.segments[-1] if self.segments else None
+        if segment is None or not segment.tail or segment.arity != len(values):
+            segment = self.store._new_tail(self, len(values))
+        segment.append(self.store, [self.store.atoms.add(value) for value in values])
+        return True
+
+    def remove(self, clause):
+        self.remove_all([clause])
+
+    def remove_all(self, clauses):
+        """Retract stored facts by recording their rows as deleted"""
+        for clause in clauses:
+            self.store._delete(clause.segment, clause.row)
+
+
+class FactStore:
+    """An open persistent knowledge base"""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(self._path(MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported knowledge base format: {manifest.get('version')}")
+        if manifest.get('byteorder') != sys.byteorder:
+            raise ValueError("Knowledge base was written on a machine with another byte order")
+        self.manifest = manifest
+        self._mappings = []
+        self.deleted = {}  # {segment id: set of deleted rows}
+        deleted = array('I')
+        if os.path.exists(self._path('deleted.bin')):
+            with open(self._path('deleted.bin'), 'rb') as f:
+                deleted.frombytes(f.read())
+        for i in range(0, len(deleted), 2):
+            self.deleted.setdefault(deleted[i], set()).add(deleted[i + 1])
+        self._deleted_file = None
+        self.atoms = AtomTable(self, manifest['sorted_atoms'])
+        self.predicates = {name: StoredClauses(self, name, [Segment(self, info) for info in segments])
+                           for name, segments in manifest['predicates'].items()}
+        self.tabled = manifest.get('tabled', [])
+
+    def _path(self, name):
+        return os.path.join(self.path, name)
+
+    def _map(self, name, typecode):
+        mapped, view = _map(self._path(name), typecode)
+        if mapped is not None:
+            self._mappings.append((mapped, view))
+        return mapped, view
+
+    def relation(self, name):
+        """The stored clauses of a predicate, created empty if it is new"""
+        clauses = self.predicates.get(name)
+        if clauses is None:
+            clauses = self.predicates[name] = StoredClauses(self, name, [])
+        return clauses
+
+    def clauses(self):
+        """The (name, clause) pairs of the predicates kept outside the segments"""
+        path = self._path('clauses.pickle')
+        if not os.path.exists(path):
+            return []
+        with open(path, 'rb') as f:
+            return [(name, Rule(*parts) if kind == 'rule' else Fact(*parts))
+                    for name, kind, parts in pickle.load(f)]
+
+    def _new_tail(self, clauses, arity):
+        info = {'id': self.manifest['next_segment'], 'arity': arity, 'tail': True}
+        self.manifest['next_segment'] += 1
+        self.manifest['predicates'].setdefault(clauses.name, []).append(info)
+        self._write_manifest()
+        segment = Segment(self, info)
+        clauses.segments.append(segment)
+        return segment
+
+    def _delete(self, segment, row):
+        if self._deleted_file is None:
+            self._deleted_file = open(self._path('deleted.bin'), 'ab')
+        array('I', [segment.id, row]).tofile(self._deleted_file)
+        self._deleted_file.flush()
+        segment.deleted.add(row)
+
+    def _write_manifest(self):
+        _write_manifest(self.path, self.manifest)
+
+    def close(self):
+        """Release the mapped files; the engine must not query the store afterwards"""
+        for clauses in self.predicates.values():
+            for segment in clauses.segments:
+                segment.close()
+        self.atoms.close()
+        if self._deleted_file is not None:
+            self._deleted_file.close()
+            self._deleted_file = None
+        for mapped, view in self._mappings:
+            view.release()
+            mapped.close()
+        self._mappings = []
+
+
+def _write_manifest(path, manifest):
+    temporary = os.path.join(path, MANIFEST + '.tmp')
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(temporary, os.path.join(path, MANIFEST))
+
+
+def _clear_store(path):
+    """Remove the files of a previous store in ``path``"""
+    if not os.path.exists(os.path.join(path, MANIFEST)):
+        if os.listdir(path):
+            raise FileExistsError(f"Not an empty directory or a knowledge base: {path}")
+        return
+    for name in os.listdir(path):
+        if (name in (MANIFEST, 'deleted.bin', 'clauses.pickle') or name.startswith('atoms.')
+                or name.startswith('seg-') or name.startswith('tail-')):
+            os.remove(os.path.join(path, name))
+
+
+def save_kb(engine, path):
+    """Write an engine's knowledge base to ``path`` as a store"""
+    if array('I').itemsize != 4:
+        raise RuntimeError("Stores need a 4-byte unsigned array type")
+    path = os.path.abspath(path)
+    store = getattr(engine, 'store', None)
+    if store is not None and store.path == path:
+        raise ValueError("Cannot overwrite the store the engine is reading; save to another path")
+    os.makedirs(path, exist_ok=True)
+    _clear_store(path)
+
+    encodings = []  # Atom encodings by id
+    ids = {}  # {(type, value): id}
+    predicates = {}
+    others = []
+    next_segment = 0
+    for name, clauses in engine.knowledge_base.items():
+        clauses = list(clauses)
+        rows = [_storable(clause) for clause in clauses]
+        if not clauses or any(values is None for values in rows):
+            for clause in clauses:
+                if isinstance(clause, Rule):
+                    others.append((name, 'rule', (clause.head, clause.body)))
+                else:
+                    others.append((name, 'fact', (clause.predicate,)))
+            continue
+
+        # Consecutive facts of the same arity form one segment
+        segments = predicates[name] = []
+        start = 0
+        while start < len(rows):
+            arity = len(rows[start])
+            end = start
+            while end < len(rows) and len(rows[end]) == arity:
+                end += 1
+            data = array('I')
+            for values in rows[start:end]:
+                for value in values:
+                    key = (value.__class__, value)
+                    atom_id = ids.get(key)
+                    if atom_id is None:
+                        atom_id = ids[key] = len(encodings)
+                        encodings.append(_encode(value))
+                    data.append(atom_id)
+            _write_segment(path, next_segment, data, arity, end - start)
+            segments.append({'id': next_segment, 'arity': arity, 'rows': end - start})
+            next_segment += 1
+            start = end
+
+    with open(os.path.join(path, 'atoms.bin'), 'wb') as f:
+        for encoding in encodings:
+            f.write(encoding)
+    offsets = array('Q', [0])
+    for encoding in encodings:
+        offsets.append(offsets[-1] + len(encoding))
+    _write_array(os.path.join(path, 'atoms.off'), offsets)
+    _write_array(os.path.join(path, 'atoms.sorted'),
+                 array('I', sorted(range(len(encodings)), key=encodings.__getitem__)))
+    if others:
+        with open(os.path.join(path, 'clauses.pickle'), 'wb') as f:
+            pickle.dump(others, f)
+
+    _write_manifest(path, {
+        'version': FORMAT_VERSION,
+        'byteorder': sys.byteorder,
+        'sorted_atoms': len(encodings),
+        'next_segment': next_segment,
+        'predicates': predicates,
+        'tabled': sorted(engine.tabled),
+    })
+
+
+def _write_segment(path, segment_id, data, arity, rows):
+    """Write a segment's rows and its per-column indexes"""
+    _write_array(os.path.join(path, f"seg-{segment_id}.dat"), data)
+    index = array('I')
+    for column in range(arity):
+        values = data[column::arity]
+        order = sorted(range(rows), key=values.__getitem__)
+        index.extend(values[row] for row in order)
+        index.extend(order)
+    _write_array(os.path.join(path, f"seg-{segment_id}.idx"), index)
@@ -247,6 +247,9 @@ class HybridLexer:
         # Operators and symbols
         if self._match_pattern(r'←|:-', TokenType.IMPLIES):
             return True
+        # Negation as failure in rule bodies: \+ goal
+        if self._match_pattern(r'\\\+', TokenType.OPERATOR):
+            return True
         if self._match_pattern(r'==|!=|<=|>=|<|>', TokenType.OPERATOR):
             return True
         # Match ** before * to avoid splitting it
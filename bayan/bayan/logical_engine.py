@@ -3,8 +3,20 @@ Logical Engine for Bayan Language
 محرك منطقي للغة بيان
 """
 
+import heapq
+import itertools
+import operator
+import os
+import sys
+import weakref
+from collections import OrderedDict
+
+from .ast_nodes import BinaryOp, IsExpression, Number, UnaryOp, Variable
+
 class Term:
     """Represents a logical term (constant, variable, or compound)"""
+    __slots__ = ('value', 'is_variable', '__weakref__')
+
     def __init__(self, value, is_variable=False):
         self.value = value
         self.is_variable = is_variable
@@ -15,6 +27,8 @@ class Term:
         return str(self.value)
     
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Term):
             return False
         return self.value == other.value and self.is_variable == other.is_variable
@@ -24,6 +38,8 @@ class Term:
 
 class Predicate:
     """Represents a logical predicate"""
+    __slots__ = ('name', 'args')
+
     def __init__(self, name, args):
         self.name = name
         self.args = args  # List of Term objects
@@ -33,12 +49,16 @@ class Predicate:
         return f"{self.name}({args_str})"
     
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Predicate):
             return False
         return self.name == other.name and self.args == other.args
 
 class Fact:
     """Represents a logical fact"""
+    __slots__ = ('predicate',)
+
     def __init__(self, predicate):
         self.predicate = predicate
     
@@ -47,26 +67,107 @@ class Fact:
 
 class Rule:
     """Represents a logical rule: head :- body"""
+    __slots__ = ('head', 'body', 'template')
+
     def __init__(self, head, body):
         self.head = head  # Predicate
         self.body = body  # List of Predicates
+        self.template = None  # RuleTemplate, compiled when the rule is added
     
     def __repr__(self):
         body_str = ", ".join(str(p) for p in self.body)
         return f"{self.head} :- {body_str}."
 
+# Atom table: the one shared constant Term of each symbol. Constant terms
+# are never mutated, so all occurrences of a symbol in the knowledge base
+# can be the same object, and matching symbols compare by identity. The
+# table holds weak references: a symbol nothing refers to any more is
+# dropped, so long-running programs do not keep every symbol they saw.
+_atoms = {}  # {symbol: KeyedRef to its Term}
+
+
+def _release_atom(ref):
+    if _atoms.get(ref.key) is ref:
+        del _atoms[ref.key]
+
+
+def atom(value):
+    """Return the constant Term of a value, shared through the atom table for symbols"""
+    if value.__class__ is str:
+        ref = _atoms.get(value)
+        if ref is not None:
+            term = ref()
+            if term is not None:
+                return term
+        term = Term(sys.intern(value))
+        _atoms[value] = weakref.KeyedRef(term, _release_atom, value)
+        return term
+    return Term(value)
+
+
+def _fact_arg(value):
+    """The argument Term of a loaded fact value"""
+    if value.__class__ is Term or value.__class__ is Predicate:
+        return intern_term(value)
+    return atom(value)
+
+
+def intern_term(term):
+    """Return a term whose symbols are the shared atoms; variables are kept"""
+    cls = term.__class__
+    if cls is Term:
+        if term.is_variable or term.value.__class__ is not str:
+            return term
+        return atom(term.value)
+    if cls is Predicate:
+        return Predicate(sys.intern(term.name), [intern_term(arg) for arg in term.args])
+    return term
+
+
+def _copy_value(value):
+    """A copy of a solution value sharing no list, dict or compound term with it"""
+    cls = value.__class__
+    if cls is list:
+        return [_copy_value(item) for item in value]
+    if cls is Predicate:
+        return Predicate(value.name, [_copy_value(arg) for arg in value.args])
+    if cls is dict:
+        return {key: _copy_value(item) for key, item in value.items()}
+    if cls is Term and value.value.__class__ is list:
+        return Term(_copy_value(value.value))
+    return value
+
+
 class Substitution:
-    """Represents variable substitutions"""
+    """Represents variable substitutions.
+
+    Bindings are updated in place and every bind is recorded on a trail, so
+    the solver backtracks by undoing to a mark instead of copying the whole
+    bindings dict for each clause it tries.
+    """
     def __init__(self, bindings=None):
         self.bindings = bindings or {}
+        self.trail = []  # Bound variable names, in binding order
     
     def bind(self, var_name, value):
         """Bind a variable to a value"""
         self.bindings[var_name] = value
+        self.trail.append(var_name)
     
     def lookup(self, var_name):
         """Look up a variable"""
         return self.bindings.get(var_name)
+
+    def mark(self):
+        """Return a trail position to undo back to"""
+        return len(self.trail)
+
+    def undo(self, mark):
+        """Unbind every variable bound since the given mark"""
+        trail = self.trail
+        bindings = self.bindings
+        while len(trail) > mark:
+            bindings.pop(trail.pop(), None)
     
     def copy(self):
         """Create a copy of this substitution"""
@@ -75,27 +176,1261 @@ class Substitution:
     def __repr__(self):
         return f"Substitution({self.bindings})"
 
+# Monotonic source of fresh-variable suffixes for rule calls. It is shared
+# by all engines so renamed variables never collide, and next() on it is
+# atomic, so renaming is safe from several threads.
+_rename_counter = itertools.count(1)
+
+
+class _Slot:
+    """Placeholder for the n-th distinct variable of a compiled rule"""
+    __slots__ = ('index',)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __repr__(self):
+        return f"_Slot({self.index})"
+
+
+class _Template:
+    """A compound term with variables: rebuilt from its parts on each call"""
+    __slots__ = ('build', 'parts')
+
+    def __init__(self, build, parts):
+        self.build = build
+        self.parts = parts
+
+
+# Comparison goals compiled to a direct operator call
+_COMPARISON_OPERATORS = {
+    '>': operator.gt, '<': operator.lt, '>=': operator.ge,
+    '<=': operator.le, '==': operator.eq, '!=': operator.ne,
+}
+
+def _divide(a, b):
+    return a / b if b != 0 else None
+
+
+def _modulo(a, b):
+    return a % b if b != 0 else None
+
+
+# Arithmetic operators of 'is' expressions and comparisons; an operator
+# returning None (division by zero) makes the goal fail
+_ARITHMETIC_OPERATORS = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul,
+    '/': _divide, '%': _modulo, '**': operator.pow,
+}
+_UNARY_OPERATORS = {'-': operator.neg, '+': operator.pos}
+
+# Numbers parsed from symbols ("0.37"), which are interned atoms anyway
+_numbers = {}
+
+
+def _number(value):
+    """Return the number a constant denotes, or None if it is not numeric"""
+    if value.__class__ is str:
+        number = _numbers.get(value, _numbers)
+        if number is _numbers:
+            try:
+                number = float(value) if '.' in value else int(value)
+            except ValueError:
+                number = None
+            if len(_numbers) < 65536:
+                _numbers[value] = number
+        return number
+    try:
+        return float(value) if '.' in str(value) else int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+# Goals solved by dedicated engine handlers rather than by clause resolution
+_BUILTIN_GOALS = ('findall', 'bagof', 'setof', 'aggregate_all', '^', 'not', '\\+')
+
+# Kinds of compiled body goals: a predicate call (the closure builds the
+# resolved goal), a goal solved by a handler (the closure returns its
+# solutions), and a cut
+_CALL = 'call'
+_SOLVE = 'solve'
+_CUT = 'cut'
+
+
+class RuleTemplate:
+    """A rule precompiled for renaming and execution.
+
+    The rule's variables are numbered into slots once, when the rule is
+    added. A call then allocates a single frame list holding each slot's
+    value: the first occurrence of a head variable simply takes the goal
+    argument, and body goals are instantiated from the frame only when the
+    solver reaches them. Slots that are still empty get a fresh variable
+    named with the call's suffix.
+
+    The rule is also compiled into closures: ``head`` unifies a goal's
+    arguments with code specialized per head position, and ``goals`` holds
+    a (kind, closure) pair per body goal: _CALL closures build the resolved
+    predicate call, _SOLVE closures run a builtin, comparison or 'is' goal
+    and return its solutions, and _CUT has no closure. Whether a slot is
+    already filled at each point is known statically, so no argument is
+    inspected more than it has to be.
+    """
+
+    def __init__(self, rule):
+        self.var_names = []
+        slots = {}
+        self.head_args = [self._compile(arg, slots) for arg in rule.head.args]
+        self.body = [self._compile(goal, slots) for goal in rule.body]
+
+        filled = set()  # Slots holding a value at the current point of the clause
+        self.head = self._compile_head(filled)
+        self.goals = [self._compile_goal(goal, filled) for goal in self.body]
+        # Whether a cut follows each body goal, making its alternatives prunable
+        kinds = [kind for kind, _ in self.goals]
+        self.cut_follows = [_CUT in kinds[i + 1:] for i in range(len(kinds))]
+        self.plans = {}  # {call mode: (plan epoch, RuleTemplate)}, see LogicalEngine.reorder_goals
+
+    def new_frame(self):
+        """Allocate the slot values for one call of the rule"""
+        return [None] * len(self.var_names)
+
+    def instantiate(self, node, frame, suffix):
+        """Build a compiled term with the values (or fresh variables) of a frame"""
+        cls = node.__class__
+        if cls is _Slot:
+            value = frame[node.index]
+            if value is None:
+                value = Term(f"{self.var_names[node.index]}#{suffix}", is_variable=True)
+                frame[node.index] = value
+            return value
+        if cls is _Template:
+            return node.build([self.instantiate(part, frame, suffix) for part in node.parts])
+        return node
+
+    def _slot(self, name, slots):
+        slot = slots.get(name)
+        if slot is None:
+            slot = slots[name] = _Slot(len(self.var_names))
+            self.var_names.append(name)
+        return slot
+
+    def _compile(self, term, slots):
+        """Replace variables with slots; ground subterms are shared as they are"""
+        if isinstance(term, Term):
+            return self._slot(term.value, slots) if term.is_variable else intern_term(term)
+        if isinstance(term, Variable):
+            # Logical variable inside an arithmetic expression: ?X
+            name = term.name[1:] if term.name.startswith('?') else term.name
+            return self._slot(name, slots)
+
+        if isinstance(term, Predicate):
+            name = term.name
+            parts = [self._compile(arg, slots) for arg in term.args]
+            build = lambda args: Predicate(name, args)
+        elif isinstance(term, list):
+            parts = [self._compile(item, slots) for item in term]
+            build = list
+        elif isinstance(term, dict) and 'list_pattern' in term:
+            parts = [self._compile(term['head'], slots), self._compile(term['tail'], slots)]
+            build = lambda p: {'list_pattern': True, 'head': p[0], 'tail': p[1]}
+        elif isinstance(term, IsExpression):
+            parts = [self._compile(term.variable, slots), self._compile(term.expression, slots)]
+            build = lambda p: IsExpression(p[0], p[1])
+        elif isinstance(term, BinaryOp):
+            operator = term.operator
+            parts = [self._compile(term.left, slots), self._compile(term.right, slots)]
+            build = lambda p: BinaryOp(operator, p[0], p[1])
+        elif isinstance(term, UnaryOp):
+            operator = term.operator
+            parts = [self._compile(term.operand, slots)]
+            build = lambda p: UnaryOp(operator, p[0])
+        else:
+            return term
+
+        if any(part.__class__ in (_Slot, _Template) for part in parts):
+            return _Template(build, parts)
+        return term
+
+    def _fill(self, node, filled):
+        """Record the slots an instantiation of ``node`` fills"""
+        cls = node.__class__
+        if cls is _Slot:
+            filled.add(node.index)
+        elif cls is _Template:
+            for part in node.parts:
+                self._fill(part, filled)
+
+    def _compile_head(self, filled):
+        """Compile the head into match(engine, args, frame, suffix, substitution) -> bool"""
+        matchers = [self._compile_head_arg(arg, filled) for arg in self.head_args]
+        arity = len(matchers)
+
+        def match(engine, args, frame, suffix, substitution):
+            if len(args) != arity:
+                return False
+            for matcher, arg in zip(matchers, args):
+                if not matcher(engine, arg, frame, suffix, substitution):
+                    return False
+            return True
+        return match
+
+    def _compile_head_arg(self, node, filled):
+        cls = node.__class__
+        if cls is _Slot:
+            index = node.index
+            if index not in filled:
+                filled.add(index)
+
+                def take(engine, arg, frame, suffix, substitution):
+                    # First occurrence: the variable just takes the argument
+                    frame[index] = arg
+                    return True
+                return take
+
+            def match_slot(engine, arg, frame, suffix, substitution):
+                return engine._unify(arg, frame[index], substitution) is not None
+            return match_slot
+
+        if cls is _Template:
+            self._fill(node, filled)
+            instantiate = self.instantiate
+
+            def match_compound(engine, arg, frame, suffix, substitution):
+                return engine._unify(arg, instantiate(node, frame, suffix), substitution) is not None
+            return match_compound
+
+        if cls is Term:
+            expected = node.value
+
+            def match_constant(engine, arg, frame, suffix, substitution):
+                arg = engine._deref(arg, substitution)
+                if arg is node:
+                    return True
+                if arg.__class__ is Term:
+                    if arg.is_variable:
+                        substitution.bind(arg.value, node)
+                        return True
+                    return arg.value == expected
+                return engine._unify(arg, node, substitution) is not None
+            return match_constant
+
+        def match_ground(engine, arg, frame, suffix, substitution):
+            return engine._unify(arg, node, substitution) is not None
+        return match_ground
+
+    def _compile_goal_arg(self, node, filled):
+        """Compile a body-goal argument into build(engine, frame, suffix, substitution)"""
+        cls = node.__class__
+        if cls is _Slot:
+            index = node.index
+            if index not in filled:
+                filled.add(index)
+                prefix = f"{self.var_names[index]}#"
+
+                def fresh(engine, frame, suffix, substitution):
+                    term = frame[index] = Term(f"{prefix}{suffix}", is_variable=True)
+                    return term
+                return fresh
+
+            def lookup(engine, frame, suffix, substitution):
+                return engine._resolve_argument(frame[index], substitution)
+            return lookup
+
+        if cls is _Template:
+            self._fill(node, filled)
+            instantiate = self.instantiate
+
+            def build(engine, frame, suffix, substitution):
+                return engine._resolve_argument(instantiate(node, frame, suffix), substitution)
+            return build
+
+        if cls is Term:
+            def constant(engine, frame, suffix, substitution):
+                return node
+            return constant
+
+        def resolve(engine, frame, suffix, substitution):
+            return engine._resolve_argument(node, substitution)
+        return resolve
+
+    def _compile_goal(self, node, filled):
+        """Compile a body goal into a (kind, closure(engine, frame, suffix, substitution)) pair"""
+        from .ast_nodes import Cut
+
+        if isinstance(node, Cut):
+            return _CUT, None
+        instantiate = self.instantiate
+
+        goal = node
+        if goal.__class__ is _Template:
+            # The original goal's class and name, for dispatching
+            goal = node.build(node.parts)
+
+        if isinstance(goal, Predicate) and goal.name not in _BUILTIN_GOALS:
+            name = goal.name
+            if name.startswith('_compare_'):
+                compare = _COMPARISON_OPERATORS.get(name[len('_compare_'):])
+                if compare is not None and len(goal.args) == 2:
+                    return _SOLVE, self._compile_comparison(compare, node, filled)
+            else:
+                builders = [self._compile_goal_arg(arg, filled) for arg in goal.args]
+
+                def build_call(engine, frame, suffix, substitution):
+                    return Predicate(name, [build(engine, frame, suffix, substitution) for build in builders])
+                return _CALL, build_call
+
+        if isinstance(goal, IsExpression):
+            return _SOLVE, self._compile_is(node, filled)
+
+        self._fill(node, filled)
+
+        def solve_builtin(engine, frame, suffix, substitution):
+            return engine._solve_goal(instantiate(node, frame, suffix), substitution)
+        return _SOLVE, solve_builtin
+
+    def _compile_comparison(self, compare, node, filled):
+        """Compile a comparison goal; both sides are evaluated as arithmetic"""
+        left, right = node.parts if node.__class__ is _Template else node.args
+        left = self._compile_arithmetic(left, filled)
+        constant, right = self._compile_arithmetic(right, filled)
+        left = self._evaluator(*left)
+
+        if right is None:
+            if constant is None:
+                return lambda engine, frame, suffix, substitution: ()
+
+            def solve_comparison_constant(engine, frame, suffix, substitution):
+                a = left(engine, frame, suffix, substitution)
+                if a is None or not compare(a, constant):
+                    return ()
+                return (substitution,)
+            return solve_comparison_constant
+
+        def solve_comparison(engine, frame, suffix, substitution):
+            a = left(engine, frame, suffix, substitution)
+            if a is None:
+                return ()
+            b = right(engine, frame, suffix, substitution)
+            if b is None or not compare(a, b):
+                return ()
+            return (substitution,)
+        return solve_comparison
+
+    def _compile_is(self, node, filled):
+        """Compile an 'is' goal; a target variable seen for the first time takes the value directly"""
+        target, expression = node.parts if node.__class__ is _Template else (node.variable, node.expression)
+        evaluate = self._evaluator(*self._compile_arithmetic(expression, filled))
+
+        if target.__class__ is _Slot and target.index not in filled:
+            index = target.index
+            filled.add(index)
+
+            def solve_is_fresh(engine, frame, suffix, substitution):
+                value = evaluate(engine, frame, suffix, substitution)
+                if value is None:
+                    return ()
+                frame[index] = value
+                return (substitution,)
+            return solve_is_fresh
+
+        self._fill(target, filled)
+        instantiate = self.instantiate
+
+        def solve_is(engine, frame, suffix, substitution):
+            value = evaluate(engine, frame, suffix, substitution)
+            if value is None or engine._unify_number(instantiate(target, frame, suffix), value, substitution) is None:
+                return ()
+            return (substitution,)
+        return solve_is
+
+    @staticmethod
+    def _evaluator(constant, evaluate):
+        """A closure for a compiled expression, also when it was folded to a constant"""
+        if evaluate is None:
+            return lambda engine, frame, suffix, substitution: constant
+        return evaluate
+
+    def _compile_arithmetic(self, node, filled):
+        """Compile an arithmetic expression into a (constant, evaluate) pair.
+
+        Ground subexpressions are folded at compile time and come back as
+        (value, None), where a value of None means the expression can never be
+        evaluated; otherwise evaluate(engine, frame, suffix, substitution)
+        returns the number, or None. Numeric symbols are parsed here once.
+        """
+        cls = node.__class__
+        if cls is _Slot:
+            index = node.index
+            if index not in filled:
+                # An unbound variable has no value
+                return None, None
+
+            def variable(engine, frame, suffix, substitution):
+                return engine._numeric_value(frame[index], substitution)
+            return None, variable
+
+        if cls is Term:
+            return _number(node.value), None
+        if cls is Number:
+            return node.value, None
+        if isinstance(node, (int, float)):
+            return node, None
+
+        if cls is _Template:
+            expr = node.build(node.parts)
+            operands = node.parts
+        else:
+            expr = node
+            operands = None
+        if expr.__class__ is BinaryOp:
+            return self._compile_binary(_ARITHMETIC_OPERATORS.get(expr.operator),
+                                        operands or (expr.left, expr.right), filled)
+        if expr.__class__ is UnaryOp:
+            op = _UNARY_OPERATORS.get(expr.operator)
+            constant, evaluate = self._compile_arithmetic(operands[0] if operands else expr.operand, filled)
+            if op is None or (evaluate is None and constant is None):
+                return None, None
+            if evaluate is None:
+                return op(constant), None
+
+            def unary(engine, frame, suffix, substitution):
+                value = evaluate(engine, frame, suffix, substitution)
+                return None if value is None else op(value)
+            return None, unary
+
+        if cls is _Template:
+            # Anything else is instantiated and evaluated as it is
+            self._fill(node, filled)
+            instantiate = self.instantiate
+
+            def other(engine, frame, suffix, substitution):
+                return engine._evaluate_arithmetic(instantiate(node, frame, suffix), substitution)
+            return None, other
+        return None, None
+
+    def _compile_binary(self, op, operands, filled):
+        a, left = self._compile_arithmetic(operands[0], filled)
+        b, right = self._compile_arithmetic(operands[1], filled)
+        if op is None or (left is None and a is None) or (right is None and b is None):
+            return None, None
+
+        if left is None and right is None:
+            try:
+                return op(a, b), None
+            except ArithmeticError:
+                # Leave the error to the goal's execution
+                pass
+            left = self._evaluator(a, None)
+
+        if left is None:
+            def binary_left_constant(engine, frame, suffix, substitution):
+                y = right(engine, frame, suffix, substitution)
+                return None if y is None else op(a, y)
+            return None, binary_left_constant
+
+        if right is None:
+            def binary_right_constant(engine, frame, suffix, substitution):
+                x = left(engine, frame, suffix, substitution)
+                return None if x is None else op(x, b)
+            return None, binary_right_constant
+
+        def binary(engine, frame, suffix, substitution):
+            x = left(engine, frame, suffix, substitution)
+            if x is None:
+                return None
+            y = right(engine, frame, suffix, substitution)
+            return None if y is None else op(x, y)
+        return None, binary
+
+
+# Index key for head arguments that can match any goal argument
+# (variables, lists, list patterns and compound terms)
+_OPEN = object()
+
+
+def _fact_rows(source, columns, header, delimiter):
+    """The argument rows of load_facts' source, read lazily"""
+    if isinstance(source, (str, os.PathLike)):
+        path = os.fspath(source)
+        extension = os.path.splitext(path)[1].lower()
+        if extension in ('.csv', '.tsv'):
+            return _csv_rows(path, columns, header, '\t' if extension == '.tsv' else delimiter)
+        if extension in ('.jsonl', '.ndjson'):
+            return _pick_columns(_jsonl_rows(path), columns)
+        raise ValueError(f"Unsupported fact file (expected .csv, .tsv, .jsonl or .ndjson): {path}")
+    return _pick_columns(source, columns)
+
+
+def _csv_rows(path, columns, header, delimiter):
+    import csv
+
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        names = next(reader, []) if header else None
+        if columns is not None and any(isinstance(c, str) for c in columns):
+            if names is None:
+                raise ValueError("Column names need a CSV header")
+            missing = [c for c in columns if isinstance(c, str) and c not in names]
+            if missing:
+                raise ValueError(f"Columns not in the CSV header: {', '.join(missing)}")
+            columns = [names.index(c) if isinstance(c, str) else c for c in columns]
+        yield from _pick_columns(reader, columns)
+
+
+def _jsonl_rows(path):
+    import json
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _pick_columns(rows, columns):
+    if columns is None:
+        for row in rows:
+            yield row.values() if isinstance(row, dict) else row
+    elif len(columns) == 1:
+        column = columns[0]
+        for row in rows:
+            yield (row[column],)
+    else:
+        yield from map(operator.itemgetter(*columns), rows)
+
+
+def _clause_head(clause):
+    """Return the head predicate of a fact or rule"""
+    return clause.predicate if isinstance(clause, Fact) else clause.head
+
+
+def _index_key(arg):
+    """Return the index key of an argument, or _OPEN if it is not a hashable constant"""
+    if isinstance(arg, Term):
+        if arg.is_variable:
+            return _OPEN
+        value = arg.value
+    elif isinstance(arg, (str, int, float)):
+        value = arg
+    else:
+        return _OPEN
+    try:
+        hash(value)
+    except TypeError:
+        return _OPEN
+    return value
+
+
+def _standard_order(value):
+    """Sort key placing any two terms in a total order, also usable as a hash key.
+
+    Variables come first, then numbers, symbols, compound terms and lists;
+    compounds order by arity, name and then arguments.
+    """
+    if isinstance(value, Term):
+        if value.is_variable:
+            return (0, value.value)
+        value = value.value
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, Predicate):
+        return (3, len(value.args), value.name, tuple(map(_standard_order, value.args)))
+    if isinstance(value, (list, tuple)):
+        return (4, tuple(map(_standard_order, value)))
+    return (5, repr(value))
+
+
+class ClauseIndex:
+    """Argument indexes over the clauses of one predicate.
+
+    Every indexed argument position maps a constant to the clauses whose head
+    holds that constant there. Clauses with a variable (or a list/compound) at
+    that position can match anything, so they live in a separate open bucket.
+    Entries carry a sequence number that follows knowledge-base order, which
+    lets a lookup merge the two buckets back into the order a full scan sees.
+
+    Position 0 is always indexed; other positions are added on demand.
+    """
+
+    def __init__(self, clauses):
+        self.positions = {}  # {position: ({key: [(seq, clause)]}, [(seq, clause)])}
+        self._first_seq = 0
+        self._next_seq = len(clauses)
+        self.add_position(0, clauses)
+
+    def add_position(self, position, clauses):
+        """Build the index for an argument position from the clauses in KB order"""
+        buckets, open_bucket = {}, []
+        for seq, clause in enumerate(clauses, self._first_seq):
+            self._insert(buckets, open_bucket, position, seq, clause, at_front=False)
+        self.positions[position] = (buckets, open_bucket)
+
+    def add(self, clause, at_front=False):
+        """Index a clause appended (assertz) or prepended (asserta) to the predicate"""
+        if at_front:
+            self._first_seq -= 1
+            seq = self._first_seq
+        else:
+            seq = self._next_seq
+            self._next_seq += 1
+        for position, (buckets, open_bucket) in self.positions.items():
+            self._insert(buckets, open_bucket, position, seq, clause, at_front)
+
+    def remove(self, clause):
+        """Drop the first indexed occurrence of a clause"""
+        for position, (buckets, open_bucket) in self.positions.items():
+            key = self._key_at(clause, position)
+            bucket = open_bucket if key is _OPEN else buckets.get(key)
+            if not bucket:
+                continue
+            for i, (_, entry) in enumerate(bucket):
+                if entry is clause:
+                    bucket.pop(i)
+                    break
+            if not bucket and key is not _OPEN:
+                del buckets[key]
+
+    def candidates(self, position, key):
+        """Clauses that may match a goal with ``key`` at ``position``, in order"""
+        buckets, open_bucket = self.positions[position]
+        bucket = buckets.get(key, ())
+        if not open_bucket:
+            return [clause for _, clause in bucket]
+        if not bucket:
+            return [clause for _, clause in open_bucket]
+        return [clause for _, clause in heapq.merge(bucket, open_bucket, key=lambda e: e[0])]
+
+    def count(self, position, key):
+        """Number of candidate clauses for ``key`` at an indexed position"""
+        buckets, open_bucket = self.positions[position]
+        return len(buckets.get(key, ())) + len(open_bucket)
+
+    @staticmethod
+    def _key_at(clause, position):
+        args = _clause_head(clause).args
+        if position >= len(args):
+            return _OPEN
+        return _index_key(args[position])
+
+    def _insert(self, buckets, open_bucket, position, seq, clause, at_front):
+        key = self._key_at(clause, position)
+        if key is _OPEN:
+            bucket = open_bucket
+        else:
+            bucket = buckets.setdefault(key, [])
+        if at_front:
+            bucket.insert(0, (seq, clause))
+        else:
+            bucket.append((seq, clause))
+
+
+class AnswerCache:
+    """LRU cache of the complete solution lists of queries.
+
+    Entries are keyed by the query up to renaming of its variables (their
+    names are kept, since solutions report them) and record the generation
+    of every predicate the query can reach. A change to any of those
+    predicates bumps its generation, so a lookup finds exactly the entries
+    the change made stale and drops them.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+        self.entries = OrderedDict()  # {query key: (solutions, ((predicate, generation), ...))}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Entries dropped because a predicate changed
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, key, generations):
+        """The cached solutions of a query, or None"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            if all(generations.get(name, 0) == generation for name, generation in entry[1]):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            del self.entries[key]
+            self.stale += 1
+        self.misses += 1
+        return None
+
+    def store(self, key, solutions, dependencies):
+        self.entries[key] = (solutions, dependencies)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        """Hit, miss and stale counts and the number of cached queries"""
+        return {'hits': self.hits, 'misses': self.misses, 'stale': self.stale,
+                'entries': len(self.entries), 'size': self.size}
+
+
+class _Table:
+    """Answer table of one call variant of a tabled predicate"""
+    __slots__ = ('answers', 'answer_keys', 'complete', 'depth', 'leader')
+
+    def __init__(self):
+        self.answers = []  # [(answer instance, has_variables)]
+        self.answer_keys = set()  # Variant keys of the answers, for deduplication
+        self.complete = False
+        self.depth = None  # Position on the evaluation stack while being evaluated
+        self.leader = None  # Oldest evaluating table this one consumed answers from
+
+
+class _CutBarrier:
+    """Choice points of one predicate invocation that a cut (!) prunes"""
+    __slots__ = ('cuts',)
+
+    def __init__(self):
+        self.cuts = 0  # Cuts executed so far in this invocation
+
+
+class _Goals:
+    """Continuation: the body goals of a rule call from ``position`` on, then ``next``"""
+    __slots__ = ('template', 'position', 'frame', 'suffix', 'cut_height', 'depth', 'next')
+
+    def __init__(self, template, position, frame, suffix, cut_height, depth, next):
+        self.template = template
+        self.position = position
+        self.frame = frame
+        self.suffix = suffix
+        self.cut_height = cut_height  # Choice-point stack height when the rule's predicate was called
+        self.depth = depth  # Rule calls the rule's call is nested in, the query's included
+        self.next = next
+
+
+class _ClauseChoice:
+    """Choice point over the clauses of a predicate call not tried yet"""
+    __slots__ = ('goal', 'clauses', 'pending', 'mark', 'cont', 'cut_height', 'depth')
+
+    def __init__(self, goal, clauses, pending, mark, cont, cut_height, depth):
+        self.goal = goal
+        self.clauses = clauses  # Iterator over the candidate clauses after ``pending``
+        self.pending = pending  # Next clause to try
+        self.mark = mark
+        self.cont = cont
+        self.cut_height = cut_height
+        self.depth = depth
+
+
+class _SolutionChoice:
+    """Choice point over the further solutions of a goal solved by a handler"""
+    __slots__ = ('solutions', 'mark', 'cont')
+
+    def __init__(self, solutions, mark, cont):
+        self.solutions = solutions
+        self.mark = mark  # Trail height after the handler's last solution
+        self.cont = cont
+
+
 class LogicalEngine:
     """The logical inference engine"""
-    
-    def __init__(self):
+
+    # Predicates with more clauses than this get indexes built on demand
+    # for non-first argument positions
+    jit_index_threshold = 8
+
+    # query_many joins its inputs against a fact predicate in one pass when
+    # the facts to scan are at most this many times the number of inputs
+    join_ratio = 16
+
+    # Engines created with a positive size cache the answers of up to this
+    # many distinct queries (see AnswerCache); set it on the class to turn
+    # the cache on for every engine
+    answer_cache_size = 0
+
+    def __init__(self, indexing=True, mode="top_down", compile_rules=True, reorder_goals=False):
+        if mode not in ("top_down", "bottom_up"):
+            raise ValueError(f"Unknown evaluation mode: {mode}")
         self.knowledge_base = {}  # {predicate_name: [facts/rules]}
+        self.clause_index = {}  # {predicate_name: ClauseIndex}
+        self.indexing = indexing
+        self.compile_rules = compile_rules  # Run compiled rules on the iterative solver
+        self.reorder_goals = reorder_goals  # Order fact goals of rule bodies by estimated cost
+        self._statistics = {}  # {predicate_name: (facts, [distinct values per argument])}
+        self._plan_epoch = 0  # Bumped when statistics or fact/rule predicates change
+        self._generations = {}  # {predicate_name: times its clauses changed}
+        self.answer_cache = AnswerCache(self.answer_cache_size) if self.answer_cache_size else None
+        self.mode = mode  # "bottom_up" answers Datalog predicates from a materialized model
+        self._materialization = None  # datalog.Materialization, built on demand
+        self.materialized = set()  # Names of predicates declared materialized in top-down mode
+        self.tabled = set()  # Names of tabled predicates
+        self.tables = {}  # {predicate_name: {call variant key: _Table}}
+        self._table_stack = []  # Tables under evaluation, oldest first
+        self._table_scc = []  # Evaluated tables waiting for their leader to complete
+        self._table_dependencies = {}  # {tabled predicate: predicates it depends on}
+        self._incomplete_reads = 0  # Times an incomplete table was consumed
+        self._answers_added = 0  # Answers recorded in any table
+        self.store = None  # kb_store.FactStore the knowledge base reads and appends to
         self.call_stack = []
-        self.max_depth = 1000
+        # Deepest rule-call nesting allowed; the compiled path runs in constant
+        # Python stack, so proofs far deeper than Python's recursion limit fit
+        self.max_depth = 100000
     
     def add_fact(self, fact):
         """Add a fact to the knowledge base"""
-        pred_name = fact.predicate.name
-        if pred_name not in self.knowledge_base:
-            self.knowledge_base[pred_name] = []
-        self.knowledge_base[pred_name].append(fact)
+        self._add_clause(fact.predicate.name, fact)
     
     def add_rule(self, rule):
         """Add a rule to the knowledge base"""
-        pred_name = rule.head.name
-        if pred_name not in self.knowledge_base:
-            self.knowledge_base[pred_name] = []
-        self.knowledge_base[pred_name].append(rule)
+        self._add_clause(rule.head.name, rule)
+
+    def _add_clause(self, pred_name, clause, at_front=False):
+        """Store a clause and keep its predicate's index up to date"""
+        if isinstance(clause, Rule):
+            if clause.template is None:
+                clause.template = RuleTemplate(clause)
+        else:
+            # Stored facts share their symbols with the rest of the knowledge base
+            predicate = clause.predicate
+            predicate.name = sys.intern(predicate.name)
+            predicate.args = [intern_term(arg) for arg in predicate.args]
+        clauses = self.knowledge_base.get(pred_name)
+        if clauses is None:
+            if self.store is not None and isinstance(clause, Fact):
+                clauses = self.store.relation(pred_name)
+            else:
+                clauses = []
+            self.knowledge_base[pred_name] = clauses
+        if clauses.__class__ is not list:
+            # A stored predicate appends plain facts to its store; any other
+            # clause brings the predicate into memory (save_kb persists it)
+            if not at_front and clauses.append(clause):
+                self._invalidate_tables(pred_name, clause)
+                self._predicate_changed(pred_name, clause)
+                self._maintain_materialization(pred_name, clause, added=True)
+                return
+            clauses = self.knowledge_base[pred_name] = list(clauses)
+        if at_front:
+            clauses.insert(0, clause)
+        else:
+            clauses.append(clause)
+        index = self.clause_index.get(pred_name)
+        if index is not None:
+            index.add(clause, at_front)
+        self._invalidate_tables(pred_name, clause)
+        self._predicate_changed(pred_name, clause)
+        self._maintain_materialization(pred_name, clause, added=True)
+
+    def _remove_clauses(self, pred_name, doomed):
+        """Remove clauses (by identity) from a predicate and its index"""
+        clauses = self.knowledge_base[pred_name]
+        index = self.clause_index.get(pred_name)
+        for clause in doomed:
+            self._invalidate_tables(pred_name, clause)
+            self._maintain_materialization(pred_name, clause, added=False)
+        self._predicate_changed(pred_name, doomed[0])
+        if clauses.__class__ is not list:
+            clauses.remove_all(doomed)
+            return
+        if len(doomed) == 1:
+            clause = doomed[0]
+            clauses.remove(clause)  # Fact/Rule compare by identity
+            if index is not None:
+                index.remove(clause)
+            return
+        doomed_ids = {id(c) for c in doomed}
+        self.knowledge_base[pred_name] = [c for c in clauses if id(c) not in doomed_ids]
+        # Bulk removal: rebuilding is cheaper than removing entries one by one
+        self.clause_index.pop(pred_name, None)
+
+    def load_facts(self, source, predicate, columns=None, header=True, delimiter=','):
+        """Add many facts of one predicate without going through the parser.
+
+        ``source`` is an iterable of rows - sequences or dicts, possibly a
+        generator streaming them - or the path of a .csv/.tsv or
+        .jsonl/.ndjson file. ``columns`` picks and orders the arguments:
+        positions, or keys for dict rows and names for CSV files with a
+        header. Values are stored as they come: CSV fields stay strings, like
+        numbers in parsed facts. Rows are consumed one at a time and the
+        predicate's index is rebuilt once, by the next query.
+
+        Example: load_facts('edges.csv', 'edge', columns=['src', 'dst'])
+
+        Returns the number of facts added.
+        """
+        pred_name = sys.intern(predicate)
+        rows = _fact_rows(source, columns, header, delimiter)
+        clauses = self.knowledge_base.get(pred_name)
+        if (clauses is None and self.store is not None) or (clauses is not None and clauses.__class__ is not list):
+            # A stored predicate takes each fact through its store
+            added = 0
+            for args in rows:
+                self._add_clause(pred_name, Fact(Predicate(pred_name, [_fact_arg(v) for v in args])))
+                added += 1
+            return added
+
+        if clauses is None:
+            clauses = self.knowledge_base[pred_name] = []
+        start = len(clauses)
+        append = clauses.append
+        try:
+            for args in rows:
+                append(Fact(Predicate(pred_name, [_fact_arg(v) for v in args])))
+        finally:
+            if len(clauses) > start:
+                self.clause_index.pop(pred_name, None)
+                self._invalidate_tables(pred_name, clauses[start])
+                self._predicate_changed(pred_name, clauses[start])
+                model = self._materialization
+                if model is not None and pred_name in model.inputs:
+                    self._materialization = None
+        return len(clauses) - start
+
+    def index_argument(self, pred_name, position):
+        """Index a predicate on an extra argument position"""
+        index = self._get_index(pred_name)
+        if index is not None and position not in index.positions:
+            index.add_position(position, self.knowledge_base[pred_name])
+        return index
+
+    def statistics(self, pred_name):
+        """Size statistics of a fact predicate, for ordering rule bodies.
+
+        Returns (facts, [distinct values at each argument position]), or None
+        if the predicate is unknown or has rules. Statistics are computed on
+        first use and kept until the predicate's size drifts by a quarter.
+        """
+        stats = self._statistics.get(pred_name)
+        if stats is not None:
+            return stats
+        clauses = self.knowledge_base.get(pred_name)
+        if clauses is None:
+            return None
+        if clauses.__class__ is not list:
+            stats = clauses.statistics()
+        else:
+            values = []
+            for clause in clauses:
+                if isinstance(clause, Rule):
+                    return None
+                for position, arg in enumerate(clause.predicate.args):
+                    if position == len(values):
+                        values.append(set())
+                    values[position].add(_index_key(arg))
+            stats = (len(clauses), [len(v) for v in values])
+        self._statistics[pred_name] = stats
+        return stats
+
+    def _predicate_changed(self, pred_name, clause):
+        """Record a change to a predicate's clauses.
+
+        Bumps its generation, which makes cached answers depending on it
+        stale, and drops statistics - and the body orders built on them -
+        that the change makes stale.
+        """
+        self._generations[pred_name] = self._generations.get(pred_name, 0) + 1
+        stats = self._statistics.get(pred_name)
+        if isinstance(clause, Rule):
+            # A predicate gaining rules must no longer be moved around
+            if stats is not None:
+                del self._statistics[pred_name]
+                self._plan_epoch += 1
+            return
+        if stats is not None and 4 * abs(len(self.knowledge_base[pred_name]) - stats[0]) > stats[0]:
+            del self._statistics[pred_name]
+            self._plan_epoch += 1
+
+    def _estimate(self, goal, bound):
+        """Estimated answers of a fact goal once the variables in ``bound`` are bound"""
+        facts, distinct = self.statistics(goal.name)
+        rows = float(facts)
+        for position, arg in enumerate(goal.args):
+            if position < len(distinct):
+                names = []
+                self._collect_variables(arg, names)
+                if all(name in bound for name in names):
+                    rows /= max(distinct[position], 1)
+        return rows
+
+    def _plan_body(self, rule, mode, reorder=True):
+        """Order a rule body for calls binding the head arguments flagged in ``mode``.
+
+        Runs of goals on fact predicates are ordered greedily, cheapest
+        estimate first given the variables bound so far. Every other goal -
+        a cut, 'not', builtin, comparison, 'is' or a call of a predicate with
+        rules or a table - stays where it is and splits the runs. Returns a
+        list of (body goal, estimated answers or None) in the chosen order;
+        with ``reorder`` false the order is left as written.
+        """
+        names = []
+        for arg, is_bound in zip(rule.head.args, mode):
+            if is_bound:
+                self._collect_variables(arg, names)
+        bound = set(names)
+        plan = []
+        run = []
+
+        def flush():
+            while run:
+                costs = [self._estimate(goal, bound) for goal in run]
+                cheapest = costs.index(min(costs)) if reorder else 0
+                goal = run.pop(cheapest)
+                plan.append((goal, costs[cheapest]))
+                names = []
+                self._collect_variables(goal, names)
+                bound.update(names)
+
+        for goal in rule.body:
+            if (isinstance(goal, Predicate) and goal.name not in _BUILTIN_GOALS
+                    and goal.name not in self.tabled and self.statistics(goal.name) is not None):
+                run.append(goal)
+                continue
+            flush()
+            plan.append((goal, None))
+            names = []
+            self._collect_variables(goal, names)
+            bound.update(names)
+        flush()
+        return plan
+
+    def _planned_template(self, rule, goal):
+        """The compiled rule to run for a call, its body reordered for the call's bound arguments"""
+        template = rule.template
+        mode = tuple(not (arg.__class__ is Term and arg.is_variable) for arg in goal.args)
+        plan = template.plans.get(mode)
+        if plan is None or plan[0] != self._plan_epoch:
+            body = [body_goal for body_goal, _ in self._plan_body(rule, mode)]
+            if all(a is b for a, b in zip(body, rule.body)):
+                planned = template
+            else:
+                planned = RuleTemplate(Rule(rule.head, body))
+            plan = template.plans[mode] = (self._plan_epoch, planned)
+        return plan[1]
+
+    def explain(self, goal):
+        """Describe how the rules of a goal's predicate would be run.
+
+        Lists each rule with its body goals in the order used for this call
+        (reordered only when reorder_goals is on) and the estimated answers
+        of every fact goal per solution of the goals before it.
+        """
+        clauses = self.knowledge_base.get(goal.name, ())
+        mode = tuple(not (arg.__class__ is Term and arg.is_variable) for arg in goal.args)
+        lines = [f"{goal}"]
+        for clause in clauses:
+            if not isinstance(clause, Rule):
+                continue
+            lines.append(f"  rule {clause}")
+            plan = self._plan_body(clause, mode, self.reorder_goals)
+            for step, (body_goal, rows) in enumerate(plan, 1):
+                estimate = '' if rows is None else f"  ~{rows:.4g} rows"
+                lines.append(f"    {step}. {body_goal}{estimate}")
+        if len(lines) == 1:
+            lines.append("  facts only" if clauses else "  unknown predicate")
+        return "\n".join(lines)
+
+    def table(self, pred_name):
+        """Declare a predicate as tabled (Prolog :- table).
+
+        Answers of each call variant are memoized, which makes left-recursive
+        and cyclic rules terminate and stops recursive predicates from
+        re-deriving the same subgoals.
+        """
+        self.tabled.add(pred_name)
+        self.tables.pop(pred_name, None)
+
+    def abolish_tables(self, pred_name=None):
+        """Drop the memoized answers of one tabled predicate, or of all of them"""
+        if pred_name is None:
+            self.tables.clear()
+        else:
+            self.tables.pop(pred_name, None)
+
+    def _invalidate_tables(self, pred_name, clause):
+        """Drop tables whose predicate depends on a predicate that changed"""
+        if isinstance(clause, Rule):
+            # The dependency graph itself changed
+            self._table_dependencies.clear()
+        if not self.tables:
+            return
+        for tabled_name in list(self.tables):
+            if pred_name in self._table_depends_on(tabled_name):
+                del self.tables[tabled_name]
+
+    def _table_depends_on(self, pred_name):
+        """Predicates reachable from a predicate's rule bodies, itself included"""
+        deps = self._table_dependencies.get(pred_name)
+        if deps is not None:
+            return deps
+
+        deps = {pred_name}
+        pending = [pred_name]
+        while pending:
+            clauses = self.knowledge_base.get(pending.pop(), ())
+            if clauses.__class__ is not list:
+                continue  # Stored predicates hold facts only
+            for clause in clauses:
+                if not isinstance(clause, Rule):
+                    continue
+                stack = list(clause.body)
+                while stack:
+                    goal = stack.pop()
+                    if isinstance(goal, Predicate):
+                        if goal.name not in deps:
+                            deps.add(goal.name)
+                            pending.append(goal.name)
+                        # Goals nested in findall/not/... arguments
+                        stack.extend(arg for arg in goal.args if isinstance(arg, Predicate))
+        self._table_dependencies[pred_name] = deps
+        return deps
+
+    def materialize(self, *pred_names):
+        """Compute the Datalog part of the knowledge base bottom-up.
+
+        Rules whose bodies only call predicates and comparisons over ground
+        facts are evaluated semi-naively into a model, and the engine switches
+        to ``mode="bottom_up"``: queries on their predicates become lookups.
+        Asserted and retracted facts update the model incrementally; changing
+        a rule rebuilds it on the next query. Other predicates are still
+        solved top-down.
+
+        Given predicate names, only those predicates (and the derived
+        predicates they read) are materialized and kept current as facts
+        change, and the engine stays in its mode for everything else. A
+        named predicate whose rules are not Datalog is solved top-down.
+
+        A materialized predicate answers each derived tuple once, in the
+        order it was derived: for non-recursive rules over the facts loaded
+        so far that is the top-down order, and tuples derived by later
+        updates come after the existing ones.
+        """
+        if pred_names:
+            self.materialized.update(pred_names)
+        else:
+            self.mode = "bottom_up"
+        return self._build_materialization()
+
+    def _build_materialization(self):
+        from .datalog import Materialization
+
+        model = Materialization(self, None if self.mode == "bottom_up" else self.materialized)
+        model.compute()
+        self._materialization = model
+        return model
+
+    def _maintain_materialization(self, pred_name, clause, added):
+        """Bring the materialized model up to date with a changed clause"""
+        model = self._materialization
+        if model is None:
+            return
+        if isinstance(clause, Fact):
+            if pred_name not in model.inputs:
+                return
+            if added and model.fact_added(clause):
+                return
+            if not added and model.fact_removed(clause):
+                return
+        # A changed rule or a non-ground fact: rebuild when next needed
+        self._materialization = None
+
+    def save_kb(self, path):
+        """Write the knowledge base to a directory as a persistent store.
+
+        Plain facts go into memory-mappable segments with argument indexes;
+        rules and facts with compound arguments are kept alongside them.
+        """
+        from .kb_store import save_kb
+
+        save_kb(self, path)
+
+    def load_kb(self, path):
+        """Open a store written by save_kb and answer queries from it.
+
+        Stored facts are not read into memory: queries decode only the facts
+        the store's indexes select. Facts asserted afterwards are appended to
+        the store and retracted ones are marked deleted in it. Returns the
+        kb_store.FactStore; close it when the engine is done with it.
+        """
+        from .kb_store import FactStore
+
+        store = FactStore(path)
+        clauses = store.clauses()
+        names = set(store.predicates) | {name for name, _ in clauses}
+        taken = names & set(self.knowledge_base)
+        if taken:
+            store.close()
+            raise ValueError(f"Predicates already defined: {', '.join(sorted(taken))}")
+        for name, clause in clauses:
+            self._add_clause(name, clause)
+        self.knowledge_base.update(store.predicates)
+        for name in names:
+            self._generations[name] = self._generations.get(name, 0) + 1
+        self.tabled.update(store.tabled)
+        self.tables.clear()
+        self._table_dependencies.clear()
+        self._materialization = None
+        self._statistics.clear()
+        self._plan_epoch += 1
+        self.store = store
+        return store
+
+    def parallel(self, workers=None, start_method=None):
+        """Return a parallel.ParallelSolver over a snapshot of the knowledge base.
+
+        Its query_all solves independent queries, and its query splits the
+        clauses of one query, across ``workers`` processes.
+        """
+        from .parallel import ParallelSolver
+
+        return ParallelSolver(self, workers, start_method)
+
+    def _get_index(self, pred_name):
+        """Return the clause index of a predicate, building it lazily"""
+        if not self.indexing or self.knowledge_base.get(pred_name).__class__ is not list:
+            return None
+        index = self.clause_index.get(pred_name)
+        if index is None:
+            index = ClauseIndex(self.knowledge_base[pred_name])
+            self.clause_index[pred_name] = index
+        return index
+
+    def _candidate_clauses(self, goal):
+        """Clauses of the goal's predicate that may unify with it, in KB order.
+
+        Uses the index of the most selective bound argument. Positions other
+        than the first are indexed just-in-time once a predicate is large
+        enough for a scan to hurt.
+        """
+        clauses = self.knowledge_base[goal.name]
+        if clauses.__class__ is not list:
+            # Stored facts are looked up in the store's own indexes
+            return clauses.candidates(goal.args)
+        index = self._get_index(goal.name)
+        if index is None:
+            return clauses
+
+        bound = [(pos, key) for pos, key in
+                 ((pos, _index_key(arg)) for pos, arg in enumerate(goal.args))
+                 if key is not _OPEN]
+        if not bound:
+            return clauses
+
+        best = None
+        for pos, key in bound:
+            if pos in index.positions:
+                count = index.count(pos, key)
+                if best is None or count < best[0]:
+                    best = (count, pos, key)
+        if best is None or best[0] > self.jit_index_threshold:
+            for pos, key in bound:
+                if pos not in index.positions and len(clauses) > self.jit_index_threshold:
+                    index.add_position(pos, clauses)
+                    count = index.count(pos, key)
+                    if best is None or count < best[0]:
+                        best = (count, pos, key)
+                    break
+        if best is None:
+            return clauses
+        return index.candidates(best[1], best[2])
 
     def assertz(self, fact_or_rule):
         """Add a fact or rule at the end of the knowledge base (Prolog assertz)"""
@@ -108,16 +1443,8 @@ class LogicalEngine:
 
     def asserta(self, fact_or_rule):
         """Add a fact or rule at the beginning of the knowledge base (Prolog asserta)"""
-        if isinstance(fact_or_rule, Fact):
-            pred_name = fact_or_rule.predicate.name
-            if pred_name not in self.knowledge_base:
-                self.knowledge_base[pred_name] = []
-            self.knowledge_base[pred_name].insert(0, fact_or_rule)
-        elif isinstance(fact_or_rule, Rule):
-            pred_name = fact_or_rule.head.name
-            if pred_name not in self.knowledge_base:
-                self.knowledge_base[pred_name] = []
-            self.knowledge_base[pred_name].insert(0, fact_or_rule)
+        if isinstance(fact_or_rule, (Fact, Rule)):
+            self._add_clause(_clause_head(fact_or_rule).name, fact_or_rule, at_front=True)
         else:
             raise TypeError("asserta requires a Fact or Rule")
 
@@ -128,15 +1455,10 @@ class LogicalEngine:
             return False
 
         # Find and remove first matching fact/rule
-        for i, item in enumerate(self.knowledge_base[pred_name]):
-            if isinstance(item, Fact):
-                if self._unify(item.predicate, predicate, Substitution()) is not None:
-                    self.knowledge_base[pred_name].pop(i)
-                    return True
-            elif isinstance(item, Rule):
-                if self._unify(item.head, predicate, Substitution()) is not None:
-                    self.knowledge_base[pred_name].pop(i)
-                    return True
+        for item in self._candidate_clauses(predicate):
+            if self._unify(_clause_head(item), predicate, Substitution()) is not None:
+                self._remove_clauses(pred_name, [item])
+                return True
         return False
 
     def retractall(self, predicate):
@@ -146,58 +1468,273 @@ class LogicalEngine:
             return 0
 
         # Find and remove all matching facts/rules
-        count = 0
-        items_to_keep = []
-        for item in self.knowledge_base[pred_name]:
-            if isinstance(item, Fact):
-                if self._unify(item.predicate, predicate, Substitution()) is None:
-                    items_to_keep.append(item)
-                else:
-                    count += 1
-            elif isinstance(item, Rule):
-                if self._unify(item.head, predicate, Substitution()) is None:
-                    items_to_keep.append(item)
-                else:
-                    count += 1
-
-        self.knowledge_base[pred_name] = items_to_keep
-        return count
+        doomed = [item for item in self._candidate_clauses(predicate)
+                  if self._unify(_clause_head(item), predicate, Substitution()) is not None]
+        if doomed:
+            self._remove_clauses(pred_name, doomed)
+        return len(doomed)
 
     def query(self, goal, substitution=None):
         """Execute a query and return all solutions"""
-        if substitution is None:
-            substitution = Substitution()
-        
+        return list(self.solve(goal, substitution))
+
+    def query_many(self, goal, bindings):
+        """Solve one goal for each of many bindings of its variables.
+
+        ``bindings`` is an iterable of {variable name: value} mappings, e.g.
+        {'E': 'e12'} for state(?E, "hunger", ?V). Returns a dict from the
+        values of each mapping, as a tuple in the mapping's order, to the
+        solutions query() returns for the goal with those variables bound.
+        Repeated inputs are solved once, and when many inputs call a
+        predicate of plain facts they are answered by a single hash join
+        instead of one proof each.
+        """
+        inputs = {}
+        for binding in bindings:
+            key = tuple(binding.values())
+            if key not in inputs:
+                inputs[key] = Substitution({name: _fact_arg(value) for name, value in binding.items()})
+        results = self._join_inputs(goal, inputs) if inputs else None
+        if results is None:
+            results = {key: self.query(goal, substitution) for key, substitution in inputs.items()}
+        return results
+
+    def _join_inputs(self, goal, inputs):
+        """Answer query_many by a hash join, or return None where that does not apply.
+
+        The facts selected by the goal's constant arguments are read once and
+        bucketed by their values at the argument positions the inputs bind;
+        each input then matches only the facts of its own bucket, in KB order.
+        """
+        if (not isinstance(goal, Predicate) or goal.name in self.tabled
+                or self.knowledge_base.get(goal.name).__class__ is not list):
+            return None
+        clauses = self.knowledge_base[goal.name]
+        if any(clause.__class__ is not Fact for clause in clauses):
+            return None
+        names = set(next(iter(inputs.values())).bindings)
+        if any(set(substitution.bindings) != names for substitution in inputs.values()):
+            return None
+        positions = [pos for pos, arg in enumerate(goal.args)
+                     if arg.__class__ is Term and arg.is_variable and arg.value in names]
+        if not positions:
+            return None
+        if len(clauses) > len(inputs) * self.join_ratio:
+            return None
+        candidates = self._candidate_clauses(self._apply_substitution(goal, Substitution()))
+
+        arity = len(goal.args)
+        buckets = {}
+        for fact in candidates:
+            fact_args = fact.predicate.args
+            if len(fact_args) != arity:
+                continue
+            key = tuple(_index_key(fact_args[pos]) for pos in positions)
+            if _OPEN in key:
+                return None
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [fact]
+            else:
+                bucket.append(fact)
+
+        goal_names = []
+        self._collect_variables(goal, goal_names)
+        results = {}
+        for key, substitution in inputs.items():
+            args = self._apply_substitution(goal, substitution).args
+            probe = tuple(_index_key(args[pos]) for pos in positions)
+            if _OPEN in probe:
+                results[key] = self.query(goal, substitution)
+                continue
+            report = list(dict.fromkeys(list(substitution.bindings) + goal_names))
+            solutions = results[key] = []
+            for fact in buckets.get(probe, ()):
+                if self._match_fact(args, fact.predicate.args, substitution):
+                    solutions.append(self._snapshot(substitution, report))
+                substitution.undo(0)
+        return results
+
+    def solve(self, goal, substitution=None):
+        """Execute a query and yield its solutions one at a time.
+
+        Solutions are produced lazily by backtracking, so the caller pays only
+        for the solutions it consumes. Each yielded Substitution is a snapshot
+        with fully dereferenced values that stays valid while search goes on.
+        With an answer cache, a query without bindings is answered from it
+        while none of the predicates it depends on has changed.
+        """
+        cache = self.answer_cache
+        if cache is not None and not (substitution and substitution.bindings):
+            return self._solve_cached(cache, goal)
+        return self._solve_query(goal, substitution)
+
+    def _solve_query(self, goal, substitution):
+        """Yield snapshots of a query's solutions, found by resolution"""
+        store = Substitution() if substitution is None else substitution.copy()
+
         if len(self.call_stack) > self.max_depth:
             raise RuntimeError("Maximum recursion depth exceeded")
-        
+
+        # Only the query's own variables are reported; the variables renamed
+        # for rule calls (``X#12``) are internal to the proof
+        names = list(store.bindings)
+        self._collect_variables(goal, names)
+        names = list(dict.fromkeys(names))
+
         self.call_stack.append(goal)
         try:
-            solutions = self._solve_goal(goal, substitution)
+            for _ in self._solve_goal(goal, store):
+                yield self._snapshot(store, names)
         finally:
             self.call_stack.pop()
-        
-        return solutions
+
+    def _solve_cached(self, cache, goal):
+        """Yield a query's solutions from the answer cache, filling it on a miss.
+
+        A miss is cached only once its solutions are exhausted, and only if
+        no predicate it depends on changed meanwhile. Callers get their own
+        copies of cached solutions, down to the lists and compound terms
+        bound in them, so changing one cannot change the cache.
+        """
+        key = self._answer_key(goal)
+        generations = self._generations
+        solutions = cache.lookup(key, generations)
+        if solutions is None:
+            dependencies = tuple((name, generations.get(name, 0))
+                                 for name in sorted(self._query_depends_on(goal)))
+            solutions = []
+            for solution in self._solve_query(goal, None):
+                solutions.append(solution)
+                yield self._solution_copy(solution)
+            if all(generations.get(name, 0) == generation for name, generation in dependencies):
+                cache.store(key, solutions, dependencies)
+            return
+        for solution in solutions:
+            yield self._solution_copy(solution)
+
+    def _solution_copy(self, solution):
+        return Substitution({name: _copy_value(value) for name, value in solution.bindings.items()})
+
+    def _answer_key(self, goal):
+        """The answer cache key of a query: its variant key and variable names"""
+        names = {}
+        return self._variant_key(goal, names), tuple(names)
+
+    def _query_depends_on(self, goal):
+        """Predicates whose clauses a query's answers can depend on"""
+        deps = set()
+        stack = [goal]
+        while stack:
+            term = stack.pop()
+            if isinstance(term, Predicate):
+                deps |= self._table_depends_on(term.name)
+                stack.extend(term.args)
+            elif isinstance(term, list):
+                stack.extend(term)
+        return deps
+
+    def _snapshot(self, substitution, names):
+        """Copy the bindings of the named variables, resolving variable chains"""
+        bindings = substitution.bindings
+        return Substitution({name: self._resolve(bindings[name], substitution)
+                             for name in names if name in bindings})
+
+    def _collect_variables(self, term, names):
+        """Append the names of the logical variables occurring in a goal"""
+        from .ast_nodes import ASTNode
+
+        if isinstance(term, Term):
+            if term.is_variable:
+                names.append(term.value)
+        elif isinstance(term, Predicate):
+            for arg in term.args:
+                self._collect_variables(arg, names)
+        elif isinstance(term, (list, tuple)):
+            for item in term:
+                self._collect_variables(item, names)
+        elif isinstance(term, dict):
+            for item in term.values():
+                self._collect_variables(item, names)
+        elif isinstance(term, Variable):
+            names.append(term.name[1:] if term.name.startswith('?') else term.name)
+        elif isinstance(term, ASTNode):
+            # IsExpression and arithmetic nodes
+            for item in vars(term).values():
+                self._collect_variables(item, names)
+
+    def _resolve(self, term, substitution):
+        """Dereference a term, including the arguments of compounds and lists"""
+        term = self._deref(term, substitution)
+        if isinstance(term, Predicate):
+            return self._apply_substitution(term, substitution)
+        if isinstance(term, list):
+            return [self._resolve(item, substitution) for item in term]
+        return term
+
+    def first_solution(self, goal, substitution=None):
+        """Return the first solution of a query, or None if it has none"""
+        solutions = self.solve(goal, substitution)
+        try:
+            return next(solutions, None)
+        finally:
+            solutions.close()
+
+    def has_solution(self, goal, substitution=None):
+        """Check whether a query has at least one solution.
+
+        The search stops at the first proof and no snapshot of its bindings
+        is taken, so this costs no more than finding one solution. An answer
+        cache is consulted but not filled.
+        """
+        cache = self.answer_cache
+        if cache is not None and not (substitution and substitution.bindings):
+            solutions = cache.lookup(self._answer_key(goal), self._generations)
+            if solutions is not None:
+                return bool(solutions)
+        store = Substitution() if substitution is None else substitution.copy()
+        if len(self.call_stack) > self.max_depth:
+            raise RuntimeError("Maximum recursion depth exceeded")
+        self.call_stack.append(goal)
+        try:
+            return self._provable(goal, store)
+        finally:
+            self.call_stack.pop()
+
+    def _provable(self, goal, substitution):
+        """Whether a goal has a proof, leaving the substitution as it was.
+
+        Only the first proof is searched for; the alternatives left open are
+        closed and the bindings the proof made are undone.
+        """
+        mark = substitution.mark()
+        solutions = iter(self._solve_goal(goal, substitution))
+        try:
+            return next(solutions, None) is not None
+        finally:
+            close = getattr(solutions, 'close', None)
+            if close is not None:
+                close()
+            substitution.undo(mark)
     
     def _solve_goal(self, goal, substitution):
-        """Solve a single goal (predicate, IsExpression, or comparison)"""
-        from .ast_nodes import IsExpression
-
-        solutions = []
+        """Solve a single goal (predicate, IsExpression, or comparison).
 
+        Returns an iterator that yields the live substitution once per
+        solution. The bindings of a solution stay in place while the caller
+        works with it and are undone through the trail before the next
+        alternative is tried. Dispatching without being a generator itself
+        keeps one frame per goal off the Python stack.
+        """
         # Handle IsExpression: ?X is 5 + 3
         if isinstance(goal, IsExpression):
-            result = self._evaluate_is_expression(goal, substitution)
-            if result is not None:
-                solutions.append(result)
-            return solutions
+            return self._solve_is_expression(goal, substitution)
 
         # Handle comparison predicates: _compare_>, _compare_<, etc.
         if isinstance(goal, Predicate) and goal.name.startswith('_compare_'):
-            result = self._evaluate_comparison(goal, substitution)
-            if result is not None:
-                solutions.append(result)
-            return solutions
+            if self._evaluate_comparison(goal, substitution) is not None:
+                return (substitution,)
+            return ()
 
         # Handle built-in predicates
         if isinstance(goal, Predicate):
@@ -213,105 +1750,444 @@ class LogicalEngine:
             if goal.name == 'setof' and len(goal.args) == 3:
                 return self._handle_setof(goal, substitution)
 
-            # Handle not/1: not(?Goal) - negation as failure
-            if goal.name == 'not' and len(goal.args) == 1:
+            # Handle aggregate_all/3: aggregate_all(?Spec, ?Goal, ?Result)
+            if goal.name == 'aggregate_all' and len(goal.args) == 3:
+                return self._handle_aggregate_all(goal, substitution)
+
+            # Handle ^/2 outside bagof/setof: ?V ^ ?Goal just solves Goal
+            if goal.name == '^' and len(goal.args) == 2:
+                return self._solve_goal(self._deref(goal.args[1], substitution), substitution)
+
+            # Handle not/1 and \\+/1: not(?Goal) - negation as failure
+            if (goal.name == 'not' or goal.name == '\\+') and len(goal.args) == 1:
                 return self._handle_not(goal, substitution)
 
         # Apply current substitution to the goal
-        goal = self._apply_substitution(goal, substitution)
+        return self._solve_call(self._apply_substitution(goal, substitution), substitution)
 
-        pred_name = goal.name
-        if pred_name not in self.knowledge_base:
+    def _solve_call(self, goal, substitution):
+        """Solve a user predicate call whose arguments are already resolved"""
+        solutions = self._special_call(goal, substitution)
+        if solutions is not None:
             return solutions
+        return self._solve_clauses(goal, substitution)
+
+    def _special_call(self, goal, substitution):
+        """Solutions of a call answered without clause resolution, or None"""
+        if self.mode == "bottom_up" or goal.name in self.materialized:
+            model = self._materialization or self._build_materialization()
+            if goal.name in model.derived:
+                return model.solve(goal, substitution)
+        if goal.name in self.tabled:
+            return self._solve_tabled(goal, substitution)
+        return None
+
+    def _solve_is_expression(self, goal, substitution):
+        """Solve an 'is' goal, yielding at most one solution"""
+        mark = substitution.mark()
+        if self._evaluate_is_expression(goal, substitution) is not None:
+            yield substitution
+        substitution.undo(mark)
+
+    def _solve_clauses(self, goal, substitution, clauses=None):
+        """Resolve a goal against the knowledge base, returning its solutions.
+
+        ``clauses`` restricts the goal's own clauses to the given ones (an
+        OR-branch of the goal); calls in their bodies see the whole
+        knowledge base.
+        """
+        if self.compile_rules:
+            return self._run(goal, substitution, clauses)
+        return self._interpret_clauses(goal, substitution, clauses)
+
+    def _run(self, goal, substitution, clauses=None):
+        """Resolve a goal against the knowledge base without recursing in Python.
+
+        The search state is explicit: a continuation of compiled body goals
+        still to prove (_Goals, linked through ``next``) and a stack of choice
+        points. A call pushes a choice point over its candidate clauses, and
+        failure resumes the newest choice point after undoing the trail to
+        it. The last goal of a body is called with the parent's continuation
+        (last-call optimization) and the last candidate clause pops its
+        choice point, so deterministic recursion runs in constant Python
+        stack and bounded memory. A cut truncates the choice points to their
+        height at the call of its predicate.
+
+        Each rule call is counted one deeper than the rule whose body made
+        it, whether or not that rule's continuation is still kept, and a
+        call nested deeper than max_depth raises RuntimeError as the
+        recursive path does.
+
+        Builtins, comparisons and 'is' goals, and tabled or materialized
+        predicates, are solved by their handlers; their remaining solutions
+        become a choice point like any other.
+        """
+        choicepoints = []
+        trail = substitution.trail
+        start = len(trail)
+        knowledge_base = self.knowledge_base
+        reorder = self.reorder_goals
+        self._push_clauses(choicepoints, goal, None, substitution, len(self.call_stack), clauses)
+
+        while choicepoints:
+            # Backtrack into the newest choice point
+            choice = choicepoints[-1]
+            substitution.undo(choice.mark)
+            if choice.__class__ is _SolutionChoice:
+                if next(choice.solutions, None) is None:
+                    choicepoints.pop()
+                    continue
+                choice.mark = len(trail)
+                cont = choice.cont
+            else:
+                clause = choice.pending
+                choice.pending = next(choice.clauses, None)
+                if choice.pending is None:
+                    choicepoints.pop()
+                if isinstance(clause, Fact):
+                    if not self._match_fact(choice.goal.args, clause.predicate.args, substitution):
+                        continue
+                    cont = choice.cont
+                else:
+                    template = clause.template
+                    if template is None:
+                        template = clause.template = RuleTemplate(clause)
+                    if reorder:
+                        template = self._planned_template(clause, choice.goal)
+                    frame = template.new_frame()
+                    suffix = next(_rename_counter)
+                    if not template.head(self, choice.goal.args, frame, suffix, substitution):
+                        continue
+                    cont = choice.cont
+                    if template.goals:
+                        cont = _Goals(template, 0, frame, suffix, choice.cut_height, choice.depth, cont)
+
+            # Run the continuation forward until it needs a choice point
+            while True:
+                if cont is None:
+                    yield substitution
+                    break
+                template = cont.template
+                position = cont.position
+                kind, run = template.goals[position]
+                if position + 1 < len(template.goals):
+                    rest = _Goals(template, position + 1, cont.frame, cont.suffix,
+                                  cont.cut_height, cont.depth, cont.next)
+                else:
+                    rest = cont.next  # Last call: nothing of this rule call is kept
+
+                if kind is _CUT:
+                    del choicepoints[cont.cut_height:]
+                    cont = rest
+                    continue
+                if kind is _CALL:
+                    call = run(self, cont.frame, cont.suffix, substitution)
+                    solutions = self._special_call(call, substitution)
+                    if solutions is None:
+                        if call.name in knowledge_base:
+                            self._push_clauses(choicepoints, call, rest, substitution, cont.depth + 1)
+                        break
+                else:
+                    solutions = run(self, cont.frame, cont.suffix, substitution)
+
+                if solutions.__class__ is tuple:
+                    # Deterministic handler (comparison): no choice point needed
+                    if not solutions:
+                        break
+                    cont = rest
+                    continue
+                choicepoints.append(_SolutionChoice(solutions, len(trail), rest))
+                break
+
+        # The last alternatives ran without a choice point to undo them
+        substitution.undo(start)
+
+    def _push_clauses(self, choicepoints, goal, cont, substitution, depth, clauses=None):
+        """Push a choice point over the clauses that may match a call nested ``depth`` rule calls deep"""
+        if goal.name not in self.knowledge_base:
+            return
+        if depth > self.max_depth:
+            raise RuntimeError("Maximum recursion depth exceeded")
+        clauses = iter(self._candidate_clauses(goal) if clauses is None else clauses)
+        first = next(clauses, None)
+        if first is not None:
+            choicepoints.append(_ClauseChoice(goal, clauses, first, len(substitution.trail),
+                                              cont, len(choicepoints), depth))
+
+    def _interpret_clauses(self, goal, substitution, clauses=None):
+        """Resolve a goal by walking the rules' terms, recursing per call.
 
-        # Try to unify with facts and rules
-        for item in self.knowledge_base[pred_name]:
+        This is the path of LogicalEngine(compile_rules=False).
+        """
+        pred_name = goal.name
+        if pred_name not in self.knowledge_base:
+            return
+
+        # Try to unify with the facts and rules the index selects
+        mark = substitution.mark()
+        barrier = _CutBarrier()
+        if clauses is None:
+            clauses = self._candidate_clauses(goal)
+        for item in clauses:
             if isinstance(item, Fact):
                 # Try to unify with the fact
-                new_sub = self._unify(goal, item.predicate, substitution.copy())
-                if new_sub is not None:
-                    solutions.append(new_sub)
+                if self._unify(goal, item.predicate, substitution) is not None:
+                    yield substitution
+                substitution.undo(mark)
 
             elif isinstance(item, Rule):
                 # Try to prove the rule
-                rule_solutions = self._prove_rule(item, goal, substitution)
-                solutions.extend(rule_solutions)
-
-        return solutions
+                yield from self._prove_rule(item, goal, substitution, barrier)
+                if barrier.cuts:
+                    # The clause cut: the remaining clauses are never tried
+                    return
     
-    def _prove_rule(self, rule, goal, substitution):
-        """Prove a rule"""
-        solutions = []
-
-        # Rename variables in the rule to avoid conflicts
-        renamed_rule = self._rename_variables(rule)
-        var_mapping = self.var_mapping.copy()  # Save the mapping
+    def _match_fact(self, args, fact_args, substitution):
+        """Unify resolved goal arguments with a fact's arguments.
 
-        # Unify the goal with the rule head
-        head_sub = self._unify(goal, renamed_rule.head, substitution)
-        if head_sub is None:
-            return solutions
+        Constant fact arguments against constants or unbound variables, by
+        far the common case, are decided inline; anything else goes through
+        _unify.
+        """
+        if len(args) != len(fact_args):
+            return False
+        bindings = substitution.bindings
+        for arg, fact_arg in zip(args, fact_args):
+            if arg is fact_arg:
+                continue
+            if arg.__class__ is Term and fact_arg.__class__ is Term and not fact_arg.is_variable:
+                if not arg.is_variable:
+                    if arg.value != fact_arg.value:
+                        return False
+                    continue
+                if arg.value not in bindings:
+                    substitution.bind(arg.value, fact_arg)
+                    continue
+            if self._unify(arg, fact_arg, substitution) is None:
+                return False
+        return True
+
+    def _solve_tabled(self, goal, substitution):
+        """Solve a call of a tabled predicate through its answer table.
+
+        A new call variant is evaluated to a fixpoint before its answers are
+        returned (linear tabling): recursive calls of a variant that is still
+        being evaluated consume the answers found so far, and the evaluation
+        is repeated until no new answers appear. Tables that consumed an
+        older incomplete table belong to that table's SCC and are completed
+        together with it.
+        """
+        tables = self.tables.setdefault(goal.name, {})
+        key = self._variant_key(goal, {})
+        table = tables.get(key)
+        if table is None:
+            table = tables[key] = _Table()
+
+        if not table.complete:
+            if table.depth is not None:
+                # Recursive variant call: its SCC leader is this table
+                self._incomplete_reads += 1
+                for evaluating in self._table_stack[table.depth:]:
+                    evaluating.leader = min(evaluating.leader, table.depth)
+                yield from self._consume_answers(table, goal, substitution)
+                return
+            self._evaluate_table(table, goal, substitution)
+
+        yield from self._consume_answers(table, goal, substitution)
+
+    def _evaluate_table(self, table, goal, substitution):
+        """Run a tabled call variant to a fixpoint, filling its answer table"""
+        if not self._table_stack:
+            # Left over from an evaluation that raised
+            del self._table_scc[:]
+        depth = table.depth = table.leader = len(self._table_stack)
+        scc_start = len(self._table_scc)
+        self._table_stack.append(table)
+        try:
+            while True:
+                reads = self._incomplete_reads
+                added = self._answers_added
+                for _ in self._solve_clauses(goal, substitution):
+                    self._add_answer(table, self._resolve(goal, substitution))
+                # Nothing read a partial table, or no table gained an answer:
+                # another pass would derive the same answers
+                if self._incomplete_reads == reads or self._answers_added == added:
+                    break
+        finally:
+            self._table_stack.pop()
+            table.depth = None
+
+        if table.leader < depth:
+            # Part of an older table's SCC: complete together with it
+            self._table_scc.append(table)
+            return
+        table.complete = True
+        for member in self._table_scc[scc_start:]:
+            member.complete = True
+        del self._table_scc[scc_start:]
+
+    def _add_answer(self, table, answer):
+        """Record an answer in a table unless a variant of it is already there"""
+        var_numbers = {}
+        key = self._variant_key(answer, var_numbers)
+        if key in table.answer_keys:
+            return
+        table.answer_keys.add(key)
+        table.answers.append((answer, bool(var_numbers)))
+        self._answers_added += 1
+
+    def _consume_answers(self, table, goal, substitution):
+        """Unify a goal with the answers of a table, including answers added meanwhile"""
+        mark = substitution.mark()
+        answers = table.answers
+        i = 0
+        while i < len(answers):
+            answer, has_variables = answers[i]
+            i += 1
+            if has_variables:
+                answer = self._rename_apart(answer, {}, next(_rename_counter))
+            if self._unify(goal, answer, substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+
+    def _variant_key(self, term, var_numbers):
+        """Hashable key equal for terms that are identical up to variable renaming"""
+        if isinstance(term, Term):
+            if term.is_variable:
+                number = var_numbers.get(term.value)
+                if number is None:
+                    number = var_numbers[term.value] = len(var_numbers)
+                return ('v', number)
+            return self._variant_key(term.value, var_numbers) if isinstance(term.value, list) else ('c', term.value)
+        if isinstance(term, Predicate):
+            return ('p', term.name, tuple(self._variant_key(arg, var_numbers) for arg in term.args))
+        if isinstance(term, list):
+            return ('l', tuple(self._variant_key(item, var_numbers) for item in term))
+        if isinstance(term, dict) and 'list_pattern' in term:
+            return ('lp', self._variant_key(term['head'], var_numbers),
+                    self._variant_key(term['tail'], var_numbers))
+        try:
+            hash(term)
+        except TypeError:
+            return ('r', repr(term))
+        return ('c', term)
 
-        # Prove the body
-        body_solutions = self._prove_body(renamed_rule.body, head_sub)
+    def _rename_apart(self, term, mapping, suffix):
+        """Copy a stored answer with fresh variables"""
+        if isinstance(term, Term) and term.is_variable:
+            renamed = mapping.get(term.value)
+            if renamed is None:
+                renamed = mapping[term.value] = Term(f"{term.value}#{suffix}", is_variable=True)
+            return renamed
+        if isinstance(term, Predicate):
+            return Predicate(term.name, [self._rename_apart(arg, mapping, suffix) for arg in term.args])
+        if isinstance(term, list):
+            return [self._rename_apart(item, mapping, suffix) for item in term]
+        return term
 
-        # Map renamed variables back to original variables
-        for sol in body_solutions:
-            for renamed_var, original_var in var_mapping.items():
-                if renamed_var in sol.bindings:
-                    sol.bindings[original_var] = sol.bindings[renamed_var]
-            solutions.append(sol)
+    def _prove_rule(self, rule, goal, substitution, barrier=None):
+        """Prove a rule, yielding the live substitution per solution.
 
-        return solutions
+        ``barrier`` is the cut barrier of the predicate invocation the rule
+        belongs to.
+        """
+        # One frame per call stands in for renaming the rule's variables;
+        # the goal's own variables resolve through the frame's values
+        template = rule.template
+        if template is None:
+            template = rule.template = RuleTemplate(rule)
+        if self.reorder_goals:
+            template = self._planned_template(rule, goal)
+        frame = template.new_frame()
+        suffix = next(_rename_counter)
+
+        if barrier is None:
+            barrier = _CutBarrier()
+
+        # Unify the goal with the rule head and prove the body
+        mark = substitution.mark()
+        if self._unify_head(goal, template, frame, suffix, substitution) is not None:
+            instantiate = lambda g: template.instantiate(g, frame, suffix)
+            yield from self._prove_body(template.body, substitution, instantiate, barrier)
+        substitution.undo(mark)
+
+    def _unify_head(self, goal, template, frame, suffix, substitution):
+        """Unify a goal with a compiled rule head, filling the call's frame"""
+        if len(goal.args) != len(template.head_args):
+            return None
+        for goal_arg, head_arg in zip(goal.args, template.head_args):
+            cls = head_arg.__class__
+            if cls is _Slot:
+                value = frame[head_arg.index]
+                if value is None:
+                    # First occurrence: the variable just takes the argument
+                    frame[head_arg.index] = goal_arg
+                    continue
+                head_arg = value
+            elif cls is _Template:
+                head_arg = template.instantiate(head_arg, frame, suffix)
+            if self._unify(goal_arg, head_arg, substitution) is None:
+                return None
+        return substitution
     
-    def _prove_body(self, body, substitution):
-        """Prove a list of goals (conjunction) with cut support"""
+    def _prove_body(self, body, substitution, instantiate=None, barrier=None):
+        """Prove a list of goals (conjunction) with cut support, yielding per solution.
+
+        ``instantiate`` builds a compiled rule-body goal when it is reached.
+        A cut counts itself on ``barrier``; every goal to its left sees the
+        count change when backtracking returns to it and drops its remaining
+        alternatives at once, as does the invocation's clause loop.
+        """
         from .ast_nodes import Cut
 
         if not body:
-            return [substitution]
+            yield substitution
+            return
 
-        solutions = []
         first_goal = body[0]
         rest_goals = body[1:]
 
-        # Handle cut operator
         if isinstance(first_goal, Cut):
-            # Cut prevents backtracking
-            # Execute remaining goals without allowing backtracking
-            if rest_goals:
-                rest_solutions = self._prove_body(rest_goals, substitution)
-                # Return only the first solution (or all solutions from remaining goals)
-                # but prevent backtracking to alternative clauses
-                return rest_solutions
-            else:
-                return [substitution]
+            if barrier is not None:
+                barrier.cuts += 1
+            yield from self._prove_body(rest_goals, substitution, instantiate, barrier)
+            return
 
-        # Solve the first goal
-        first_solutions = self._solve_goal(first_goal, substitution)
+        if instantiate is not None:
+            first_goal = instantiate(first_goal)
 
-        # Check if there's a cut in the remaining goals
-        has_cut = any(isinstance(g, Cut) for g in rest_goals)
+        # Only a cut later in this body can prune this goal's alternatives
+        cuts = None
+        if barrier is not None and any(isinstance(g, Cut) for g in rest_goals):
+            cuts = barrier.cuts
 
-        # For each solution, solve the rest
-        for sol in first_solutions:
-            if rest_goals:
-                rest_solutions = self._prove_body(rest_goals, sol)
-                solutions.extend(rest_solutions)
+        # For each solution of the first goal, solve the rest
+        mark = substitution.mark()
+        for _ in self._solve_goal(first_goal, substitution):
+            if not rest_goals:
+                yield substitution
+                continue
 
-                # If we found a cut in the remaining goals, stop backtracking
-                if has_cut and rest_solutions:
-                    break
-            else:
-                solutions.append(sol)
+            yield from self._prove_body(rest_goals, substitution, instantiate, barrier)
+            if cuts is not None and barrier.cuts != cuts:
+                break
+
+        # Undo whatever an abandoned (cut) alternative left bound
+        substitution.undo(mark)
 
-        return solutions
-    
     def _unify(self, term1, term2, substitution):
         """Unify two terms with support for list patterns [H|T]"""
         # Apply substitution
         term1 = self._deref(term1, substitution)
         term2 = self._deref(term2, substitution)
+        if term1 is term2:
+            return substitution
+
+        # Resolved goals carry bound lists as constant Terms: unify the lists
+        if term1.__class__ is Term and term1.value.__class__ is list and not term1.is_variable:
+            term1 = term1.value
+        if term2.__class__ is Term and term2.value.__class__ is list and not term2.is_variable:
+            term2 = term2.value
 
         # Handle list pattern unification
         # Case 1: ListPattern with list
@@ -424,15 +2300,12 @@ class LogicalEngine:
     
     def _deref(self, term, substitution):
         """Dereference a term by following variable bindings"""
-        if isinstance(term, Term) and term.is_variable:
+        # A loop rather than recursion: binding chains can be arbitrarily long
+        while isinstance(term, Term) and term.is_variable:
             value = substitution.lookup(term.value)
-            if value is not None:
-                # If value is a Term, dereference it recursively
-                if isinstance(value, Term):
-                    return self._deref(value, substitution)
-                else:
-                    # If value is a string, return it as is
-                    return value
+            if value is None:
+                break
+            term = value
         return term
     
     def _occurs_check(self, var_name, term, substitution):
@@ -452,66 +2325,85 @@ class LogicalEngine:
     def _apply_substitution(self, term, substitution):
         """Apply substitution to a term"""
         if isinstance(term, Predicate):
-            new_args = []
-            for arg in term.args:
-                deref_arg = self._deref(arg, substitution)
-                if isinstance(deref_arg, Predicate):
-                    new_args.append(self._apply_substitution(deref_arg, substitution))
-                elif isinstance(deref_arg, Term):
-                    new_args.append(deref_arg)
-                else:
-                    # If it's a string, convert it to a Term
-                    new_args.append(Term(deref_arg, is_variable=False))
-            return Predicate(term.name, new_args)
+            return Predicate(term.name, [self._resolve_argument(arg, substitution) for arg in term.args])
 
         deref_term = self._deref(term, substitution)
         if isinstance(deref_term, Term):
             return deref_term
         else:
             # If it's a string, convert it to a Term
-            return Term(deref_term, is_variable=False)
+            return atom(deref_term)
     
-    def _rename_variables(self, rule):
-        """Rename variables in a rule to avoid conflicts"""
-        import time
-        suffix = str(int(time.time() * 1000000) % 1000000)
-        self.var_mapping = {}  # Store mapping from renamed to original
-
-        def rename_term(term):
-            if isinstance(term, Term) and term.is_variable:
-                renamed = f"{term.value}_{suffix}"
-                self.var_mapping[renamed] = term.value  # Store mapping
-                return Term(renamed, is_variable=True)
-            elif isinstance(term, Predicate):
-                new_args = [rename_term(arg) for arg in term.args]
-                return Predicate(term.name, new_args)
-            return term
-
-        new_head = rename_term(rule.head)
-        new_body = [rename_term(goal) for goal in rule.body]
-
-        return Rule(new_head, new_body)
+    def _resolve_argument(self, arg, substitution):
+        """Apply substitution to one argument of a goal"""
+        deref_arg = self._deref(arg, substitution)
+        if isinstance(deref_arg, Predicate):
+            return self._apply_substitution(deref_arg, substitution)
+        if isinstance(deref_arg, Term):
+            return deref_arg
+        # If it's a string, convert it to a Term
+        return atom(deref_arg)
+
+    def _numeric_value(self, value, substitution):
+        """Return the number a bound argument denotes, or None"""
+        if value.__class__ is Term:
+            if not value.is_variable:
+                return _number(value.value)
+            value = self._deref(value, substitution)
+            if value.__class__ is Term:
+                return None if value.is_variable else _number(value.value)
+        cls = value.__class__
+        if cls is int or cls is float:
+            return value
+        return self._evaluate_arithmetic(value, substitution)
 
     def _evaluate_is_expression(self, is_expr, substitution):
         """Evaluate an 'is' expression: ?X is 5 + 3"""
-        from .ast_nodes import BinaryOp, Number, Variable
-
         # Evaluate the arithmetic expression
         result = self._evaluate_arithmetic(is_expr.expression, substitution)
 
         if result is None:
             return None
 
-        # Unify the variable with the result
-        new_sub = self._unify(is_expr.variable, result, substitution.copy())
-        return new_sub
+        # Unify the variable with the result (the caller undoes the binding)
+        return self._unify_number(is_expr.variable, result, substitution)
+
+    def _unify_number(self, target, value, substitution):
+        """Bind the target of an 'is' goal to its value; a bound target is compared as a number"""
+        target = self._deref(target, substitution)
+        if target.__class__ is Term and target.is_variable:
+            substitution.bind(target.value, value)
+            return substitution
+        return substitution if self._numeric_value(target, substitution) == value else None
 
     def _evaluate_arithmetic(self, expr, substitution):
-        """Evaluate an arithmetic expression"""
-        from .ast_nodes import BinaryOp, Number, Variable, UnaryOp
+        """Evaluate an arithmetic expression, or return None if it has no value.
+
+        Rule bodies are compiled to closures by RuleTemplate; this walks the
+        expression tree of goals that are not part of a compiled rule.
+        """
+        cls = expr.__class__
+
+        # Handle Terms
+        if cls is Term:
+            if expr.is_variable:
+                value = substitution.lookup(expr.value)
+                if value is not None:
+                    return self._evaluate_arithmetic(value, substitution)
+                return None
+            return _number(expr.value)
+
+        # Handle binary operations
+        if cls is BinaryOp:
+            left = self._evaluate_arithmetic(expr.left, substitution)
+            right = self._evaluate_arithmetic(expr.right, substitution)
+            op = _ARITHMETIC_OPERATORS.get(expr.operator)
+            if left is None or right is None or op is None:
+                return None
+            return op(left, right)
 
         # Handle numbers
-        if isinstance(expr, Number):
+        if cls is Number:
             return expr.value
 
         # Handle plain numbers (int/float)
@@ -519,7 +2411,7 @@ class LogicalEngine:
             return expr
 
         # Handle variables
-        if isinstance(expr, Variable):
+        if cls is Variable:
             var_name = expr.name
             if var_name.startswith('?'):
                 var_name = var_name[1:]
@@ -528,66 +2420,22 @@ class LogicalEngine:
                 return self._evaluate_arithmetic(value, substitution)
             return None
 
-        # Handle Terms
-        if isinstance(expr, Term):
-            if expr.is_variable:
-                value = substitution.lookup(expr.value)
-                if value is not None:
-                    return self._evaluate_arithmetic(value, substitution)
-                return None
-            else:
-                # Try to convert to number
-                try:
-                    return float(expr.value) if '.' in str(expr.value) else int(expr.value)
-                except:
-                    return None
-
-        # Handle binary operations
-        if isinstance(expr, BinaryOp):
-            left = self._evaluate_arithmetic(expr.left, substitution)
-            right = self._evaluate_arithmetic(expr.right, substitution)
-
-            if left is None or right is None:
-                return None
-
-            op = expr.operator
-            if op == '+':
-                return left + right
-            elif op == '-':
-                return left - right
-            elif op == '*':
-                return left * right
-            elif op == '/':
-                return left / right if right != 0 else None
-            elif op == '%':
-                return left % right if right != 0 else None
-            elif op == '**':
-                return left ** right
-            else:
-                return None
-
         # Handle unary operations
-        if isinstance(expr, UnaryOp):
+        if cls is UnaryOp:
             operand = self._evaluate_arithmetic(expr.operand, substitution)
-            if operand is None:
-                return None
-
-            if expr.operator == '-':
-                return -operand
-            elif expr.operator == '+':
-                return operand
-            else:
+            op = _UNARY_OPERATORS.get(expr.operator)
+            if operand is None or op is None:
                 return None
+            return op(operand)
 
         return None
 
     def _evaluate_comparison(self, comp_pred, substitution):
         """Evaluate a comparison predicate: _compare_>, _compare_<, etc."""
-        # Extract operator from predicate name
-        op = comp_pred.name.replace('_compare_', '')
+        compare = _COMPARISON_OPERATORS.get(comp_pred.name[len('_compare_'):])
 
         # Get the two arguments
-        if len(comp_pred.args) != 2:
+        if compare is None or len(comp_pred.args) != 2:
             return None
 
         left = self._evaluate_arithmetic(comp_pred.args[0], substitution)
@@ -596,26 +2444,18 @@ class LogicalEngine:
         if left is None or right is None:
             return None
 
-        # Perform comparison
-        result = False
-        if op == '>':
-            result = left > right
-        elif op == '<':
-            result = left < right
-        elif op == '>=':
-            result = left >= right
-        elif op == '<=':
-            result = left <= right
-        elif op == '==':
-            result = left == right
-        elif op == '!=':
-            result = left != right
-
         # If comparison succeeds, return the substitution unchanged
-        if result:
+        if compare(left, right):
             return substitution
-        else:
-            return None
+        return None
+
+    def _instantiate_template(self, template, solution):
+        """Instantiate a findall/bagof/setof template with one solution"""
+        instantiated = self._apply_substitution(template, solution)
+        # Convert Term to actual value
+        if isinstance(instantiated, Term):
+            return instantiated.value
+        return instantiated
 
     def _handle_findall(self, findall_pred, substitution):
         """Handle findall/3: findall(?Template, ?Goal, ?Result)
@@ -629,127 +2469,154 @@ class LogicalEngine:
         goal = findall_pred.args[1]
         result_var = findall_pred.args[2]
 
-        # Find all solutions to the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # Collect instantiated templates
-        results = []
-        for sol in solutions:
-            instantiated = self._apply_substitution(template, sol)
-            # Convert Term to actual value
-            if isinstance(instantiated, Term):
-                results.append(instantiated.value)
-            else:
-                results.append(instantiated)
+        # Instantiate the template for each solution as it is produced
+        results = [self._instantiate_template(template, substitution)
+                   for _ in self._solve_goal(goal, substitution)]
 
         # Unify the result with the result variable
-        new_sub = self._unify(result_var, results, substitution.copy())
-
-        if new_sub is not None:
-            return [new_sub]
-        return []
+        mark = substitution.mark()
+        if self._unify(result_var, results, substitution) is not None:
+            yield substitution
+        substitution.undo(mark)
 
     def _handle_bagof(self, bagof_pred, substitution):
         """Handle bagof/3: bagof(?Template, ?Goal, ?Result)
 
-        Like findall, but fails if there are no solutions.
-        Collects all solutions of Goal and instantiates Template for each,
-        returning the list in Result.
+        Like findall, but fails if there are no solutions. Variables of Goal
+        that are neither in Template nor marked existential (?V ^ Goal) are
+        free: the solutions are grouped by the values of the free variables,
+        and bagof succeeds once per group, binding them.
 
-        Example: bagof(?X, parent(?X, john), ?List)
+        Example: bagof(?C, parent(?P, ?C), ?List) gives one ?List per ?P
         """
-        template = bagof_pred.args[0]
-        goal = bagof_pred.args[1]
-        result_var = bagof_pred.args[2]
-
-        # Find all solutions to the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # bagof fails if there are no solutions (unlike findall)
-        if not solutions:
-            return []
-
-        # Collect instantiated templates
-        results = []
-        for sol in solutions:
-            instantiated = self._apply_substitution(template, sol)
-            # Convert Term to actual value
-            if isinstance(instantiated, Term):
-                results.append(instantiated.value)
-            else:
-                results.append(instantiated)
-
-        # Unify the result with the result variable
-        new_sub = self._unify(result_var, results, substitution.copy())
-
-        if new_sub is not None:
-            return [new_sub]
-        return []
+        template, goal, result_var = bagof_pred.args
+        return self._solve_collection(template, goal, result_var, substitution, unique=False)
 
     def _handle_setof(self, setof_pred, substitution):
         """Handle setof/3: setof(?Template, ?Goal, ?Result)
 
-        Like bagof, but removes duplicates and sorts the results.
-        Fails if there are no solutions.
+        Like bagof, but each group's results are deduplicated and sorted in
+        standard order.
 
         Example: setof(?X, parent(?X, john), ?List)
         """
-        template = setof_pred.args[0]
-        goal = setof_pred.args[1]
-        result_var = setof_pred.args[2]
-
-        # Find all solutions to the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # setof fails if there are no solutions
-        if not solutions:
-            return []
-
-        # Collect instantiated templates
-        results = []
-        for sol in solutions:
-            instantiated = self._apply_substitution(template, sol)
-            # Convert Term to actual value
-            if isinstance(instantiated, Term):
-                results.append(instantiated.value)
+        template, goal, result_var = setof_pred.args
+        return self._solve_collection(template, goal, result_var, substitution, unique=True)
+
+    def _solve_collection(self, template, goal, result_var, substitution, unique):
+        """Solve bagof/setof, grouping Goal's solutions by a hash of their free variables"""
+        bound, goal = self._strip_existential(goal, substitution)
+        free = [Term(name, is_variable=True)
+                for name in self._free_variables(goal, [template, bound], substitution)]
+
+        groups = {}  # {witness key: (witness, results)}
+        for _ in self._solve_goal(goal, substitution):
+            witness = [self._resolve(var, substitution) for var in free]
+            key = tuple(map(_standard_order, witness))
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = (witness, {} if unique else [])
+            item = self._instantiate_template(template, substitution)
+            if unique:
+                group[1].setdefault(_standard_order(item), item)
             else:
-                results.append(instantiated)
-
-        # Remove duplicates and sort
-        # Convert to set to remove duplicates, then back to sorted list
-        try:
-            unique_results = list(set(results))
-            unique_results.sort()
-        except TypeError:
-            # If items are not sortable (e.g., mixed types), just remove duplicates
-            unique_results = []
-            seen = set()
-            for item in results:
-                if item not in seen:
-                    unique_results.append(item)
-                    seen.add(item)
-
-        # Unify the result with the result variable
-        new_sub = self._unify(result_var, unique_results, substitution.copy())
-
-        if new_sub is not None:
-            return [new_sub]
-        return []
+                group[1].append(item)
+
+        # Groups come out in standard order of their witnesses
+        for key in sorted(groups):
+            witness, results = groups[key]
+            if unique:
+                results = [results[k] for k in sorted(results)]
+            mark = substitution.mark()
+            if all(self._unify(var, value, substitution) is not None for var, value in zip(free, witness)) \
+                    and self._unify(result_var, results, substitution) is not None:
+                yield substitution
+            substitution.undo(mark)
+
+    def _handle_aggregate_all(self, aggregate_pred, substitution):
+        """Handle aggregate_all/3: aggregate_all(?Spec, ?Goal, ?Result)
+
+        Folds the solutions of Goal as they are produced, so only the running
+        aggregate is kept. Spec is one of count, sum(Expr), max(Expr),
+        min(Expr), bag(Template) or set(Template). With no solutions count and
+        sum give 0, bag and set give [], and max and min fail.
+
+        Example: aggregate_all(sum(?S), score(?P, ?S), ?Total)
+        """
+        spec, goal, result_var = aggregate_pred.args
+        spec = self._deref(spec, substitution)
+        _, goal = self._strip_existential(goal, substitution)
+        kind = spec.value if isinstance(spec, Term) and not spec.is_variable else None
+        if isinstance(spec, Predicate) and len(spec.args) <= 1:
+            kind = spec.name
+        arg = spec.args[0] if isinstance(spec, Predicate) and spec.args else None
+        if (kind == 'count') != (arg is None) or kind not in ('count', 'sum', 'max', 'min', 'bag', 'set'):
+            raise ValueError(f"Unknown aggregate_all specification: {spec}")
+
+        mark = substitution.mark()
+        solutions = self._solve_goal(goal, substitution)
+        if kind == 'count':
+            result = 0
+            for _ in solutions:
+                result += 1
+        elif kind == 'bag':
+            result = [self._instantiate_template(arg, substitution) for _ in solutions]
+        elif kind == 'set':
+            unique = {}
+            for _ in solutions:
+                item = self._instantiate_template(arg, substitution)
+                unique.setdefault(_standard_order(item), item)
+            result = [unique[k] for k in sorted(unique)]
+        else:
+            result = 0 if kind == 'sum' else None
+            for _ in solutions:
+                value = self._evaluate_arithmetic(arg, substitution)
+                if value is None:
+                    # A non-numeric value makes the whole aggregate fail
+                    result = None
+                    break
+                if kind == 'sum':
+                    result += value
+                elif result is None or (value > result if kind == 'max' else value < result):
+                    result = value
+            substitution.undo(mark)
+            if result is None:
+                return
+
+        if self._unify(result_var, result, substitution) is not None:
+            yield substitution
+        substitution.undo(mark)
+
+    def _strip_existential(self, goal, substitution):
+        """Split ?V ^ Goal into the existential terms and the inner goal"""
+        bound = []
+        goal = self._deref(goal, substitution)
+        while isinstance(goal, Predicate) and goal.name == '^' and len(goal.args) == 2:
+            bound.append(goal.args[0])
+            goal = self._deref(goal.args[1], substitution)
+        return bound, goal
+
+    def _free_variables(self, goal, excluded, substitution):
+        """Names of the unbound variables of a goal that do not occur in ``excluded``"""
+        def unbound(term):
+            names = []
+            self._collect_variables(term, names)
+            reached = []
+            for name in dict.fromkeys(names):
+                self._collect_variables(self._resolve(Term(name, is_variable=True), substitution), reached)
+            return dict.fromkeys(reached)
+
+        skip = unbound(excluded)
+        return [name for name in unbound(goal) if name not in skip]
 
     def _handle_not(self, not_pred, substitution):
-        """Handle not/1: not(?Goal) - negation as failure
+        """Handle not/1 and \\+/1: not(?Goal) - negation as failure
 
-        Succeeds if Goal fails, fails if Goal succeeds.
+        Succeeds if Goal fails, fails if Goal succeeds. Only the first
+        solution of Goal is ever computed.
 
         Example: not(parent(john, mary))
         """
-        goal = not_pred.args[0]
-
-        # Try to solve the goal
-        solutions = self._solve_goal(goal, substitution)
-
-        # Negation as failure: succeed if no solutions found
-        if len(solutions) == 0:
-            return [substitution]
-        return []
-
+        # Negation as failure: succeed if Goal has no proof
+        if not self._provable(not_pred.args[0], substitution):
+            yield substitution
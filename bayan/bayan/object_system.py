@@ -41,48 +41,11 @@ class BayanObject:
                 self.interpreter._owner_stack = []
             self.interpreter._owner_stack.append(owner)
             try:
-                # Bind arguments to parameters with support for defaults
-                from .ast_nodes import Parameter
-
-                # Collect parameters (excluding 'self')
-                regular_params = []
-                varargs_param = None
-                kwargs_param = None
-
-                for param in constructor.parameters:
-                    if isinstance(param, Parameter):
-                        if param.name == 'self':
-                            continue
-                        if param.is_varargs:
-                            varargs_param = param.name
-                        elif param.is_kwargs:
-                            kwargs_param = param.name
-                        else:
-                            regular_params.append(param)
-                    else:
-                        # Legacy format: parameter is just a string
-                        if param == 'self':
-                            continue
-                        regular_params.append(param)
-
-                # Bind regular positional arguments
-                arg_index = 0
-                for param in regular_params:
-                    param_name = param.name if isinstance(param, Parameter) else param
-                    if arg_index < len(arguments):
-                        self.interpreter.local_env[param_name] = arguments[arg_index]
-                        arg_index += 1
-                    elif isinstance(param, Parameter) and param.has_default():
-                        self.interpreter.local_env[param_name] = self.interpreter.interpret(param.default_value)
-
-                # Bind extra positional arguments to *args
-                if varargs_param:
-                    extra_args = arguments[arg_index:]
-                    self.interpreter.local_env[varargs_param] = tuple(extra_args)
-
-                # Bind **kwargs
-                if kwargs_param:
-                    self.interpreter.local_env[kwargs_param] = named_arguments or {}
+                signature = constructor.method_signature
+                signature.bind(self.interpreter, self.interpreter.local_env, arguments, named_arguments)
+                if signature.varargs is not None:
+                    # A constructor's *args is a tuple
+                    self.interpreter.local_env[signature.varargs] = tuple(self.interpreter.local_env[signature.varargs])
 
                 # Execute constructor body
                 self.interpreter.interpret(constructor.body)
@@ -118,70 +81,8 @@ class BayanObject:
         self.interpreter._owner_stack.append(owner)
 
         try:
-            # Bind arguments to parameters with support for defaults, named arguments, *args, and **kwargs
-            from .ast_nodes import Parameter
-
-            # Collect parameter names but skip implicit 'self'
-            param_names = []
-            varargs_param = None
-            kwargs_param = None
-
-            for param in method.parameters:
-                if isinstance(param, Parameter):
-                    if param.name == 'self':
-                        continue
-                    if param.is_kwargs:
-                        kwargs_param = param.name
-                    elif param.is_varargs:
-                        varargs_param = param.name
-                    else:
-                        param_names.append(param.name)
-                else:
-                    # Legacy format: parameter is just a string
-                    if param == 'self':
-                        continue
-                    param_names.append(param)
-
-            # Bind positional arguments (excluding 'self')
-            positional_count = 0
-            for i, arg in enumerate(arguments):
-                if i < len(param_names):
-                    self.interpreter.local_env[param_names[i]] = arg
-                    positional_count += 1
-                elif varargs_param:
-                    # Extra positional arguments go to *args
-                    if varargs_param not in self.interpreter.local_env:
-                        self.interpreter.local_env[varargs_param] = []
-                    self.interpreter.local_env[varargs_param].append(arg)
-                else:
-                    raise RuntimeError(f"Too many positional arguments for method {method_name}")
-
-            # Initialize *args if it exists and wasn't populated
-            if varargs_param and varargs_param not in self.interpreter.local_env:
-                self.interpreter.local_env[varargs_param] = []
-
-            # Bind named arguments
-            for name, value in named_arguments.items():
-                if name in param_names:
-                    self.interpreter.local_env[name] = value
-                elif kwargs_param:
-                    # Extra named arguments go to **kwargs
-                    if kwargs_param not in self.interpreter.local_env:
-                        self.interpreter.local_env[kwargs_param] = {}
-                    self.interpreter.local_env[kwargs_param][name] = value
-                else:
-                    raise RuntimeError(f"Unexpected keyword argument: {name}")
-
-            # Initialize **kwargs if it exists and wasn't populated
-            if kwargs_param and kwargs_param not in self.interpreter.local_env:
-                self.interpreter.local_env[kwargs_param] = {}
-
-            # Bind default values for missing parameters (excluding 'self')
-            for param in method.parameters:
-                if isinstance(param, Parameter):
-                    if not param.is_varargs and not param.is_kwargs:
-                        if param.name != 'self' and param.name not in self.interpreter.local_env and param.has_default():
-                            self.interpreter.local_env[param.name] = self.interpreter.interpret(param.default_value)
+            method.method_signature.bind(self.interpreter, self.interpreter.local_env,
+                                         arguments, named_arguments)
 
             # Execute method body
             result = self.interpreter.interpret(method.body)
@@ -0,0 +1,162 @@
+"""
+Parallel query evaluation across worker processes
+تقييم الاستعلامات بالتوازي عبر عمليات عاملة
+
+A ParallelSolver answers queries on a pool of processes that each hold a
+read-only copy of an engine's knowledge base, taken when the solver is
+created:
+
+    query_all(goals)  independent queries, handed to the workers in chunks
+    query(goal)       one query whose clauses are split into contiguous
+                      ranges (OR-branches) solved by different workers
+
+With the 'fork' start method the workers inherit the engine copy-on-write,
+including the memory maps of a store opened with load_kb. With other start
+methods the knowledge base is written once with save_kb and every worker
+opens that store, sharing its memory-mapped segments.
+
+Results are merged in the order of the goals and of the clause ranges, so
+both methods return the same solutions in the same order as
+LogicalEngine.query. A predicate is split only when none of its clauses
+cuts and it is not tabled or materialized; otherwise the whole query runs
+on one worker.
+"""
+
+import itertools
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .ast_nodes import Cut
+from .logical_engine import _BUILTIN_GOALS, LogicalEngine, Predicate, Rule, Substitution, intern_term
+
+# The engine of a worker process, set by its initializer
+_engine = None
+
+
+def _use_engine(engine):
+    global _engine
+    _engine = engine
+
+
+def _open_engine(path, settings, materialized):
+    engine = LogicalEngine(**settings)
+    engine.load_kb(path)
+    engine.materialized.update(materialized)
+    _use_engine(engine)
+
+
+def _solve_batch(tasks):
+    """Worker: the solutions of each (goal, bindings) task"""
+    return [[solution.bindings for solution in _engine.solve(goal, Substitution(dict(bindings)))]
+            for goal, bindings in tasks]
+
+
+def _solve_branch(task):
+    """Worker: the solutions of a goal restricted to a range of its clauses"""
+    goal, bindings, start, stop = task
+    engine = _engine
+    substitution = Substitution(dict(bindings))
+    names = list(bindings)
+    engine._collect_variables(goal, names)
+    names = list(dict.fromkeys(names))
+    clauses = itertools.islice(engine._candidate_clauses(goal), start, stop)
+    return [engine._snapshot(substitution, names).bindings
+            for _ in engine._solve_clauses(goal, substitution, clauses)]
+
+
+def _interned(value):
+    """A value received from a worker, with its symbols shared through the atom table"""
+    if value.__class__ is list:
+        return [_interned(item) for item in value]
+    if value.__class__ is Predicate:
+        return Predicate(value.name, [_interned(arg) for arg in value.args])
+    return intern_term(value)
+
+
+def _solution(bindings):
+    return Substitution({name: _interned(value) for name, value in bindings.items()})
+
+
+class ParallelSolver:
+    """Solves queries over a snapshot of an engine's knowledge base in worker processes.
+
+    Changes made to the engine after the solver is created are not seen by
+    its workers; create a new solver to pick them up. Use it as a context
+    manager, or call close() to stop the workers.
+    """
+
+    def __init__(self, engine, workers=None, start_method=None):
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self._snapshot_path = None
+        context = multiprocessing.get_context(start_method)
+        if start_method == 'fork':
+            # The engine reaches the workers through fork, not pickling
+            initializer, initargs = _use_engine, (engine,)
+        else:
+            self._snapshot_path = tempfile.mkdtemp(prefix='bayan-kb-')
+            engine.save_kb(self._snapshot_path)
+            settings = {'indexing': engine.indexing, 'mode': engine.mode,
+                        'compile_rules': engine.compile_rules, 'reorder_goals': engine.reorder_goals}
+            initializer, initargs = _open_engine, (self._snapshot_path, settings, set(engine.materialized))
+        self._executor = ProcessPoolExecutor(self.workers, mp_context=context,
+                                             initializer=initializer, initargs=initargs)
+        # Start the workers now, so they all copy the knowledge base as it is
+        self._executor.submit(int).result()
+
+    def query_all(self, goals, substitution=None):
+        """Solve independent queries, returning the list of solutions of each goal"""
+        bindings = {} if substitution is None else substitution.bindings
+        tasks = [(goal, bindings) for goal in goals]
+        size = max(1, len(tasks) // (self.workers * 4))
+        chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+        return [[_solution(solution) for solution in solutions]
+                for batch in self._executor.map(_solve_batch, chunks)
+                for solutions in batch]
+
+    def query(self, goal, substitution=None):
+        """Solve one query, splitting its predicate's clauses across the workers"""
+        substitution = Substitution() if substitution is None else substitution
+        ranges = self._branches(goal, substitution)
+        if ranges is None:
+            return self.query_all([goal], substitution)[0]
+        bindings = substitution.bindings
+        resolved = self.engine._apply_substitution(goal, substitution)
+        tasks = [(resolved, bindings, start, stop) for start, stop in ranges]
+        return [_solution(solution)
+                for solutions in self._executor.map(_solve_branch, tasks)
+                for solution in solutions]
+
+    def _branches(self, goal, substitution):
+        """Contiguous clause ranges to solve a goal by, or None to solve it whole"""
+        engine = self.engine
+        if (goal.__class__ is not Predicate or goal.name not in engine.knowledge_base
+                or goal.name in _BUILTIN_GOALS or goal.name in engine.tabled
+                or engine.mode == 'bottom_up' or goal.name in engine.materialized):
+            return None
+        clauses = list(engine._candidate_clauses(engine._apply_substitution(goal, substitution)))
+        if len(clauses) < 2 or any(isinstance(clause, Rule) and
+                                   any(isinstance(g, Cut) for g in clause.body)
+                                   for clause in clauses):
+            # A cut in one branch would prune the branches after it
+            return None
+        size = -(-len(clauses) // self.workers)
+        return [(start, min(start + size, len(clauses))) for start in range(0, len(clauses), size)]
+
+    def close(self):
+        """Stop the workers and remove the knowledge base snapshot, if any"""
+        self._executor.shutdown()
+        if self._snapshot_path is not None:
+            shutil.rmtree(self._snapshot_path, ignore_errors=True)
+            self._snapshot_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -188,6 +188,9 @@ class HybridParser:
             elif self.is_logical_fact():
                 # Parse as logical fact
                 logical_stmts.append(self.parse_fact())
+            elif self.is_table_declaration():
+                # Tabling declaration: table ancestor/2. or جدول مسار.
+                logical_stmts.append(self.parse_table_declaration())
             elif self.is_nominal_phrase():
                 # Grammar sugar: nominal phrase like "محمد الطبيب." or with relation hint: "عصير العنب[of]."
                 traditional_stmts.append(self.parse_nominal_phrase())
@@ -199,6 +202,36 @@ class HybridParser:
         self.eat(TokenType.RBRACE)
         return HybridBlock(traditional_stmts, logical_stmts)
 
+    def is_table_declaration(self):
+        """Lookahead for a tabling declaration: ('table'|'جدول') IDENT ['/' N] {',' ...} '.'
+
+        'table' is only a keyword in this position, so it stays usable as an identifier.
+        """
+        t1 = self.current_token
+        t2 = self.peek(1)
+        t3 = self.peek(2)
+        if not t1 or t1.type != TokenType.IDENTIFIER or t1.value not in ('table', 'جدول'):
+            return False
+        if not t2 or t2.type != TokenType.IDENTIFIER or not t3:
+            return False
+        return t3.type in (TokenType.DOT, TokenType.COMMA) or (t3.type == TokenType.OPERATOR and t3.value == '/')
+
+    def parse_table_declaration(self):
+        """Parse a tabling declaration into a TableDeclaration AST node"""
+        tok = self.eat(TokenType.IDENTIFIER)
+        predicates = []
+        while True:
+            predicates.append(self.eat(TokenType.IDENTIFIER).value)
+            # Optional arity: predicates are tabled by name
+            if self.match(TokenType.OPERATOR) and self.current_token.value == '/':
+                self.eat(TokenType.OPERATOR)
+                self.eat(TokenType.NUMBER)
+            if not self.match(TokenType.COMMA):
+                break
+            self.eat(TokenType.COMMA)
+        self.eat(TokenType.DOT)
+        return self._with_pos(TableDeclaration(predicates), tok)
+
     def is_nominal_phrase(self):
         """Lookahead for a nominal phrase statement requiring a trailing DOT.
         Pattern: (IDENT|STRING) (IDENT|STRING) [ '[' (IDENT|STRING) ']' ] '.'
@@ -1280,12 +1313,23 @@ class HybridParser:
         return goals
 
     def parse_logical_goal(self):
-        """Parse a single goal in logical body (predicate, comparison, is expression, or cut)"""
+        """Parse a single goal in logical body (predicate, comparison, is expression, negation, or cut)"""
         # Check for cut operator: !
         if self.match(TokenType.CUT):
             self.eat(TokenType.CUT)
             return Cut()
 
+        # Negation as failure: not(Goal), not Goal or \+ Goal
+        if self.match(TokenType.NOT) or (self.match(TokenType.OPERATOR) and self.current_token.value == '\\+'):
+            self.eat(self.current_token.type)
+            if self.match(TokenType.LPAREN):
+                self.eat(TokenType.LPAREN)
+                goal = self.parse_logical_goal()
+                self.eat(TokenType.RPAREN)
+            else:
+                goal = self.parse_logical_goal()
+            return Predicate('not', [goal])
+
         # Check if this is an 'is' expression or comparison: ?X is Expression or ?X > ?Y
         if self.match(TokenType.VARIABLE):
             # Peek ahead to see if 'is' or comparison operator follows
@@ -26,14 +26,123 @@ class YieldValue(Exception):
         self.value = value
 
 class BayanRuntimeError(Exception):
-    """Runtime error that carries a Bayan stack trace"""
-    pass
+    """Runtime error that carries a Bayan stack trace.
+
+    When the error is raised, only the failing node and the calls in
+    progress are known. Every interpret() it then leaves adds its node next
+    to the innermost call it is still inside, so once the error is caught
+    its nodes are the full path from the program statement to the failing
+    node. The message is built when it is read.
+    """
+    def __init__(self, error, calls, node, render):
+        super().__init__(f"{error.__class__.__name__}: {error}")
+        self.nodes = calls + [node]
+        self._level = len(calls) - 1  # Index of the innermost call not yet left
+        self._render = render
+
+    def unwound(self, node):
+        """Record that the error left the interpret() of a node"""
+        level = self._level
+        if level >= 0 and node is self.nodes[level]:
+            self._level = level - 1
+        elif self.nodes[level + 1] is not node:
+            self.nodes.insert(level + 1, node)
+
+    def __str__(self):
+        return self._render(self.args[0], self.nodes)
+
+def _call_frame(visit):
+    """Keep the call node of a visitor on the interpreter's Bayan stack while it runs"""
+    def framed(self, node):
+        stack = self._call_stack
+        if len(stack) == 1 and stack[0] is node:
+            # A program statement that is itself the call already has its frame
+            return visit(self, node)
+        stack.append(node)
+        try:
+            return visit(self, node)
+        finally:
+            stack.pop()
+    framed.__name__ = visit.__name__
+    framed.__doc__ = visit.__doc__
+    return framed
+
+class NodeDispatch:
+    """Handlers of AST node classes for an interpreter, looked up by exact class.
+
+    ``entries`` lists (node class, method name) pairs in priority order. The
+    first time a class is seen it is matched against them the way a chain of
+    isinstance checks would be, and the bound handler is kept for it. Classes
+    matching no entry go to ``fallback``.
+    """
+
+    def __init__(self, owner, entries, fallback):
+        self.owner = owner
+        self.entries = entries
+        self.fallback = fallback
+        self.handlers = {}
+
+    def resolve(self, node_class):
+        for entry_class, name in self.entries:
+            if issubclass(node_class, entry_class):
+                handler = getattr(self.owner, name)
+                break
+        else:
+            handler = self.fallback
+        self.handlers[node_class] = handler
+        return handler
+
+# Node classes handled by TraditionalInterpreter, in dispatch priority order
+_NODE_HANDLERS = (
+    (Program, 'visit_program'),
+    (Block, 'visit_block'),
+    (Assignment, 'visit_assignment'),
+    (BinaryOp, 'visit_binary_op'),
+    (UnaryOp, 'visit_unary_op'),
+    (Number, 'visit_literal'),
+    (String, 'visit_literal'),
+    (Boolean, 'visit_literal'),
+    (Variable, 'visit_variable'),
+    (List, 'visit_list'),
+    (ListComprehension, 'visit_list_comprehension'),
+    (Dict, 'visit_dict'),
+    (Tuple, 'visit_tuple'),
+    (Set, 'visit_set'),
+    (FunctionCall, 'visit_function_call'),
+    (FunctionDef, 'visit_function_def'),
+    (ClassDef, 'visit_class_def'),
+    (IfStatement, 'visit_if_statement'),
+    (ForLoop, 'visit_for_loop'),
+    (WhileLoop, 'visit_while_loop'),
+    (ReturnStatement, 'visit_return_statement'),
+    (BreakStatement, 'visit_break_statement'),
+    (ContinueStatement, 'visit_continue_statement'),
+    (PrintStatement, 'visit_print_statement'),
+    (AttributeAccess, 'visit_attribute_access'),
+    (SubscriptAccess, 'visit_subscript_access'),
+    (AttributeAssignment, 'visit_attribute_assignment'),
+    (SubscriptAssignment, 'visit_subscript_assignment'),
+    (MethodCall, 'visit_method_call'),
+    (SelfReference, 'visit_self_reference'),
+    (SuperCall, 'visit_super_call'),
+    (ImportStatement, 'visit_import_statement'),
+    (FromImportStatement, 'visit_from_import_statement'),
+    (RaiseStatement, 'visit_raise_statement'),
+    (TryExceptFinally, 'visit_try_except_finally'),
+    (AsyncFunctionDef, 'visit_async_function_def'),
+    (AwaitExpr, 'visit_await_expr'),
+    (YieldExpr, 'visit_yield_expr'),
+    (WithStatement, 'visit_with_statement'),
+)
 
 class BayanException(Exception):
     """Exception used for Bayan raise/try/except"""
     def __init__(self, value=None):
         self.value = value
 
+# Exceptions that carry control flow through interpret() unwrapped
+_CONTROL_FLOW = (ReturnValue, BreakException, ContinueException, YieldValue, BayanException)
+
 
 
 class TraditionalInterpreter:
@@ -54,32 +163,7 @@ class TraditionalInterpreter:
             old_local_env = interp.local_env
             interp.local_env = {}
             try:
-                # Resolve parameters (support Parameter objects or raw names)
-                parameters = getattr(self.func_def, 'parameters', getattr(self.func_def, 'params', []))
-                param_names = []
-                for p in parameters:
-                    if isinstance(p, Parameter):
-                        param_names.append(p.name)
-                    else:
-                        param_names.append(p)
-
-                # Bind positional arguments
-                for i, arg in enumerate(self.args):
-                    if i < len(param_names):
-                        interp.local_env[param_names[i]] = arg
-
-                # Bind named arguments
-                for name, value in self.named_args.items():
-                    if name in param_names:
-                        interp.local_env[name] = value
-
-                # Bind defaults
-                for p in parameters:
-                    if isinstance(p, Parameter):
-                        if p.name not in interp.local_env and p.has_default():
-                            interp.local_env[p.name] = interp.interpret(p.default_value)
-                        elif p.name not in interp.local_env and not p.has_default():
-                            raise RuntimeError(f"Missing required parameter: {p.name}")
+                self.func_def.signature.bind(interp, interp.local_env, self.args, self.named_args)
 
                 # Execute body
                 try:
@@ -97,9 +181,14 @@ class TraditionalInterpreter:
                 yield None
             return result
 
-    def __init__(self):
+    def __init__(self, backend='tree'):
+        if backend not in ('tree', 'compiled'):
+            raise ValueError(f"Unknown backend: {backend!r}")
+        self.backend = backend
         self.global_env = {}
         self.local_env = None
+        # Slot values of the locals of the compiled function body running now
+        self.frame = None
         self.functions = {}
         self.classes = {}
         self.class_system = ClassSystem(self)
@@ -107,13 +196,21 @@ class TraditionalInterpreter:
         self.logical_engine = None
         # Track current owner class for super() resolution in MRO
         self._owner_stack = []
-        # Bayan runtime call stack of (node_type, line, column, filename)
+        # Frames of the Bayan stack: the program statement and the calls in progress
         self._call_stack = []
         # Optional source buffer for code-frame rendering
         self._source_lines = None
         self._source_filename = None
         # Track async functions
         self._async_functions = set()
+        # Node class -> bound visit method, filled in as classes are met
+        handlers = _NODE_HANDLERS
+        self.compiler = None
+        if backend == 'compiled':
+            from .compiler import ClosureCompiler, COMPILED_NODES
+            self.compiler = ClosureCompiler(self)
+            handlers = tuple((node_class, 'visit_compiled') for node_class in COMPILED_NODES) + handlers
+        self._dispatch = NodeDispatch(self, handlers, self.visit_unknown)
 
         # Error reporting configuration
         self._err_color = False
@@ -182,36 +279,46 @@ class TraditionalInterpreter:
         return obj
 
     def interpret(self, node):
-        """Interpret an AST node with Bayan stack tracking"""
-        # Push current frame (node type + optional position)
-        self._call_stack.append((type(node).__name__, getattr(node, 'line', None), getattr(node, 'column', None), getattr(node, 'filename', None)))
+        """Interpret an AST node, reporting errors with their Bayan stack"""
         try:
             return self._interpret_core(node)
+        except _CONTROL_FLOW:
+            raise
         except Exception as e:
-            # Control-flow exceptions should not be wrapped
-            if isinstance(e, (ReturnValue, BreakException, ContinueException, YieldValue, BayanException, BayanRuntimeError)):
-                raise
-            frames = list(self._call_stack)
-            trace = " -> ".join(
-                (f"{name}@{fn}:{ln}:{col}" if fn else f"{name}@{ln}:{col}") if ln is not None else name
-                for (name, ln, col, fn) in frames
-            )
-            # Try to add a code-frame for the most recent frame with position
-            code_frame = ""
-            try:
-                for (name, ln, col, fn) in reversed(frames):
-                    if ln is not None and col is not None:
-                        # Only render frame if we have a matching source buffer
-                        if self._source_lines is not None and (self._source_filename == fn or self._source_filename is None):
-                            code_frame = self._build_code_frame(fn, int(ln), int(col))
-                        break
-            except Exception:
-                # Never fail error reporting
-                code_frame = ""
-            raise BayanRuntimeError(f"{e.__class__.__name__}: {e}\nBayan stack: {trace}{code_frame}")
-        finally:
-            self._call_stack.pop()
+            raise self._error_at(e, node)
 
+    def _error_at(self, error, node):
+        """The error to raise from a node that an error other than control flow left.
+
+        A Python error is wrapped in a BayanRuntimeError starting its Bayan
+        stack at this node; a BayanRuntimeError records that it left it.
+        """
+        if isinstance(error, BayanRuntimeError):
+            error.unwound(node)
+            return error
+        return BayanRuntimeError(error, list(self._call_stack), node, self._error_message)
+
+    def _error_message(self, description, nodes):
+        """The message of a BayanRuntimeError: its description, Bayan stack and code frame"""
+        frames = [(type(node).__name__, getattr(node, 'line', None),
+                   getattr(node, 'column', None), getattr(node, 'filename', None)) for node in nodes]
+        trace = " -> ".join(
+            (f"{name}@{fn}:{ln}:{col}" if fn else f"{name}@{ln}:{col}") if ln is not None else name
+            for (name, ln, col, fn) in frames
+        )
+        # Try to add a code-frame for the most recent frame with position
+        code_frame = ""
+        try:
+            for (name, ln, col, fn) in reversed(frames):
+                if ln is not None and col is not None:
+                    # Only render frame if we have a matching source buffer
+                    if self._source_lines is not None and (self._source_filename == fn or self._source_filename is None):
+                        code_frame = self._build_code_frame(fn, int(ln), int(col))
+                    break
+        except Exception:
+            # Never fail error reporting
+            code_frame = ""
+        return f"{description}\nBayan stack: {trace}{code_frame}"
 
     def _style(self, text: str, *kinds: str) -> str:
         if not self._err_color:
@@ -283,92 +390,39 @@ class TraditionalInterpreter:
 
     def _interpret_core(self, node):
         """Core interpret dispatch without stack handling"""
-        if isinstance(node, Program):
-            return self.visit_program(node)
-        elif isinstance(node, Block):
-            return self.visit_block(node)
-        elif isinstance(node, Assignment):
-            return self.visit_assignment(node)
-        elif isinstance(node, BinaryOp):
-            return self.visit_binary_op(node)
-        elif isinstance(node, UnaryOp):
-            return self.visit_unary_op(node)
-        elif isinstance(node, Number):
-            return node.value
-        elif isinstance(node, String):
-            return node.value
-        elif isinstance(node, Boolean):
-            return node.value
-        elif isinstance(node, Variable):
-            return self.visit_variable(node)
-        elif isinstance(node, List):
-            return self.visit_list(node)
-        elif isinstance(node, ListComprehension):
-            return self.visit_list_comprehension(node)
-        elif isinstance(node, Dict):
-            return self.visit_dict(node)
-        elif isinstance(node, Tuple):
-            return self.visit_tuple(node)
-        elif isinstance(node, Set):
-            return self.visit_set(node)
-        elif isinstance(node, FunctionCall):
-            return self.visit_function_call(node)
-        elif isinstance(node, FunctionDef):
-            return self.visit_function_def(node)
-        elif isinstance(node, ClassDef):
-            return self.visit_class_def(node)
-        elif isinstance(node, IfStatement):
-            return self.visit_if_statement(node)
-        elif isinstance(node, ForLoop):
-            return self.visit_for_loop(node)
-        elif isinstance(node, WhileLoop):
-            return self.visit_while_loop(node)
-        elif isinstance(node, ReturnStatement):
-            return self.visit_return_statement(node)
-        elif isinstance(node, BreakStatement):
-            raise BreakException()
-        elif isinstance(node, ContinueStatement):
-            raise ContinueException()
-        elif isinstance(node, PrintStatement):
-            return self.visit_print_statement(node)
-        elif isinstance(node, AttributeAccess):
-            return self.visit_attribute_access(node)
-        elif isinstance(node, SubscriptAccess):
-            return self.visit_subscript_access(node)
-        elif isinstance(node, AttributeAssignment):
-            return self.visit_attribute_assignment(node)
-        elif isinstance(node, SubscriptAssignment):
-            return self.visit_subscript_assignment(node)
-        elif isinstance(node, MethodCall):
-            return self.visit_method_call(node)
-        elif isinstance(node, SelfReference):
-            return self.visit_self_reference(node)
-        elif isinstance(node, SuperCall):
-            return self.visit_super_call(node)
-        elif isinstance(node, ImportStatement):
-            return self.visit_import_statement(node)
-        elif isinstance(node, FromImportStatement):
-            return self.visit_from_import_statement(node)
-        elif isinstance(node, RaiseStatement):
-            return self.visit_raise_statement(node)
-        elif isinstance(node, TryExceptFinally):
-            return self.visit_try_except_finally(node)
-        elif isinstance(node, AsyncFunctionDef):
-            return self.visit_async_function_def(node)
-        elif isinstance(node, AwaitExpr):
-            return self.visit_await_expr(node)
-        elif isinstance(node, YieldExpr):
-            return self.visit_yield_expr(node)
-        elif isinstance(node, WithStatement):
-            return self.visit_with_statement(node)
-        else:
-            raise RuntimeError(f"Unknown node type: {type(node)}")
+        dispatch = self._dispatch
+        handler = dispatch.handlers.get(node.__class__)
+        if handler is None:
+            handler = dispatch.resolve(node.__class__)
+        return handler(node)
+
+    def visit_compiled(self, node):
+        """Run a node as its closure from the compiled backend"""
+        return self.compiler.closure(node)()
+
+    def visit_literal(self, node):
+        """Visit a number, string or boolean literal"""
+        return node.value
+
+    def visit_break_statement(self, node):
+        raise BreakException()
+
+    def visit_continue_statement(self, node):
+        raise ContinueException()
+
+    def visit_unknown(self, node):
+        raise RuntimeError(f"Unknown node type: {type(node)}")
 
     def visit_program(self, node):
         """Visit a program node"""
         result = None
+        stack = self._call_stack
         for statement in node.statements:
-            result = self.interpret(statement)
+            stack.append(statement)
+            try:
+                result = self.interpret(statement)
+            finally:
+                stack.pop()
         return result
 
     def visit_block(self, node):
@@ -383,10 +437,8 @@ class TraditionalInterpreter:
         value = self.interpret(node.value)
 
         # Check if this is an attribute assignment (obj.attr = value)
-        if '.' in node.name:
-            parts = node.name.split('.')
-            obj_name = parts[0]
-            attr_name = parts[1]
+        if node.attribute is not None:
+            obj_name, attr_name = node.attribute
 
             env = self.local_env if self.local_env is not None else self.global_env
             if obj_name in env:
@@ -408,7 +460,10 @@ class TraditionalInterpreter:
         """Visit a binary operation node"""
         left = self.interpret(node.left)
         right = self.interpret(node.right)
+        return self._apply_binary(node.operator, left, right)
 
+    def _apply_binary(self, operator, left, right):
+        """Apply a binary operator to evaluated operands"""
         # Helper to try dunder methods on BayanObject
         def _try_dunder(l, r, name, rname=None):
             if isinstance(l, BayanObject) and l.has_method(name):
@@ -417,76 +472,76 @@ class TraditionalInterpreter:
                 return r.call_method(rname, [l])
             return None
 
-        if node.operator == '+':
+        if operator == '+':
             res = _try_dunder(left, right, '__add__', '__radd__')
             return res if res is not None else (left + right)
-        elif node.operator == '-':
+        elif operator == '-':
             res = _try_dunder(left, right, '__sub__', '__rsub__')
             return res if res is not None else (left - right)
-        elif node.operator == '*':
+        elif operator == '*':
             res = _try_dunder(left, right, '__mul__', '__rmul__')
             return res if res is not None else (left * right)
-        elif node.operator == '/':
+        elif operator == '/':
             res = _try_dunder(left, right, '__truediv__', '__rtruediv__')
             return res if res is not None else (left / right)
-        elif node.operator == '%':
+        elif operator == '%':
             res = _try_dunder(left, right, '__mod__', '__rmod__')
             return res if res is not None else (left % right)
-        elif node.operator == '==':
+        elif operator == '==':
             res = _try_dunder(left, right, '__eq__')
             return res if res is not None else (left == right)
-        elif node.operator == '!=':
+        elif operator == '!=':
             res = _try_dunder(left, right, '__ne__')
             if res is not None:
                 return res
             # Fallback: negate __eq__ if provided
             eq_res = _try_dunder(left, right, '__eq__')
             return (not eq_res) if eq_res is not None else (left != right)
-        elif node.operator == '<':
+        elif operator == '<':
             res = _try_dunder(left, right, '__lt__')
             return res if res is not None else (left < right)
-        elif node.operator == '>':
+        elif operator == '>':
             res = _try_dunder(left, right, '__gt__')
             return res if res is not None else (left > right)
-        elif node.operator == '<=':
+        elif operator == '<=':
             res = _try_dunder(left, right, '__le__')
             return res if res is not None else (left <= right)
-        elif node.operator == '>=':
+        elif operator == '>=':
             res = _try_dunder(left, right, '__ge__')
             return res if res is not None else (left >= right)
-        elif node.operator == 'in':
+        elif operator == 'in':
             # membership: left in right
             if isinstance(right, BayanObject) and right.has_method('__contains__'):
                 return right.call_method('__contains__', [left])
             return left in right
-        elif node.operator == 'and':
+        elif operator == 'and':
             # Preserve Python-like value return while using Bayan truthiness
             return right if self._truthy(left) else left
-        elif node.operator == 'or':
+        elif operator == 'or':
             return left if self._truthy(left) else right
         else:
-            raise RuntimeError(f"Unknown operator: {node.operator}")
+            raise RuntimeError(f"Unknown operator: {operator}")
 
     def visit_unary_op(self, node):
         """Visit a unary operation node"""
-        operand = self.interpret(node.operand)
+        return self._apply_unary(node.operator, self.interpret(node.operand))
 
-        if node.operator == '-':
+    def _apply_unary(self, operator, operand):
+        """Apply a unary operator to an evaluated operand"""
+        if operator == '-':
             if isinstance(operand, BayanObject) and operand.has_method('__neg__'):
                 return operand.call_method('__neg__', [])
             return -operand
-        elif node.operator == 'not':
+        elif operator == 'not':
             return not self._truthy(operand)
         else:
-            raise RuntimeError(f"Unknown unary operator: {node.operator}")
+            raise RuntimeError(f"Unknown unary operator: {operator}")
 
     def visit_variable(self, node):
         """Visit a variable node"""
         # Check if this is an attribute access (obj.attr)
-        if '.' in node.name:
-            parts = node.name.split('.')
-            obj_name = parts[0]
-            attr_name = parts[1]
+        if node.attribute is not None:
+            obj_name, attr_name = node.attribute
 
             env = self.local_env if self.local_env is not None else self.global_env
             if obj_name in env:
@@ -628,6 +683,7 @@ class TraditionalInterpreter:
             result[key] = value
         return result
 
+    @_call_frame
     def visit_function_call(self, node):
         """Visit a function call node"""
         # Check if this is a logical predicate call (contains logical variables)
@@ -655,10 +711,8 @@ class TraditionalInterpreter:
 
             # Create a logical predicate and query it
             predicate = Predicate(node.name, logical_args)
-            solutions = self.logical_engine.query(predicate)
-
-            # Return True if there are solutions, False otherwise
-            return len(solutions) > 0
+            # Return True if there is a solution, False otherwise
+            return self.logical_engine.has_solution(predicate)
 
         # Check for built-in functions
         if node.name == 'len':
@@ -777,12 +831,9 @@ class TraditionalInterpreter:
                     old_local = self.local_env
                     self.local_env = {}
                     try:
-                        for i, param in enumerate(func_def.parameters):
-                            param_name = param.name if isinstance(param, Parameter) else param
-                            if i < len(items):
-                                self.local_env[param_name] = items[i]
+                        func_def.signature.bind(self, self.local_env, items)
                         try:
-                            result = self.interpret(func_def.body)
+                            result = self._run_function_body(func_def)
                         except ReturnValue as ret:
                             result = ret.value
                         return result
@@ -811,10 +862,9 @@ class TraditionalInterpreter:
                     old_local = self.local_env
                     self.local_env = {}
                     try:
-                        param_name = func_def.parameters[0].name if isinstance(func_def.parameters[0], Parameter) else func_def.parameters[0]
-                        self.local_env[param_name] = item
+                        func_def.signature.bind(self, self.local_env, (item,))
                         try:
-                            result = self.interpret(func_def.body)
+                            result = self._run_function_body(func_def)
                         except ReturnValue as ret:
                             result = ret.value
                         return self._truthy(result)
@@ -929,69 +979,9 @@ class TraditionalInterpreter:
             # Create new local environment
             old_local_env = self.local_env
             self.local_env = {}
-
-            # Bind parameters with support for defaults, named arguments, *args, and **kwargs
-            param_names = []
-            varargs_param = None
-            kwargs_param = None
-
-            for param in func_def.parameters:
-                if isinstance(param, Parameter):
-                    if param.is_kwargs:
-                        kwargs_param = param.name
-                    elif param.is_varargs:
-                        varargs_param = param.name
-                    else:
-                        param_names.append(param.name)
-                else:
-                    # Legacy format: parameter is just a string
-                    param_names.append(param)
-
-            # Bind positional arguments
-            positional_count = 0
-            for i, arg in enumerate(args):
-                if i < len(param_names):
-                    self.local_env[param_names[i]] = arg
-                    positional_count += 1
-                elif varargs_param:
-                    # Extra positional arguments go to *args
-                    if varargs_param not in self.local_env:
-                        self.local_env[varargs_param] = []
-                    self.local_env[varargs_param].append(arg)
-                else:
-                    raise RuntimeError(f"Too many positional arguments for function {node.name}")
-
-            # Initialize *args if it exists and wasn't populated
-            if varargs_param and varargs_param not in self.local_env:
-                self.local_env[varargs_param] = []
-
-            # Bind named arguments
-            for name, value in named_args.items():
-                if name in param_names:
-                    self.local_env[name] = value
-                elif kwargs_param:
-                    # Extra named arguments go to **kwargs
-                    if kwargs_param not in self.local_env:
-                        self.local_env[kwargs_param] = {}
-                    self.local_env[kwargs_param][name] = value
-                else:
-                    raise RuntimeError(f"Unexpected keyword argument: {name}")
-
-            # Initialize **kwargs if it exists and wasn't populated
-            if kwargs_param and kwargs_param not in self.local_env:
-                self.local_env[kwargs_param] = {}
-
-            # Bind default values for missing parameters
-            for param in func_def.parameters:
-                if isinstance(param, Parameter):
-                    if not param.is_varargs and not param.is_kwargs:
-                        if param.name not in self.local_env and param.has_default():
-                            self.local_env[param.name] = self.interpret(param.default_value)
-                        elif param.name not in self.local_env:
-                            raise RuntimeError(f"Missing required parameter: {param.name}")
-
             try:
-                result = self.interpret(func_def.body)
+                func_def.signature.bind(self, self.local_env, args, named_args)
+                result = self._run_function_body(func_def)
             except ReturnValue as ret:
                 result = ret.value
             finally:
@@ -1107,26 +1097,9 @@ class TraditionalInterpreter:
         else:
             self.local_env = {}
 
-        # Bind parameters
-        param_names = []
-        for param in func_def.parameters:
-            if isinstance(param, Parameter):
-                param_names.append(param.name)
-            else:
-                param_names.append(param)
-
-        for i, arg in enumerate(args):
-            if i < len(param_names):
-                self.local_env[param_names[i]] = arg
-
-                # If the argument is a callable (e.g., a decorated function),
-                # also make it available for function calls
-                if callable(arg) and not isinstance(arg, (int, float, str, bool, list, dict, type)):
-                    # This allows calling the function from within Bayan code
-                    pass  # Already stored in local_env
-
         try:
-            result = self.interpret(func_def.body)
+            func_def.signature.bind(self, self.local_env, args)
+            result = self._run_function_body(func_def)
         except ReturnValue as ret:
             result = ret.value
         finally:
@@ -1134,6 +1107,16 @@ class TraditionalInterpreter:
 
         return result
 
+    def _run_function_body(self, func_def):
+        """Run the body of a function whose arguments are bound in local_env.
+
+        On the compiled backend a function with local_slots keeps its
+        locals in slots (see ClosureCompiler.function_body).
+        """
+        if self.compiler is not None and getattr(func_def, 'local_slots', None) is not None:
+            return self.compiler.function_body(func_def)()
+        return self.interpret(func_def.body)
+
     def visit_async_function_def(self, node):
         """Visit an async function definition node"""
         # Store async function with marker
@@ -1327,6 +1310,7 @@ class TraditionalInterpreter:
         self.class_system.register_class(node)
         return None
 
+    @_call_frame
     def visit_super_call(self, node):
         """Visit a super(...) call inside a method using MRO"""
         # Ensure we are inside a method with self bound
@@ -1354,30 +1338,7 @@ class TraditionalInterpreter:
         self.local_env = {'self': self_obj}
         self._owner_stack.append(owner)
         try:
-            # Bind parameters with support for Parameter objects and defaults
-            from .ast_nodes import Parameter
-
-            param_names = []
-            for param in method.parameters:
-                if isinstance(param, Parameter):
-                    if param.name != 'self':
-                        param_names.append(param.name)
-                else:
-                    # Legacy format: parameter is just a string
-                    if param != 'self':
-                        param_names.append(param)
-
-            # Bind positional arguments
-            for i, arg in enumerate(args):
-                if i < len(param_names):
-                    self.local_env[param_names[i]] = arg
-
-            # Bind default values for missing parameters
-            for param in method.parameters:
-                if isinstance(param, Parameter):
-                    if param.name != 'self' and param.name not in self.local_env and param.has_default():
-                        self.local_env[param.name] = self.interpret(param.default_value)
-
+            method.method_signature.bind(self, self.local_env, args)
             result = self.interpret(method.body)
             return result
         except ReturnValue as ret:
@@ -1467,6 +1428,7 @@ class TraditionalInterpreter:
         except Exception as e:
             raise TypeError(f"Index assignment not supported: {e}")
 
+    @_call_frame
     def visit_method_call(self, node):
         """Visit a method call node (obj.method()) with support for named arguments"""
         obj = self.interpret(node.object_expr)
@@ -1709,30 +1671,12 @@ class TraditionalInterpreter:
         # Prepare a fresh local environment for this generator invocation
         gen_env = {}
 
-        # Parameter names (support Parameter objects or raw names)
-        parameters = getattr(func_def, 'parameters', getattr(func_def, 'params', []))
-        param_names = []
-        for p in parameters:
-            if isinstance(p, Parameter):
-                param_names.append(p.name)
-            else:
-                param_names.append(p)
-
-        # Bind positional arguments
-        for i, arg in enumerate(args):
-            if i < len(param_names):
-                gen_env[param_names[i]] = arg
-
-        # Bind named arguments (values are AST nodes; evaluate in caller env)
+        # Named argument values are AST nodes; evaluate them in the caller env
         if isinstance(named_args, dict):
-            for name, value_node in named_args.items():
-                if name in param_names:
-                    gen_env[name] = self.interpret(value_node)
-
-        # Apply default values for missing parameters
-        for p in parameters:
-            if isinstance(p, Parameter) and p.default_value is not None and p.name not in gen_env:
-                gen_env[p.name] = self.interpret(p.default_value)
+            named_args = {name: self.interpret(value_node) for name, value_node in named_args.items()}
+        else:
+            named_args = None
+        func_def.signature.bind(self, gen_env, args, named_args)
 
         def generator():
             # Drive the function body as a generator
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark: repeated queries with and without the answer cache.
+Usage:
+  python3 scripts/bench_answer_cache.py [--queries 20000] [--distinct 50] [--updates 0.01]
+
+Asks --queries queries drawn from --distinct different grandparent goals
+over a family tree, the way a loop in a Bayan program would. A fraction
+--updates of the iterations also asserts a fact: half of them to an
+unrelated predicate (cached answers stay valid) and half to parent/2
+(cached grandparent answers go stale).
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, AnswerCache, Fact, Rule, Predicate, Term
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def build(cache):
+    engine = LogicalEngine()
+    if cache:
+        engine.answer_cache = AnswerCache(1024)
+    for i in range(1, 3000):
+        engine.add_fact(Fact(Predicate('parent', [Term(f"p{i // 3}"), Term(f"p{i}")])))
+    engine.add_rule(Rule(Predicate('grandparent', [var('X'), var('Z')]),
+                         [Predicate('parent', [var('X'), var('Y')]), Predicate('parent', [var('Y'), var('Z')])]))
+    return engine
+
+
+def run(engine, args):
+    rng = random.Random(1)
+    answers = 0
+    for step in range(args.queries):
+        goal = Predicate('grandparent', [Term(f"p{rng.randrange(args.distinct)}"), var('Z')])
+        answers += len(engine.query(goal))
+        if rng.random() < args.updates:
+            name = 'parent' if step % 2 else 'seen'
+            engine.add_fact(Fact(Predicate(name, [Term(f"q{step}"), Term(f"q{step + 1}")])))
+    return answers
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Measure the answer cache on repeated queries')
+    ap.add_argument('--queries', type=int, default=20000, help='Queries asked (default: 20000)')
+    ap.add_argument('--distinct', type=int, default=50, help='Distinct goals among them (default: 50)')
+    ap.add_argument('--updates', type=float, default=0.01, help='Fraction of iterations that assert a fact (default: 0.01)')
+    args = ap.parse_args()
+
+    results = {}
+    for name, cache in (('no cache', False), ('cache', True)):
+        engine = build(cache)
+        start = time.perf_counter()
+        results[name] = (run(engine, args), time.perf_counter() - start, engine.answer_cache)
+    assert results['no cache'][0] == results['cache'][0]
+
+    print(f"{'variant':>9} {'total (ms)':>12} {'us/query':>10}")
+    for name, (_, elapsed, _) in results.items():
+        print(f"{name:>9} {elapsed * 1000:>12.1f} {elapsed / args.queries * 1e6:>10.2f}")
+    print(results['cache'][2].stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: numeric recursion in logic rules ('is' and comparison goals).
+Usage:
+  python3 scripts/bench_arithmetic.py [--n 150] [--fib 16] [--repeat 5]
+
+Times arithmetic-heavy rules with compiled and interpreted rule execution:
+  - factorial: fact(N, F) :- N > 0, N1 is N - 1, fact(N1, F1), F is N * F1.
+  - fib:       doubly recursive Fibonacci
+  - sum:       accumulator sum over a list, sum([H|T], A, S) :- A1 is A + H, ...
+"""
+import os
+import sys
+import time
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import IsExpression, BinaryOp, Variable, Number
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def compare(op, left, right):
+    return Predicate(f'_compare_{op}', [left, right])
+
+
+def is_(target, op, left, right):
+    return IsExpression(var(target), BinaryOp(op, left, right))
+
+
+def factorial_workload(engine, args):
+    engine.add_fact(Fact(Predicate('fact', [Term(0), Term(1)])))
+    engine.add_rule(Rule(Predicate('fact', [var('N'), var('F')]),
+                         [compare('>', var('N'), Term(0)),
+                          is_('N1', '-', Variable('?N'), Number(1)),
+                          Predicate('fact', [var('N1'), var('F1')]),
+                          is_('F', '*', Variable('?N'), Variable('?F1'))]))
+    return Predicate('fact', [Term(args.n), var('F')])
+
+
+def fib_workload(engine, args):
+    engine.add_fact(Fact(Predicate('fib', [Term(0), Term(0)])))
+    engine.add_fact(Fact(Predicate('fib', [Term(1), Term(1)])))
+    engine.add_rule(Rule(Predicate('fib', [var('N'), var('F')]),
+                         [compare('>', var('N'), Term(1)),
+                          is_('N1', '-', Variable('?N'), Number(1)),
+                          is_('N2', '-', Variable('?N'), Number(2)),
+                          Predicate('fib', [var('N1'), var('F1')]),
+                          Predicate('fib', [var('N2'), var('F2')]),
+                          is_('F', '+', Variable('?F1'), Variable('?F2'))]))
+    return Predicate('fib', [Term(args.fib), var('F')])
+
+
+def sum_workload(engine, args):
+    engine.add_fact(Fact(Predicate('sum', [[], var('A'), var('A')])))
+    engine.add_rule(Rule(Predicate('sum', [{'list_pattern': True, 'head': [var('H')], 'tail': var('T')},
+                                           var('A'), var('S')]),
+                         [is_('A1', '+', Variable('?A'), Variable('?H')),
+                          Predicate('sum', [var('T'), var('A1'), var('S')])]))
+    return Predicate('sum', [[Term(i) for i in range(args.n)], Term(0), var('S')])
+
+
+WORKLOADS = {'factorial': factorial_workload, 'fib': fib_workload, 'sum': sum_workload}
+
+
+def time_workload(build, args, compile_rules):
+    engine = LogicalEngine(compile_rules=compile_rules)
+    goal = build(engine, args)
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        assert len(engine.query(goal)) == 1
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Time numeric recursion in logic rules')
+    ap.add_argument('--n', type=int, default=150, help='Factorial argument and list length (default: 150)')
+    ap.add_argument('--fib', type=int, default=16, help='Fibonacci argument (default: 16)')
+    ap.add_argument('--repeat', type=int, default=5, help='Runs per workload, best is reported (default: 5)')
+    args = ap.parse_args()
+
+    print(f"{'workload':>10} {'interpreted (ms)':>18} {'compiled (ms)':>15}")
+    for name, build in WORKLOADS.items():
+        interpreted = time_workload(build, args, compile_rules=False)
+        compiled = time_workload(build, args, compile_rules=True)
+        print(f"{name:>10} {interpreted * 1000:>18.2f} {compiled * 1000:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the tests/test_ai_* workloads under the tree and compiled backends.
+Usage:
+  python3 scripts/bench_backends.py [--pattern 'tests/test_ai_*.py'] [--repeat 3]
+
+Runs the matching test files with pytest once per backend and repeat, each
+run in a fresh process with HybridInterpreter.backend set for every
+interpreter the tests create, and reports the best wall time of each.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import subprocess
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Run in the child: set the backend on every loaded copy of the interpreter
+# class once the tests are collected, then run them
+CHILD = """
+import sys, pytest
+
+class Backend:
+    def pytest_collection_finish(self, session):
+        for name, module in list(sys.modules.items()):
+            if name.endswith('hybrid_interpreter') and hasattr(module, 'HybridInterpreter'):
+                module.HybridInterpreter.backend = sys.argv[1]
+
+sys.exit(pytest.main(['-q', '-p', 'no:cacheprovider', *sys.argv[2:]], plugins=[Backend()]))
+"""
+
+
+def run(backend, files):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD, backend, *files], cwd=ROOT,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"{backend} backend: tests failed\n{result.stdout}")
+    return elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Time the AI test workloads under both interpreter backends')
+    ap.add_argument('--pattern', default='tests/test_ai_*.py', help="Test files to run (default: tests/test_ai_*.py)")
+    ap.add_argument('--repeat', type=int, default=3, help='Runs per backend, best is kept (default: 3)')
+    args = ap.parse_args()
+
+    files = sorted(os.path.relpath(path, ROOT) for path in glob.glob(os.path.join(ROOT, args.pattern)))
+    best = {}
+    for _ in range(args.repeat):
+        for backend in ('tree', 'compiled'):
+            elapsed = run(backend, files)
+            best[backend] = min(best.get(backend, elapsed), elapsed)
+    print(f"test files:  {len(files)}")
+    for backend in ('tree', 'compiled'):
+        print(f"{backend:9s}    {best[backend]:6.2f} s")
+    print(f"speedup:     {best['tree'] / best['compiled']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full clause scan vs. argument index in the logical engine.
+Usage:
+  python3 scripts/bench_clause_index.py [--sizes 10000,100000,1000000] [--lookups 200]
+
+Builds a state/3 predicate shaped like EntityEngine mirrored facts
+(state(Entity, Key, Value)) and times ground-first-argument lookups with
+indexing disabled and enabled.
+"""
+import os
+import sys
+import time
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+
+
+def build_engine(size, indexing):
+    engine = LogicalEngine(indexing=indexing)
+    for i in range(size):
+        engine.add_fact(Fact(Predicate('state', [Term(f"e{i}"), Term('hunger'), Term((i % 100) / 100)])))
+    return engine
+
+
+def time_lookups(engine, size, lookups):
+    step = max(1, size // lookups)
+    goals = [Predicate('state', [Term(f"e{i}"), Term('hunger'), Term('V', is_variable=True)])
+             for i in range(0, size, step)][:lookups]
+    engine.query(goals[0])  # builds the index lazily
+    start = time.perf_counter()
+    for goal in goals:
+        assert len(engine.query(goal)) == 1
+    return (time.perf_counter() - start) / len(goals)
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Compare clause scan and clause index lookups')
+    ap.add_argument('--sizes', default='10000,100000,1000000', help='Comma-separated fact counts')
+    ap.add_argument('--lookups', type=int, default=200, help='Ground lookups per size (default: 200)')
+    args = ap.parse_args()
+
+    print(f"{'facts':>10} {'scan (ms)':>12} {'index (ms)':>12} {'speedup':>10}")
+    for size in (int(s) for s in args.sizes.split(',')):
+        # A scan over a million facts takes seconds; keep its sample small
+        scan_lookups = max(1, min(args.lookups, 2_000_000 // size))
+        scan = time_lookups(build_engine(size, indexing=False), size, scan_lookups)
+        index = time_lookups(build_engine(size, indexing=True), size, args.lookups)
+        print(f"{size:>10} {scan * 1000:>12.3f} {index * 1000:>12.4f} {scan / index:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory used by a large fact knowledge base.
+Usage:
+  python3 scripts/bench_fact_memory.py [--facts 20000] [--entities 1000] [--keep FILE]
+
+Writes a Bayan file of state/3 facts shaped like EntityEngine mirrored
+facts (state("e12", "hunger", "0.37")), loads it through the lexer, parser
+and hybrid interpreter, and reports the memory the loaded knowledge base
+retains (tracemalloc) per fact and in total.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+
+KEYS = ('hunger', 'thirst', 'fatigue', 'mood')
+
+
+def write_fact_file(path, facts, entities):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('hybrid {\n')
+        for i in range(facts):
+            entity = f"e{i % entities}"
+            key = KEYS[(i // entities) % len(KEYS)]
+            f.write(f'    fact state("{entity}", "{key}", "{(i * 37) % 100 / 100}").\n')
+        f.write('}\n')
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        code = f.read()
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interpreter
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Measure the memory of a loaded fact knowledge base')
+    ap.add_argument('--facts', type=int, default=20000, help="Number of facts (default: 20000)")
+    ap.add_argument('--entities', type=int, default=1000, help='Distinct entities (default: 1000)')
+    ap.add_argument('--keep', help='Write the fact file here instead of a temporary file')
+    args = ap.parse_args()
+
+    path = args.keep or os.path.join(tempfile.mkdtemp(), 'facts.bayan')
+    write_fact_file(path, args.facts, args.entities)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    interpreter = load(path)
+    elapsed = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    count = len(interpreter.logical.knowledge_base['state'])
+    print(f"facts loaded:     {count}")
+    print(f"load time:        {elapsed:.2f} s")
+    print(f"retained memory:  {retained / 2**20:.1f} MiB")
+    print(f"bytes per fact:   {retained / count:.0f}")
+    if not args.keep:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
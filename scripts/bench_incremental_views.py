@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: derived predicates over EntityEngine state under a stream of updates.
+Usage:
+  python3 scripts/bench_incremental_views.py [--entities 2000] [--groups 50] [--updates 2000]
+
+Each step changes one entity's hunger with set_state and then asks which
+groups have a hungry member (alert/1, derived through hungry/1 from
+state/3). The same stream runs with alert solved top-down on every query
+and with alert declared materialized, where each update is propagated
+into the stored answers.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Rule, Fact, Predicate, Term
+from bayan.entity_engine import EntityEngine
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def build(entities, groups, materialize):
+    engine = LogicalEngine()
+    world = EntityEngine(engine)
+    for i in range(entities):
+        world.create_entity(f"e{i}", states={'hunger': 0.5})
+        engine.add_fact(Fact(Predicate('member', [Term(f"g{i % groups}"), Term(f"e{i}")])))
+    # hungry(E) :- state(E, "hunger", V), V > 0.9.  alert(G) :- member(G, E), hungry(E).
+    engine.add_rule(Rule(Predicate('hungry', [var('E')]),
+                         [Predicate('state', [var('E'), Term('hunger'), var('V')]),
+                          Predicate('_compare_>', [var('V'), Term(0.9)])]))
+    engine.add_rule(Rule(Predicate('alert', [var('G')]),
+                         [Predicate('member', [var('G'), var('E')]), Predicate('hungry', [var('E')])]))
+    if materialize:
+        engine.materialize('alert')
+    return engine, world
+
+
+def run(args, materialize):
+    engine, world = build(args.entities, args.groups, materialize)
+    rng = random.Random(7)
+    goal = Predicate('alert', [var('G')])
+    counts = []
+    start = time.perf_counter()
+    for _ in range(args.updates):
+        world.set_state(f"e{rng.randrange(args.entities)}", 'hunger', rng.choice([0.2, 0.5, 0.95]))
+        counts.append(len({repr(s.lookup('G')) for s in engine.query(goal)}))
+    return time.perf_counter() - start, counts
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Time derived-predicate queries under state updates')
+    ap.add_argument('--entities', type=int, default=2000, help='Entities with a hunger state (default: 2000)')
+    ap.add_argument('--groups', type=int, default=50, help='Groups the entities belong to (default: 50)')
+    ap.add_argument('--updates', type=int, default=2000, help='set_state calls, each followed by a query (default: 2000)')
+    args = ap.parse_args()
+
+    top_down, expected = run(args, False)
+    incremental, counts = run(args, True)
+    assert counts == expected
+    print(f"top-down:      {top_down / args.updates * 1e3:.3f} ms per update+query")
+    print(f"materialized:  {incremental / args.updates * 1e3:.3f} ms per update+query")
+    print(f"speedup:       {top_down / incremental:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: tree-walking interpreter micro-workloads.
+Usage:
+  python3 scripts/bench_interpreter.py [--n 20000] [--repeat 5] [--only NAME] [--backend tree|compiled]
+
+Each workload is a small Bayan program, parsed once and interpreted
+--repeat times on a fresh interpreter; the best time is reported.
+  - loop:       an empty-bodied counting while loop
+  - arithmetic: a for loop evaluating a mixed arithmetic expression
+  - calls:      a user function called once per iteration
+  - wide_calls: a function and a method of eight parameters, mostly left
+                to their defaults, called with a named argument
+  - attributes: attribute reads and a method call on an object
+  - ml:         logistic_regression_train from ai/ml.bayan, --n // 100 epochs
+"""
+import os
+import sys
+import time
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+
+WORKLOADS = {
+    'loop': """
+i = 0
+while i < {n}:
+{{
+    i = i + 1
+}}
+""",
+    'arithmetic': """
+total = 0
+for i in range({n}):
+{{
+    total = total + (i * 3 - 1) % 7 + i / 2
+}}
+""",
+    'calls': """
+def add(a, b):
+{{
+    return a + b
+}}
+total = 0
+for i in range({n}):
+{{
+    total = add(total, i)
+}}
+""",
+    'wide_calls': """
+def scale(x, a, b=1, c=2, d=3, e=4, f=5, g=6):
+{{
+    return x + a * b
+}}
+class Scaler:
+{{
+    def __init__(factor):
+    {{
+        self.factor = factor
+    }}
+    def shift(x, a, b=1, c=2, d=3, e=4, f=5, g=6):
+    {{
+        return x + a * self.factor
+    }}
+}}
+s = Scaler(2)
+total = 0
+for i in range({n}):
+{{
+    total = scale(total, i, b=2) + s.shift(0, i, g=1)
+}}
+""",
+    'attributes': """
+class Point:
+{{
+    def __init__(x, y):
+    {{
+        self.x = x
+        self.y = y
+    }}
+    def norm():
+    {{
+        return self.x * self.x + self.y * self.y
+    }}
+}}
+p = Point(3, 4)
+total = 0
+for i in range({n}):
+{{
+    total = total + p.x + p.norm()
+}}
+""",
+    'ml': """
+from ai.ml import logistic_regression_train
+hybrid {{
+    X = [[0], [1], [2], [3], [4], [5], [6], [7]]
+    y = [0, 0, 0, 0, 1, 1, 1, 1]
+    model = logistic_regression_train(X, y, 0.1, {epochs})
+}}
+""",
+}
+
+
+def run(code, repeat, backend):
+    tree = HybridParser(HybridLexer(code).tokenize()).parse()
+    best = None
+    for _ in range(repeat):
+        interpreter = HybridInterpreter(backend=backend)
+        start = time.perf_counter()
+        interpreter.interpret(tree)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Time the interpreter on small Bayan workloads')
+    ap.add_argument('--n', type=int, default=20000, help='Iterations per workload (default: 20000)')
+    ap.add_argument('--repeat', type=int, default=5, help='Runs per workload, best is kept (default: 5)')
+    ap.add_argument('--only', choices=sorted(WORKLOADS), help='Run a single workload')
+    ap.add_argument('--backend', choices=['tree', 'compiled'], default='tree', help='Interpreter backend (default: tree)')
+    args = ap.parse_args()
+
+    # ai/ml.bayan is imported relative to the repository root
+    os.chdir(os.path.dirname(BAYAN_PKG_DIR))
+    for name, code in WORKLOADS.items():
+        if args.only and name != args.only:
+            continue
+        elapsed = run(code.format(n=args.n, epochs=max(1, args.n // 100)), args.repeat, args.backend)
+        print(f"{name:12s} {elapsed * 1e3:9.1f} ms  {elapsed / args.n * 1e6:7.2f} us/iteration")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: opening and querying a persistent knowledge base.
+Usage:
+  python3 scripts/bench_kb_store.py [--facts 200000] [--keep DIR]
+
+Builds an engine with edge(nI, nJ, W) facts, writes it with save_kb, then
+reports how long load_kb takes to open the store, the memory it retains
+(tracemalloc), and the latency of point queries on the first and on the
+second argument served from the memory-mapped segments.
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def build(facts):
+    engine = LogicalEngine()
+    for i in range(facts):
+        engine.add_fact(Fact(Predicate('edge', [Term(f"n{i}"), Term(f"n{(i * 7919) % facts}"), Term(i % 100)])))
+    return engine
+
+
+def best_of(fn, repeat=20):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Measure opening and querying a saved knowledge base')
+    ap.add_argument('--facts', type=int, default=200000, help='Number of facts (default: 200000)')
+    ap.add_argument('--keep', help='Write the store here instead of a temporary directory')
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    engine = build(args.facts)
+    print(f"build in memory:   {time.perf_counter() - start:.2f} s")
+
+    path = args.keep or tempfile.mkdtemp()
+    start = time.perf_counter()
+    engine.save_kb(path)
+    print(f"save_kb:           {time.perf_counter() - start:.2f} s")
+    del engine
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    loaded = LogicalEngine()
+    store = loaded.load_kb(path)
+    opened = time.perf_counter() - start
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"load_kb:           {opened * 1000:.2f} ms, {retained / 1024:.0f} KiB retained")
+
+    probe = args.facts // 2
+    first = Predicate('edge', [Term(f"n{probe}"), var('Y'), var('W')])
+    second = Predicate('edge', [var('X'), Term(f"n{probe}"), var('W')])
+    assert len(loaded.query(first)) == 1 and len(loaded.query(second)) == 1
+    print(f"query 1st arg:     {best_of(lambda: loaded.query(first)) * 1e6:.0f} us")
+    print(f"query 2nd arg:     {best_of(lambda: loaded.query(second)) * 1e6:.0f} us")
+
+    store.close()
+    if not args.keep:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
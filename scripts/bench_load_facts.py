@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk fact ingestion.
+Usage:
+  python3 scripts/bench_load_facts.py [--rows 200000] [--parsed 5000]
+
+Writes a CSV file of edge(src, dst, weight) rows and compares, per fact:
+  - parsed:     'fact edge(...).' statements through lexer, parser and
+                interpreter (on the first --parsed rows only; it is slow)
+  - add_fact:   add_fact(Fact(Predicate(...))) in a Python loop
+  - csv:        load_facts('edges.csv', 'edge', columns=[...])
+  - generator:  load_facts(<generator of tuples>, 'edge')
+Each result is checked with an indexed query once loading is done.
+"""
+import os
+import sys
+import csv
+import time
+import shutil
+import argparse
+import tempfile
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+
+
+def rows(count):
+    for i in range(count):
+        yield (f"n{i}", f"n{(i * 7919) % count}", str(i % 100))
+
+
+def parsed(path, count):
+    code = 'hybrid {\n' + ''.join(f'    fact edge("{a}", "{b}", "{w}").\n' for a, b, w in rows(count)) + '}\n'
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interpreter.logical
+
+
+def add_fact_loop(path, count):
+    engine = LogicalEngine()
+    for a, b, w in rows(count):
+        engine.add_fact(Fact(Predicate('edge', [Term(a), Term(b), Term(w)])))
+    return engine
+
+
+def load_csv(path, count):
+    engine = LogicalEngine()
+    engine.load_facts(path, 'edge', columns=['src', 'dst', 'weight'])
+    return engine
+
+
+def load_generator(path, count):
+    engine = LogicalEngine()
+    engine.load_facts(rows(count), 'edge')
+    return engine
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Compare ways of loading many facts')
+    ap.add_argument('--rows', type=int, default=200000, help='Rows in the CSV file (default: 200000)')
+    ap.add_argument('--parsed', type=int, default=5000, help='Rows loaded through the parser (default: 5000)')
+    args = ap.parse_args()
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'edges.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['src', 'dst', 'weight'])
+        writer.writerows(rows(args.rows))
+
+    print(f"{'method':>10} {'rows':>9} {'seconds':>9} {'us/fact':>9}")
+    for name, load, count in [('parsed', parsed, min(args.parsed, args.rows)),
+                              ('add_fact', add_fact_loop, args.rows),
+                              ('csv', load_csv, args.rows),
+                              ('generator', load_generator, args.rows)]:
+        start = time.perf_counter()
+        engine = load(path, count)
+        elapsed = time.perf_counter() - start
+        probe = Predicate('edge', [Term(f"n{count // 2}"), Term('Y', is_variable=True), Term('W', is_variable=True)])
+        assert len(engine.query(probe)) == 1
+        print(f"{name:>10} {count:>9} {elapsed:>9.2f} {elapsed / count * 1e6:>9.1f}")
+    shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
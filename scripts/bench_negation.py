@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark: existence checks and negation over a predicate with many answers.
+Usage:
+  python3 scripts/bench_negation.py [--facts 20000] [--repeat 2000]
+
+Times has_solution and not/1 on a goal whose predicate has --facts answers,
+against counting its answers (len(query(...)) > 0), the check that pays for
+full enumeration.
+"""
+import os
+import sys
+import time
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Rule, Predicate, Term
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def build(facts):
+    engine = LogicalEngine()
+    engine.load_facts(((i, i + 1) for i in range(facts)), 'edge')
+    # linked(X) :- edge(X, Y), edge(Y, Z).
+    engine.add_rule(Rule(Predicate('linked', [var('X')]),
+                         [Predicate('edge', [var('X'), var('Y')]), Predicate('edge', [var('Y'), var('Z')])]))
+    return engine
+
+
+def timed(repeat, check):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        check()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Time existence checks against full enumeration')
+    ap.add_argument('--facts', type=int, default=20000, help='Answers of the checked predicate (default: 20000)')
+    ap.add_argument('--repeat', type=int, default=2000, help='Checks per measurement (default: 2000)')
+    args = ap.parse_args()
+
+    engine = build(args.facts)
+    goal = Predicate('linked', [var('X')])
+    negated = Predicate('not', [goal])
+    enumerate_repeat = max(1, args.repeat // 200)
+    print(f"has_solution:        {timed(args.repeat, lambda: engine.has_solution(goal)):10.1f} us")
+    print(f"not/1:               {timed(args.repeat, lambda: engine.has_solution(negated)):10.1f} us")
+    print(f"len(query(...)) > 0: {timed(enumerate_repeat, lambda: len(engine.query(goal)) > 0):10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
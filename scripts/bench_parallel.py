@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: independent queries and OR-branches on worker processes.
+Usage:
+  python3 scripts/bench_parallel.py [--queries 200] [--nodes 200] [--workers N]
+
+Builds a random graph with tabled reachability and times:
+  - batch:  --queries reachability queries, with engine.query one after
+            another vs. ParallelSolver.query_all
+  - branch: one query over a predicate with four rules per worker, with
+            engine.query vs. ParallelSolver.query
+Solver start-up (forking the workers) is reported separately. Speedups
+need as many idle cores as workers.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def build(nodes, branches):
+    rng = random.Random(7)
+    engine = LogicalEngine()
+    for i in range(nodes):
+        for j in rng.sample(range(nodes), 3):
+            engine.add_fact(Fact(Predicate('edge', [Term(f"n{i}"), Term(f"n{j}")])))
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]),
+                         [Predicate('reach', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]))
+    engine.table('reach')
+    # hub(K, Y): nodes reachable from one of K's start nodes
+    for k in range(branches):
+        engine.add_rule(Rule(Predicate('hub', [Term(k), var('Y')]),
+                             [Predicate('reach', [Term(f"n{k}"), var('Y')])]))
+    return engine
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Compare sequential and parallel query evaluation')
+    ap.add_argument('--queries', type=int, default=200, help='Queries in the batch (default: 200)')
+    ap.add_argument('--nodes', type=int, default=200, help='Graph nodes (default: 200)')
+    ap.add_argument('--workers', type=int, default=os.cpu_count(), help='Worker processes (default: CPUs)')
+    args = ap.parse_args()
+
+    branches = args.workers * 4
+    goals = [Predicate('reach', [Term(f"n{i % args.nodes}"), var('Y')]) for i in range(args.queries)]
+    hub = Predicate('hub', [var('K'), var('Y')])
+
+    # Each run starts from a fresh engine, with empty tables
+    engine = build(args.nodes, branches)
+    start = time.perf_counter()
+    expected = [engine.query(goal) for goal in goals]
+    seq_batch = time.perf_counter() - start
+    engine = build(args.nodes, branches)
+    start = time.perf_counter()
+    expected_hub = engine.query(hub)
+    seq_branch = time.perf_counter() - start
+
+    engine = build(args.nodes, branches)
+    start = time.perf_counter()
+    with engine.parallel(args.workers) as solver:
+        startup = time.perf_counter() - start
+        start = time.perf_counter()
+        results = solver.query_all(goals)
+        par_batch = time.perf_counter() - start
+    assert [len(r) for r in results] == [len(r) for r in expected]
+
+    with build(args.nodes, branches).parallel(args.workers) as solver:
+        start = time.perf_counter()
+        answers = solver.query(hub)
+        par_branch = time.perf_counter() - start
+    assert len(answers) == len(expected_hub)
+
+    print(f"workers: {args.workers}   solver start-up: {startup * 1000:.1f} ms")
+    print(f"{'workload':>8} {'sequential (ms)':>17} {'parallel (ms)':>15} {'speedup':>9}")
+    print(f"{'batch':>8} {seq_batch * 1000:>17.1f} {par_batch * 1000:>15.1f} {seq_batch / par_batch:>8.1f}x")
+    print(f"{'branch':>8} {seq_branch * 1000:>17.1f} {par_branch * 1000:>15.1f} {seq_branch / par_branch:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query_many vs. one query per input.
+Usage:
+  python3 scripts/bench_query_many.py [--entities 20000] [--inputs 20000] [--repeat 3]
+
+Loads state(E, Key, Value) facts for --entities entities and four keys, then
+asks state(?E, "hunger", ?V) for --inputs entities:
+  - loop:      engine.query once per entity
+  - top-down:  query_many with the hash join disabled (join_ratio = 0)
+  - join:      query_many with the default join_ratio
+"""
+import os
+import sys
+import time
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Predicate, Substitution, Term, atom
+
+KEYS = ('hunger', 'thirst', 'fatigue', 'mood')
+
+
+def best_of(repeat, run):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Compare query_many with a loop of queries')
+    ap.add_argument('--entities', type=int, default=20000, help='Entities with state facts (default: 20000)')
+    ap.add_argument('--inputs', type=int, default=20000, help='Entities queried (default: 20000)')
+    ap.add_argument('--repeat', type=int, default=3, help='Runs per variant, best is reported (default: 3)')
+    args = ap.parse_args()
+
+    engine = LogicalEngine()
+    engine.load_facts(((f"e{i}", key, f"{(i * 37) % 100 / 100}")
+                       for key in KEYS for i in range(args.entities)), 'state')
+    goal = Predicate('state', [Term('E', is_variable=True), Term('hunger'), Term('V', is_variable=True)])
+    inputs = [{'E': f"e{i % args.entities}"} for i in range(args.inputs)]
+
+    def loop():
+        return {(b['E'],): engine.query(goal, Substitution({'E': atom(b['E'])})) for b in inputs}
+
+    def top_down():
+        engine.join_ratio = 0
+        try:
+            return engine.query_many(goal, inputs)
+        finally:
+            engine.join_ratio = LogicalEngine.join_ratio
+
+    loop_time, expected = best_of(args.repeat, loop)
+    print(f"{'variant':>10} {'total (ms)':>12} {'us/input':>10}")
+    for name, run in (('loop', loop), ('top-down', top_down), ('join', lambda: engine.query_many(goal, inputs))):
+        elapsed, result = best_of(args.repeat, run) if name != 'loop' else (loop_time, expected)
+        assert {k: [s.bindings for s in v] for k, v in result.items()} == \
+            {k: [s.bindings for s in v] for k, v in expected.items()}
+        print(f"{name:>10} {elapsed * 1000:>12.1f} {elapsed / args.inputs * 1e6:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: compiled rule closures vs. the interpreted rule path.
+Usage:
+  python3 scripts/bench_rule_compile.py [--depth 150] [--repeat 5]
+
+Times rule-heavy queries with LogicalEngine(compile_rules=False) and
+LogicalEngine(compile_rules=True):
+  - chain:  right-recursive reachability over a chain of edges
+  - join:   a three-way join rule over a small grid of facts
+  - count:  recursion with 'is' arithmetic and comparisons
+"""
+import os
+import sys
+import time
+import argparse
+
+BAYAN_PKG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bayan'))
+if BAYAN_PKG_DIR not in sys.path:
+    sys.path.insert(0, BAYAN_PKG_DIR)
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import IsExpression, BinaryOp, Variable, Number
+
+
+def var(name):
+    return Term(name, is_variable=True)
+
+
+def chain_workload(engine, depth):
+    for i in range(depth):
+        engine.add_fact(Fact(Predicate('edge', [Term(f"n{i}"), Term(f"n{i + 1}")])))
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]),
+                         [Predicate('edge', [var('X'), var('Z')]), Predicate('reach', [var('Z'), var('Y')])]))
+    return Predicate('reach', [Term('n0'), var('Y')]), depth
+
+
+def join_workload(engine, depth):
+    size = max(2, int(depth ** 0.5))
+    for i in range(size):
+        for j in range(size):
+            engine.add_fact(Fact(Predicate('link', [Term(i), Term(j)])))
+    engine.add_rule(Rule(Predicate('tri', [var('A'), var('B'), var('C')]),
+                         [Predicate('link', [var('A'), var('B')]),
+                          Predicate('link', [var('B'), var('C')]),
+                          Predicate('link', [var('C'), var('A')])]))
+    return Predicate('tri', [Term(0), var('B'), var('C')]), size * size
+
+
+def count_workload(engine, depth):
+    # count(N, N).  count(I, N) :- I < N, J is I + 1, count(J, N).
+    engine.add_rule(Rule(Predicate('count', [var('N'), var('N')]), []))
+    engine.add_rule(Rule(Predicate('count', [var('I'), var('N')]),
+                         [Predicate('_compare_<', [var('I'), var('N')]),
+                          IsExpression(var('J'), BinaryOp('+', Variable('?I'), Number(1))),
+                          Predicate('count', [var('J'), var('N')])]))
+    return Predicate('count', [Term(0), Term(depth)]), 1
+
+
+WORKLOADS = {'chain': chain_workload, 'join': join_workload, 'count': count_workload}
+
+
+def time_workload(build, depth, repeat, compile_rules):
+    engine = LogicalEngine(compile_rules=compile_rules)
+    goal, expected = build(engine, depth)
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert len(engine.query(goal)) == expected
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Compare compiled and interpreted rule execution')
+    ap.add_argument('--depth', type=int, default=150, help='Recursion depth / workload size (default: 150)')
+    ap.add_argument('--repeat', type=int, default=5, help='Runs per workload, best is reported (default: 5)')
+    args = ap.parse_args()
+
+    print(f"{'workload':>10} {'interpreted (ms)':>18} {'compiled (ms)':>15} {'speedup':>9}")
+    for name, build in WORKLOADS.items():
+        interpreted = time_workload(build, args.depth, args.repeat, compile_rules=False)
+        compiled = time_workload(build, args.depth, args.repeat, compile_rules=True)
+        print(f"{name:>10} {interpreted * 1000:>18.2f} {compiled * 1000:>15.2f} {interpreted / compiled:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
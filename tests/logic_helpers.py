@@ -0,0 +1,66 @@
+"""
+Shared helpers for the logical engine tests
+أدوات مشتركة لاختبارات المحرك المنطقي
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+
+
+def var(name):
+    """A logical variable term"""
+    return Term(name, is_variable=True)
+
+
+def pred(name, *args):
+    """The predicate name(args); plain Python values become constant terms"""
+    return Predicate(name, [arg if isinstance(arg, (Term, Predicate, list, dict)) else Term(arg)
+                            for arg in args])
+
+
+def fact(name, *args):
+    """The fact name(args)"""
+    return Fact(pred(name, *args))
+
+
+def engine_with(facts=(), rules=(), **options):
+    """A LogicalEngine(**options) holding facts, given as (name, arg, ...) tuples, then rules"""
+    engine = LogicalEngine(**options)
+    for name, *args in facts:
+        engine.add_fact(fact(name, *args))
+    for rule in rules:
+        engine.add_rule(rule)
+    return engine
+
+
+def closure_rules(name, step, left_recursive=False):
+    """The transitive closure of the binary relation step, as two rules of name.
+
+    name(X, Y) :- step(X, Y).  name(X, Y) :- step(X, Z), name(Z, Y).
+    left_recursive puts the recursive call first: name(X, Y) :- name(X, Z), step(Z, Y).
+    """
+    X, Y, Z = var('X'), var('Y'), var('Z')
+    if left_recursive:
+        body = [pred(name, X, Z), pred(step, Z, Y)]
+    else:
+        body = [pred(step, X, Z), pred(name, Z, Y)]
+    return [Rule(pred(name, X, Y), [pred(step, X, Y)]), Rule(pred(name, X, Y), body)]
+
+
+def grandparent_rule():
+    """grandparent(X, Z) :- parent(X, Y), parent(Y, Z)."""
+    return Rule(pred('grandparent', var('X'), var('Z')),
+                [pred('parent', var('X'), var('Y')), pred('parent', var('Y'), var('Z'))])
+
+
+def answers(solutions):
+    """The bindings of each solution as {name: repr(value)}"""
+    return [{name: repr(value) for name, value in s.bindings.items()} for s in solutions]
+
+
+def values(engine, goal, *names):
+    """The values bound to names in each solution of goal, as tuples"""
+    return [tuple(s.lookup(name).value for name in names) for s in engine.query(goal)]
@@ -0,0 +1,116 @@
+"""
+Tests for aggregate_all/3 and bagof/setof grouping
+اختبارات aggregate_all/3 والتجميع في bagof/setof
+"""
+
+import sys
+import os
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import BinaryOp, Variable, Number
+from tests.logic_helpers import var, engine_with
+
+
+def _engine():
+    return engine_with([('grade', *row) for row in [
+        ('john', 'math', 90), ('mary', 'math', 85), ('bob', 'math', 78),
+        ('john', 'physics', 88), ('mary', 'physics', 92), ('mary', 'math', 85)]])
+
+
+def _aggregate(engine, spec, goal):
+    solutions = engine.query(Predicate('aggregate_all', [spec, goal, var('R')]))
+    return [s.lookup('R') for s in solutions]
+
+
+def test_aggregate_all_specs():
+    engine = _engine()
+    goal = Predicate('grade', [var('S'), Term('math'), var('G')])
+    assert _aggregate(engine, Term('count'), goal) == [4]
+    assert _aggregate(engine, Predicate('sum', [var('G')]), goal) == [338]
+    assert _aggregate(engine, Predicate('max', [var('G')]), goal) == [90]
+    assert _aggregate(engine, Predicate('min', [var('G')]), goal) == [78]
+    assert _aggregate(engine, Predicate('bag', [var('S')]), goal) == [['john', 'mary', 'bob', 'mary']]
+    assert _aggregate(engine, Predicate('set', [var('S')]), goal) == [['bob', 'john', 'mary']]
+    double = BinaryOp('*', Variable('?G'), Number(2))
+    assert _aggregate(engine, Predicate('sum', [double]), goal) == [676]
+
+
+def test_aggregate_all_without_solutions():
+    engine = _engine()
+    goal = Predicate('grade', [var('S'), Term('art'), var('G')])
+    assert _aggregate(engine, Term('count'), goal) == [0]
+    assert _aggregate(engine, Predicate('sum', [var('G')]), goal) == [0]
+    assert _aggregate(engine, Predicate('bag', [var('S')]), goal) == [[]]
+    assert _aggregate(engine, Predicate('max', [var('G')]), goal) == []
+    assert _aggregate(engine, Predicate('sum', [var('S')]), Predicate('grade', [var('S'), var('X'), var('G')])) == []
+
+
+def test_aggregate_all_in_rule_body():
+    # total(S, T) :- aggregate_all(sum(G), grade(S, X, G), T).
+    engine = _engine()
+    engine.add_rule(Rule(Predicate('total', [var('S'), var('T')]),
+                         [Predicate('aggregate_all', [Predicate('sum', [var('G')]),
+                                                      Predicate('grade', [var('S'), var('X'), var('G')]),
+                                                      var('T')])]))
+    for compile_rules in (True, False):
+        engine.compile_rules = compile_rules
+        solutions = engine.query(Predicate('total', [Term('mary'), var('T')]))
+        assert [s.lookup('T') for s in solutions] == [262]
+
+
+def test_unknown_aggregate_spec():
+    engine = _engine()
+    with pytest.raises(ValueError):
+        _aggregate(engine, Term('average'), Predicate('grade', [var('S'), var('X'), var('G')]))
+
+
+def test_bagof_groups_by_free_variables():
+    engine = _engine()
+    goal = Predicate('bagof', [var('S'), Predicate('grade', [var('S'), var('X'), var('G')]), var('L')])
+    # Free variables X and G: one solution per distinct (subject, grade)
+    groups = [(s.lookup('X').value, s.lookup('G').value, s.lookup('L')) for s in engine.query(goal)]
+    assert groups == [('math', 78, ['bob']), ('math', 85, ['mary', 'mary']), ('math', 90, ['john']),
+                      ('physics', 88, ['john']), ('physics', 92, ['mary'])]
+    goal = Predicate('bagof', [var('S'),
+                               Predicate('^', [var('G'), Predicate('grade', [var('S'), var('X'), var('G')])]),
+                               var('L')])
+    groups = [(s.lookup('X').value, s.lookup('L')) for s in engine.query(goal)]
+    assert groups == [('math', ['john', 'mary', 'bob', 'mary']), ('physics', ['john', 'mary'])]
+
+
+def test_setof_groups_are_sorted_and_unique():
+    engine = _engine()
+    goal = Predicate('setof', [var('S'),
+                               Predicate('^', [var('G'), Predicate('grade', [var('S'), var('X'), var('G')])]),
+                               var('L')])
+    groups = [(s.lookup('X').value, s.lookup('L')) for s in engine.query(goal)]
+    assert groups == [('math', ['bob', 'john', 'mary']), ('physics', ['john', 'mary'])]
+    # A bound free variable selects its group only
+    goal = Predicate('setof', [var('G'), Predicate('grade', [var('S'), Term('physics'), var('G')]), var('L')])
+    assert [(s.lookup('S').value, s.lookup('L')) for s in engine.query(goal)] == [('john', [88]), ('mary', [92])]
+
+
+def test_setof_orders_mixed_terms():
+    engine = LogicalEngine()
+    for value in [Term('b'), Term(3), Predicate('f', [Term(1)]), Term('a'), Term(3), Term(1.5)]:
+        engine.add_fact(Fact(Predicate('v', [value])))
+    solutions = engine.query(Predicate('setof', [var('X'), Predicate('v', [var('X')]), var('L')]))
+    assert solutions[0].lookup('L') == [1.5, 3, 'a', 'b', Predicate('f', [Term(1)])]
+
+
+def test_count_runs_in_constant_memory():
+    engine = LogicalEngine()
+    for i in range(20000):
+        engine.add_fact(Fact(Predicate('p', [Term(i % 100), Term(i)])))
+    goal = Predicate('aggregate_all', [Term('count'), Predicate('p', [var('A'), var('B')]), var('N')])
+    assert engine.query(goal)[0].lookup('N') == 20000
+    tracemalloc.start()
+    try:
+        assert engine.query(goal)[0].lookup('N') == 20000
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 64 * 1024
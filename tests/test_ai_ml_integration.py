@@ -161,7 +161,8 @@ def test_data_collection_with_bagof_setof():
     # Collect all samples for class_a using bagof
     goal = Predicate('bagof', [
         Term('Score', is_variable=True),
-        Predicate('training_sample', [Term('ID', is_variable=True), Term('class_a'), Term('Score', is_variable=True)]),
+        Predicate('^', [Term('ID', is_variable=True),
+                        Predicate('training_sample', [Term('ID', is_variable=True), Term('class_a'), Term('Score', is_variable=True)])]),
         Term('Scores', is_variable=True)
     ])
     result = engine.query(goal)
@@ -177,7 +178,8 @@ def test_data_collection_with_bagof_setof():
     # Now test setof for unique classes
     goal2 = Predicate('setof', [
         Term('Class', is_variable=True),
-        Predicate('training_sample', [Term('ID', is_variable=True), Term('Class', is_variable=True), Term('Score', is_variable=True)]),
+        Predicate('^', [Term('ID', is_variable=True), Predicate('^', [Term('Score', is_variable=True),
+                        Predicate('training_sample', [Term('ID', is_variable=True), Term('Class', is_variable=True), Term('Score', is_variable=True)])])]),
         Term('Classes', is_variable=True)
     ])
     result2 = engine.query(goal2)
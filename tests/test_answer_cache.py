@@ -0,0 +1,125 @@
+"""
+Tests for the answer cache of repeated queries
+اختبارات ذاكرة الإجابات المؤقتة للاستعلامات المتكررة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, AnswerCache, Fact, Rule, Predicate, Term, Substitution
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from tests.logic_helpers import var, engine_with, grandparent_rule
+
+
+def _engine(size=8):
+    engine = engine_with([('parent', 'ali', 'omar'), ('parent', 'omar', 'sara'), ('parent', 'omar', 'huda'),
+                          ('unrelated', 'x')], [grandparent_rule()])
+    engine.answer_cache = AnswerCache(size)
+    return engine
+
+
+def _values(solutions, name):
+    return [s.lookup(name).value for s in solutions]
+
+
+GOAL = Predicate('grandparent', [Term('ali'), var('Z')])
+
+
+def test_repeated_query_hits_the_cache():
+    engine = _engine()
+    assert _values(engine.query(GOAL), 'Z') == ['sara', 'huda']
+    assert _values(engine.query(GOAL), 'Z') == ['sara', 'huda']
+    # The same query with its variable renamed reports the new name
+    renamed = engine.query(Predicate('grandparent', [Term('ali'), var('W')]))
+    assert _values(renamed, 'W') == ['sara', 'huda']
+    assert engine.has_solution(GOAL)
+    stats = engine.answer_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 2, 2)
+
+
+def test_changes_invalidate_exactly_the_dependent_entries():
+    engine = _engine()
+    engine.query(GOAL)
+    engine.query(Predicate('unrelated', [var('U')]))
+    engine.add_fact(Fact(Predicate('unrelated', [Term('y')])))
+    engine.query(GOAL)
+    assert engine.answer_cache.stats()['hits'] == 1
+
+    engine.assertz(Fact(Predicate('parent', [Term('omar'), Term('zaid')])))
+    assert _values(engine.query(GOAL), 'Z') == ['sara', 'huda', 'zaid']
+    engine.retract(Predicate('parent', [Term('omar'), Term('sara')]))
+    assert _values(engine.query(GOAL), 'Z') == ['huda', 'zaid']
+    engine.asserta(Fact(Predicate('parent', [Term('omar'), Term('mona')])))
+    assert _values(engine.query(GOAL), 'Z') == ['mona', 'huda', 'zaid']
+    engine.retractall(Predicate('parent', [Term('omar'), var('C')]))
+    assert engine.query(GOAL) == []
+    engine.add_rule(Rule(Predicate('parent', [Term('omar'), var('C')]), [Predicate('unrelated', [var('C')])]))
+    assert _values(engine.query(GOAL), 'Z') == ['x', 'y']
+    assert engine.answer_cache.stats()['stale'] == 5
+
+
+def test_partial_and_bound_queries_are_not_cached():
+    engine = _engine()
+    assert engine.first_solution(GOAL).lookup('Z').value == 'sara'
+    assert len(engine.answer_cache) == 0
+    engine.query(Predicate('grandparent', [var('X'), var('Z')]), Substitution({'X': Term('ali')}))
+    assert len(engine.answer_cache) == 0
+
+
+def test_cached_solutions_are_copies():
+    engine = _engine()
+    first = engine.query(GOAL)
+    first[0].bind('Z', Term('changed'))
+    assert _values(engine.query(GOAL), 'Z') == ['sara', 'huda']
+    assert _values(engine.query(GOAL), 'Z') == ['sara', 'huda']
+
+
+def test_cached_lists_and_compounds_are_copies():
+    engine = _engine()
+    engine.add_fact(Fact(Predicate('pair', [Predicate('p', [Term('a'), [Term('b')]])])))
+    collect = Predicate('findall', [var('C'), Predicate('parent', [Term('omar'), var('C')]), var('L')])
+    pair = Predicate('pair', [var('P')])
+    for solution in engine.query(collect) + engine.query(collect):
+        solution.lookup('L').append('HACK')
+    engine.query(pair)[0].lookup('P').args[1].value.append(Term('HACK'))
+    engine.query(pair)[0].lookup('P').args.append(Term('HACK'))
+    assert engine.query(collect)[0].lookup('L') == ['sara', 'huda']
+    assert repr(engine.query(pair)[0].lookup('P')) == "p(a, [b])"
+    assert engine.answer_cache.stats()['hits'] == 4
+
+
+def test_size_bound_evicts_least_recently_used():
+    engine = _engine(size=2)
+    goals = [Predicate('parent', [Term(name), var('C')]) for name in ('ali', 'omar', 'sara')]
+    engine.query(goals[0])
+    engine.query(goals[1])
+    engine.query(goals[0])
+    engine.query(goals[2])  # Evicts goals[1]
+    engine.query(goals[0])
+    engine.query(goals[1])
+    stats = engine.answer_cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 4, 2)
+
+
+def test_switched_on_for_every_engine(monkeypatch):
+    monkeypatch.setattr(LogicalEngine, 'answer_cache_size', 16)
+    interpreter = HybridInterpreter()
+    program = """
+    hybrid {
+        fact parent("ali", "omar").
+        fact parent("omar", "sara").
+        rule grandparent(?X, ?Z) :- parent(?X, ?Y), parent(?Y, ?Z).
+        query grandparent("ali", ?Z).
+        fact parent("omar", "huda").
+        query grandparent("ali", ?Z).
+    }
+    """
+    interpreter.interpret(HybridParser(HybridLexer(program).tokenize()).parse())
+    cache = interpreter.logical.answer_cache
+    assert cache.size == 16 and cache.stats()['stale'] == 1
+    assert _values(interpreter.logical.query(Predicate('grandparent', [Term('ali'), var('Z')])), 'Z') == \
+        ['sara', 'huda']
+    assert LogicalEngine().answer_cache is not None
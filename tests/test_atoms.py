@@ -0,0 +1,67 @@
+"""
+Tests for interned atoms and the compact term representation
+اختبارات الذرات المدمجة والتمثيل المضغوط للحدود
+"""
+
+import gc
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term, atom, intern_term, _atoms
+from bayan.entity_engine import EntityEngine
+
+
+def test_symbols_are_shared_atoms():
+    assert atom('ali') is atom('ali')
+    assert atom('ali') == Term('ali')
+    # Numbers are not interned, and 1 and 1.0 stay distinct constants
+    assert atom(1) is not atom(1)
+    assert atom(1.0).value.__class__ is float
+
+
+def test_terms_have_no_instance_dict():
+    for obj in (Term('a'), Predicate('p', []), Fact(Predicate('p', []))):
+        with pytest.raises(AttributeError):
+            obj.extra = 1
+
+
+def test_intern_term_keeps_variables():
+    term = intern_term(Predicate('p', [Term('a'), Term('X', is_variable=True), Predicate('q', [Term('b')])]))
+    assert term.args[0] is atom('a')
+    assert term.args[1].is_variable
+    assert term.args[2].args[0] is atom('b')
+
+
+def test_stored_facts_share_symbols():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('parent', [Term('ali'), Term('omar')])))
+    engine.add_fact(Fact(Predicate('parent', [Term('omar'), Term('sara')])))
+    first, second = engine.knowledge_base['parent']
+    assert first.predicate.args[1] is second.predicate.args[0]
+    results = engine.query(Predicate('parent', [Term('ali'), Term('X', is_variable=True)]))
+    assert results[0].lookup('X') is atom('omar')
+
+
+def test_entity_facts_use_atoms():
+    engine = LogicalEngine()
+    entities = EntityEngine(engine)
+    entities.create_entity('ahmad', states={'hunger': 0.5})
+    state = engine.knowledge_base['state'][0].predicate
+    assert state.args[0] is atom('ahmad') and state.args[1] is atom('hunger')
+
+
+def test_unused_atoms_are_released():
+    engine = LogicalEngine()
+    for step in range(50):
+        engine.assertz(Fact(Predicate('at', [Term(f'cell-{step}')])))
+        if step < 49:
+            engine.retract(Predicate('at', [Term(f'cell-{step}')]))
+    gc.collect()
+    assert 'cell-49' in _atoms
+    assert not any(f'cell-{step}' in _atoms for step in range(49))
+    del engine
+    gc.collect()
+    assert 'cell-49' not in _atoms
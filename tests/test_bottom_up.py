@@ -0,0 +1,127 @@
+"""
+Tests for bottom-up (semi-naive) Datalog materialization
+اختبارات التجسيد التصاعدي (شبه الساذج) لداتالوغ
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.entity_engine import EntityEngine
+from tests.logic_helpers import var, engine_with, closure_rules
+
+
+def _path_engine(edges, **kwargs):
+    """path(X, Y) :- edge(X, Y).  path(X, Y) :- path(X, Z), edge(Z, Y)."""
+    return engine_with([('edge', a, b) for a, b in edges],
+                       closure_rules('path', 'edge', left_recursive=True), **kwargs)
+
+
+def _reachable(engine, source):
+    goal = Predicate('path', [Term(source), var('Y')])
+    return sorted(s.lookup('Y').value for s in engine.query(goal))
+
+
+def test_materialize_left_recursion_on_cycle():
+    engine = _path_engine([(i, (i + 1) % 30) for i in range(30)])
+    model = engine.materialize()
+    assert engine.mode == 'bottom_up'
+    assert len(model.relations[('path', 2)]) == 30 * 30
+    assert _reachable(engine, 0) == list(range(30))
+
+
+def test_bottom_up_mode_matches_top_down():
+    edges = [('a', 'b'), ('b', 'c'), ('c', 'd'), ('b', 'e')]
+    top_down = _path_engine(edges)
+    top_down.table('path')  # Left recursion needs tabling top-down
+    bottom_up = _path_engine(edges, mode='bottom_up')
+    for source in 'abcde':
+        assert _reachable(bottom_up, source) == _reachable(top_down, source)
+    # Fully bound and fully open goals
+    assert bottom_up.has_solution(Predicate('path', [Term('a'), Term('d')]))
+    assert not bottom_up.has_solution(Predicate('path', [Term('d'), Term('a')]))
+    assert len(bottom_up.query(Predicate('path', [var('X'), var('Y')]))) == 8
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        LogicalEngine(mode='sideways')
+
+
+def test_assert_propagates_incrementally():
+    engine = _path_engine([('a', 'b')])
+    model = engine.materialize()
+    engine.assertz(Fact(Predicate('edge', [Term('b'), Term('c')])))
+    assert engine._materialization is model
+    assert _reachable(engine, 'a') == ['b', 'c']
+
+
+def test_retract_deletes_and_rederives():
+    # c is reachable from a both directly and through b
+    engine = _path_engine([('a', 'b'), ('b', 'c'), ('a', 'c'), ('c', 'd')])
+    model = engine.materialize()
+    engine.retract(Predicate('edge', [Term('b'), Term('c')]))
+    assert engine._materialization is model
+    assert _reachable(engine, 'a') == ['b', 'c', 'd']
+    assert _reachable(engine, 'b') == []
+    engine.retractall(Predicate('edge', [Term('a'), var('Y')]))
+    assert _reachable(engine, 'a') == []
+
+
+def test_duplicate_facts_keep_tuple_alive():
+    engine = _path_engine([('a', 'b'), ('a', 'b')])
+    engine.materialize()
+    engine.retract(Predicate('edge', [Term('a'), Term('b')]))
+    assert _reachable(engine, 'a') == ['b']
+
+
+def test_comparisons_filter_derivations():
+    engine = LogicalEngine()
+    for name, age in [('ali', 30), ('sara', 12)]:
+        engine.add_fact(Fact(Predicate('age', [Term(name), Term(age)])))
+    engine.add_rule(Rule(Predicate('adult', [var('P')]),
+                         [Predicate('_compare_>=', [var('A'), Term(18)]),
+                          Predicate('age', [var('P'), var('A')])]))
+    engine.materialize()
+    results = engine.query(Predicate('adult', [var('P')]))
+    assert [s.lookup('P').value for s in results] == ['ali']
+
+
+def test_non_datalog_rules_stay_top_down():
+    engine = _path_engine([('a', 'b')])
+    engine.add_rule(Rule(Predicate('isolated', [var('X')]),
+                         [Predicate('edge', [var('X'), var('Y')]),
+                          Predicate('not', [Predicate('path', [var('Y'), var('Z')])])]))
+    model = engine.materialize()
+    assert 'path' in model.derived
+    assert 'isolated' not in model.derived
+    assert [s.lookup('X').value for s in engine.query(Predicate('isolated', [var('X')]))] == ['a']
+
+
+def test_rule_change_rebuilds_model():
+    engine = _path_engine([('a', 'b'), ('b', 'c')])
+    engine.materialize()
+    engine.add_rule(Rule(Predicate('linked', [var('X'), var('Y')]),
+                         [Predicate('path', [var('X'), var('Y')])]))
+    assert engine._materialization is None
+    results = engine.query(Predicate('linked', [Term('a'), var('Y')]))
+    assert sorted(s.lookup('Y').value for s in results) == ['b', 'c']
+    assert 'linked' in engine._materialization.derived
+
+
+def test_entity_state_updates_are_maintained():
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('hungry', [var('E')]),
+                         [Predicate('state', [var('E'), Term('hunger'), var('V')]),
+                          Predicate('_compare_>', [var('V'), Term(0.5)])]))
+    entities = EntityEngine(engine)
+    entities.create_entity('ahmad', states={'hunger': 0.8})
+    engine.materialize()
+    model = engine._materialization
+    assert [s.lookup('E').value for s in engine.query(Predicate('hungry', [var('E')]))] == ['ahmad']
+    entities.set_state('ahmad', 'hunger', 0.2)
+    assert engine._materialization is model
+    assert engine.query(Predicate('hungry', [var('E')])) == []
@@ -0,0 +1,132 @@
+"""
+Tests for the call signatures precomputed on function definitions
+اختبارات تواقيع الاستدعاء المحسوبة مسبقاً عند تعريف الدوال
+"""
+
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.ast_nodes import CallSignature, Parameter, Number, BinaryOp
+
+
+def _run(code):
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interpreter.traditional.global_env
+
+
+def test_signature_is_built_with_the_definition():
+    tree = HybridParser(HybridLexer("""
+class Box:
+{
+    def put(self, item, *rest, count=1, **options):
+    {
+        return item
+    }
+}
+""").tokenize()).parse()
+    method = tree.statements[0].body.statements[0]
+    assert method.signature.names == ('self', 'item', 'count')
+    assert method.method_signature.names == ('item', 'count')
+    assert (method.signature.varargs, method.signature.kwargs) == ('rest', 'options')
+
+
+def test_bind_defaults_varargs_and_kwargs():
+    signature = CallSignature([Parameter('a'), Parameter('b', Number(2)),
+                               Parameter('c', BinaryOp('+', Number(1), Number(2))),
+                               Parameter('rest', is_varargs=True), Parameter('extra', is_kwargs=True)],
+                              'function f')
+    interpreter = HybridInterpreter().traditional
+    env = {}
+    signature.bind(interpreter, env, [1], {'z': 9})
+    assert env == {'a': 1, 'b': 2, 'c': 3, 'rest': [], 'extra': {'z': 9}}
+    env = {}
+    signature.bind(interpreter, env, [1, 5, 6, 7, 8], {'b': 0})
+    assert env == {'a': 1, 'b': 0, 'c': 6, 'rest': [7, 8], 'extra': {}}
+
+
+def test_bind_errors():
+    signature = CallSignature([Parameter('a'), Parameter('b', Number(2))], 'function f')
+    interpreter = HybridInterpreter().traditional
+    with pytest.raises(RuntimeError, match="Too many positional arguments for function f"):
+        signature.bind(interpreter, {}, [1, 2, 3])
+    with pytest.raises(RuntimeError, match="Unexpected keyword argument: c"):
+        signature.bind(interpreter, {}, [1], {'c': 3})
+    with pytest.raises(RuntimeError, match="Missing required parameter: a"):
+        signature.bind(interpreter, {}, [], {'b': 3})
+
+
+def test_methods_and_constructors_take_named_arguments():
+    env = _run("""
+class Account:
+{
+    def __init__(owner, balance=0):
+    {
+        self.owner = owner
+        self.balance = balance
+    }
+    def deposit(amount, fee=0):
+    {
+        self.balance = self.balance + amount - fee
+        return self.balance
+    }
+}
+a = Account("sara", balance=10)
+after = a.deposit(5, fee=1)
+""")
+    assert env['a'].attributes['owner'] == "sara"
+    assert env['after'] == 14
+
+
+def test_method_reports_missing_argument():
+    with pytest.raises(Exception, match="Missing required parameter: amount"):
+        _run("""
+class Account:
+{
+    def deposit(amount):
+    {
+        return amount
+    }
+}
+a = Account()
+a.deposit()
+""")
+
+
+def test_failed_binding_restores_the_caller_environment():
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer("""
+def f(a):
+{
+    return a
+}
+""").tokenize()).parse())
+    with pytest.raises(Exception, match="Too many positional arguments for function f"):
+        interpreter.interpret(HybridParser(HybridLexer("f(1, 2)").tokenize()).parse())
+    assert interpreter.traditional.local_env is None
+
+
+def test_nested_and_mapped_functions_use_defaults():
+    env = _run("""
+def outer():
+{
+    def inner(x, step=10):
+    {
+        return x + step
+    }
+    return inner(1)
+}
+def bump(x, step=2):
+{
+    return x + step
+}
+nested = outer()
+mapped = map(bump, [1, 2])
+""")
+    assert env['nested'] == 11
+    assert env['mapped'] == [3, 4]
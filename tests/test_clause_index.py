@@ -0,0 +1,83 @@
+"""
+Tests for argument indexing of knowledge-base clauses
+اختبارات فهرسة وسائط جمل قاعدة المعرفة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+
+
+def _fact(name, *args):
+    return Fact(Predicate(name, [Term(a) for a in args]))
+
+
+def _values(solutions, var):
+    return [sol.lookup(var).value for sol in solutions]
+
+
+def test_first_argument_lookup_only_tries_matching_clauses():
+    engine = LogicalEngine()
+    for i in range(100):
+        engine.add_fact(_fact('state', f"e{i}", 'hunger', i / 100))
+
+    goal = Predicate('state', [Term('e42'), Term('hunger'), Term('V', is_variable=True)])
+    assert len(engine._candidate_clauses(goal)) == 1
+    assert _values(engine.query(goal), 'V') == [0.42]
+
+
+def test_index_keeps_clause_order_with_variable_heads():
+    engine = LogicalEngine()
+    engine.add_fact(_fact('p', 'a', 1))
+    engine.add_fact(Fact(Predicate('p', [Term('X', is_variable=True), Term(2)])))
+    engine.add_fact(_fact('p', 'b', 3))
+    engine.add_fact(_fact('p', 'a', 4))
+
+    goal = Predicate('p', [Term('a'), Term('N', is_variable=True)])
+    assert _values(engine.query(goal), 'N') == [1, 2, 4]
+
+
+def test_asserta_assertz_retract_keep_index_current():
+    engine = LogicalEngine()
+    engine.add_fact(_fact('parent', 'tom', 'bob'))
+    goal = Predicate('parent', [Term('tom'), Term('X', is_variable=True)])
+    assert _values(engine.query(goal), 'X') == ['bob']
+
+    engine.assertz(_fact('parent', 'tom', 'liz'))
+    engine.asserta(_fact('parent', 'tom', 'ann'))
+    engine.assertz(_fact('parent', 'pam', 'bob'))
+    assert _values(engine.query(goal), 'X') == ['ann', 'bob', 'liz']
+
+    assert engine.retract(Predicate('parent', [Term('tom'), Term('bob')]))
+    assert _values(engine.query(goal), 'X') == ['ann', 'liz']
+
+    assert engine.retractall(Predicate('parent', [Term('tom'), Term('X', is_variable=True)])) == 2
+    assert engine.query(goal) == []
+    assert len(engine.knowledge_base['parent']) == 1
+
+
+def test_jit_index_on_second_argument():
+    engine = LogicalEngine()
+    for i in range(50):
+        engine.add_fact(_fact('likes', f"p{i}", f"food{i % 5}"))
+
+    goal = Predicate('likes', [Term('P', is_variable=True), Term('food3')])
+    solutions = engine.query(goal)
+    assert len(solutions) == 10
+    assert 1 in engine.clause_index['likes'].positions
+
+    # The new position is maintained like the first one
+    engine.assertz(_fact('likes', 'p99', 'food3'))
+    assert len(engine.query(goal)) == 11
+
+
+def test_indexing_can_be_disabled():
+    engine = LogicalEngine(indexing=False)
+    engine.add_fact(_fact('color', 'red'))
+    engine.add_fact(_fact('color', 'blue'))
+    goal = Predicate('color', [Term('blue')])
+    assert len(engine._candidate_clauses(goal)) == 2
+    assert len(engine.query(goal)) == 1
+    assert engine.clause_index == {}
@@ -0,0 +1,100 @@
+"""
+Tests for 'is' and comparison goals compiled with their rules
+اختبارات أهداف 'is' والمقارنة المترجمة مع قواعدها
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import Fact, Rule, Predicate, Term
+from bayan.ast_nodes import IsExpression, BinaryOp, UnaryOp, Variable, Number
+from tests.logic_helpers import var, answers
+
+
+PROGRAM = """
+hybrid {
+    fact price("apple", 1.5).
+    fact price("bread", 3).
+    fact price("salt", "0.25").
+    fact stock("apple", 10).
+    fact stock("bread", 0).
+    fact stock("salt", 4).
+
+    rule value(?P, ?V) :- price(?P, ?X), stock(?P, ?S), ?V is ?X * ?S.
+    rule unit(?P, ?U) :- price(?P, ?X), stock(?P, ?S), ?U is ?X / ?S.
+    rule cheap(?P) :- price(?P, ?X), ?X < 2.
+    rule folded(?P, ?V) :- price(?P, ?X), ?V is ?X + 2 * 3.
+    rule negated(?P, ?V) :- price(?P, ?X), ?V is -?X.
+    rule check(?P, ?V) :- price(?P, ?X), stock(?P, ?S), ?V is ?X * ?S, ?V > 10.
+}
+"""
+
+
+def _engine(compile_rules):
+    interpreter = HybridInterpreter()
+    interpreter.logical.compile_rules = compile_rules
+    interpreter.interpret(HybridParser(HybridLexer(PROGRAM).tokenize()).parse())
+    return interpreter.logical
+
+
+GOALS = [
+    Predicate('value', [var('P'), var('V')]),
+    Predicate('value', [Term('apple'), Term(15.0)]),
+    Predicate('unit', [var('P'), var('U')]),
+    Predicate('cheap', [var('P')]),
+    Predicate('folded', [var('P'), var('V')]),
+    Predicate('negated', [var('P'), var('V')]),
+    Predicate('check', [var('P'), var('V')]),
+]
+
+
+def test_compiled_arithmetic_matches_interpreted():
+    compiled = _engine(True)
+    interpreted = _engine(False)
+    for goal in GOALS:
+        assert answers(compiled.query(goal)) == answers(interpreted.query(goal)), goal
+
+
+def test_compiled_arithmetic_answers():
+    engine = _engine(True)
+    assert answers(engine.query(GOALS[0])) == [{'P': 'apple', 'V': '15.0'}, {'P': 'bread', 'V': '0'},
+                                          {'P': 'salt', 'V': '1.0'}]
+    assert engine.has_solution(GOALS[1])
+    # Division by zero fails for bread only
+    assert [s.lookup('P').value for s in engine.query(GOALS[2])] == ['apple', 'salt']
+    assert [s.lookup('P').value for s in engine.query(GOALS[3])] == ['apple', 'salt']
+    assert [s.lookup('V') for s in engine.query(GOALS[4])] == [7.5, 9, 6.25]
+    assert [s.lookup('V') for s in engine.query(GOALS[5])] == [-1.5, -3, -0.25]
+    assert answers(engine.query(GOALS[6])) == [{'P': 'apple', 'V': '15.0'}]
+
+
+def test_numeric_recursion():
+    # fact(0, 1).  fact(N, F) :- N > 0, N1 is N - 1, fact(N1, F1), F is N * F1.
+    engine = _engine(True)
+    engine.add_fact(Fact(Predicate('fact', [Term(0), Term(1)])))
+    engine.add_rule(Rule(Predicate('fact', [var('N'), var('F')]),
+                         [Predicate('_compare_>', [var('N'), Term(0)]),
+                          IsExpression(var('N1'), BinaryOp('-', Variable('?N'), Number(1))),
+                          Predicate('fact', [var('N1'), var('F1')]),
+                          IsExpression(var('F'), BinaryOp('*', Variable('?N'), Variable('?F1')))]))
+    assert [s.lookup('F') for s in engine.query(Predicate('fact', [Term(10), var('F')]))] == [3628800]
+    assert engine.has_solution(Predicate('fact', [Term(5), Term(120)]))
+    assert not engine.has_solution(Predicate('fact', [Term(5), Term(121)]))
+
+
+def test_unevaluable_expressions_fail():
+    engine = _engine(True)
+    # u(X) :- Y is X + 1.  (X unbound)   w(V) :- price(P, X), V is X + P.  (P is a symbol)
+    engine.add_rule(Rule(Predicate('u', [var('Y')]),
+                         [IsExpression(var('Y'), BinaryOp('+', Variable('?X'), Number(1)))]))
+    engine.add_rule(Rule(Predicate('w', [var('V')]),
+                         [Predicate('price', [var('P'), var('X')]),
+                          IsExpression(var('V'), BinaryOp('+', Variable('?X'), Variable('?P')))]))
+    engine.add_rule(Rule(Predicate('z', [var('V')]),
+                         [IsExpression(var('V'), UnaryOp('-', BinaryOp('/', Number(1), Number(0))))]))
+    for name in ('u', 'w', 'z'):
+        assert engine.query(Predicate(name, [var('V')])) == []
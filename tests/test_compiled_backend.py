@@ -0,0 +1,254 @@
+"""
+Tests for the closure compiler backend of the interpreter
+اختبارات الواجهة الخلفية المترجِمة إلى دوال مغلقة في المفسّر
+"""
+
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.traditional_interpreter import TraditionalInterpreter
+
+
+PROGRAM = """
+class Vec:
+{
+    def __init__(x, y):
+    {
+        self.x = x
+        self.y = y
+    }
+    def __add__(other):
+    {
+        return Vec(self.x + other.x, self.y + other.y)
+    }
+}
+def fib(n):
+{
+    if n < 2:
+    {
+        return n
+    }
+    return fib(n - 1) + fib(n - 2)
+}
+evens = []
+total = 0
+for i in range(20):
+{
+    if i % 2 == 1:
+    {
+        continue
+    }
+    if i > 12:
+    {
+        break
+    }
+    evens.append(i)
+    total = total + i
+}
+k = 0
+while True:
+{
+    k = k + 1
+    if k >= 5:
+    {
+        break
+    }
+}
+v = Vec(1, 2) + Vec(3, 4)
+pair = (v.x, v.y)
+nums = [1, 2, 3]
+flags = [not (k == 5), -k, total > 10 and k < 10, nums[1:], nums[-1]]
+f = fib(10)
+"""
+
+NAMES = ('evens', 'total', 'k', 'pair', 'flags', 'f')
+
+
+def _run(code, backend):
+    interpreter = HybridInterpreter(backend=backend)
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interpreter
+
+
+def _error(code, backend):
+    with pytest.raises(Exception) as info:
+        _run(code, backend)
+    return str(info.value)
+
+
+def test_backends_agree():
+    tree = _run(PROGRAM, 'tree').traditional.global_env
+    compiled = _run(PROGRAM, 'compiled').traditional.global_env
+    assert {name: tree[name] for name in NAMES} == {name: compiled[name] for name in NAMES}
+    assert compiled['evens'] == [0, 2, 4, 6, 8, 10, 12]
+    assert compiled['pair'] == (4, 6)
+    assert compiled['f'] == 55
+
+
+def test_nodes_are_compiled_once():
+    interpreter = _run(PROGRAM, 'compiled')
+    compiler = interpreter.traditional.compiler
+    count = len(compiler.closures)
+    assert count > 0
+    interpreter.interpret(HybridParser(HybridLexer("f = fib(12)").tokenize()).parse())
+    # Only the new statement's nodes; fib's body is reused
+    assert len(compiler.closures) - count < 6
+    assert interpreter.traditional.global_env['f'] == 144
+
+
+def test_errors_report_the_same_bayan_stack():
+    code = """
+def inner(x):
+{
+    return x[3]
+}
+def outer(x):
+{
+    for i in range(3):
+    {
+        y = inner(x) + i
+    }
+}
+outer([1])
+"""
+    message = _error(code, 'compiled')
+    assert message == _error(code, 'tree')
+    assert 'TypeError: Indexing not supported' in message
+    assert 'ForLoop' in message and 'SubscriptAccess' in message
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        TraditionalInterpreter(backend='jit')
+
+
+def test_dotted_names_are_split_when_parsed():
+    from bayan.ast_nodes import Variable, Assignment, Number
+    assert Variable('total').attribute is None
+    assert Variable('p.x').attribute == ('p', 'x')
+    assert Assignment('p.y', Number(1)).attribute == ('p', 'y')
+    code = """
+class P:
+{
+    def __init__():
+    {
+        self.x = 1
+    }
+}
+p = P()
+p.x = p.x + 41
+n = p.x
+"""
+    for backend in ('tree', 'compiled'):
+        assert _run(code, backend).traditional.global_env['n'] == 42
+
+
+def test_local_slots_are_resolved_per_function():
+    tree = HybridParser(HybridLexer("""
+def scale(xs, k=2):
+{
+    out = []
+    for x in xs:
+    {
+        y = x * k
+        out.append(y)
+    }
+    return out
+}
+def guarded(x):
+{
+    try:
+    {
+        return 1 / x
+    }
+    except ZeroDivisionError as e:
+    {
+        return 0
+    }
+}
+def squares(xs):
+{
+    return [x * x for x in xs]
+}
+def counter():
+{
+    def step(n):
+    {
+        return n + 1
+    }
+    return step
+}
+""").tokenize()).parse()
+    slots = {statement.name: statement.local_slots for statement in tree.statements}
+    # Parameters first, then the names the body binds
+    assert sorted(slots['scale'], key=slots['scale'].get)[:2] == ['xs', 'k']
+    assert sorted(slots['scale'].values()) == [0, 1, 2, 3, 4] and set(slots['scale']) == {'xs', 'k', 'out', 'x', 'y'}
+    assert slots['guarded'] is None and slots['squares'] is None and slots['counter'] is None
+    # The nested definition is resolved on its own
+    assert tree.statements[3].body.statements[0].local_slots == {'n': 0}
+
+
+def test_slot_locals_behave_like_dict_locals():
+    code = """
+limit = 100
+def clip(v):
+{
+    if v > limit:
+    {
+        limit = v
+        return limit
+    }
+    return v
+}
+def factorial(n):
+{
+    if n < 2:
+    {
+        return 1
+    }
+    return n * factorial(n - 1)
+}
+def apply_all(f, xs):
+{
+    total = 0
+    for x in xs:
+    {
+        total = total + f(x)
+    }
+    return total
+}
+def double(x):
+{
+    return x * 2
+}
+def rows(n):
+{
+    grid = [[0, 0], [0, 0]]
+    for i in range(n):
+    {
+        grid[i][i] = grid[i][i] + factorial(i + 2)
+    }
+    return grid
+}
+before = clip(5)
+after = clip(150)
+f = factorial(6)
+applied = apply_all(float, [1, 2, 3])
+mapped = map(double, [4, 5])
+grid = rows(2)
+"""
+    tree = _run(code, 'tree').traditional
+    compiled = _run(code, 'compiled').traditional
+    names = ('before', 'after', 'f', 'applied', 'mapped', 'grid', 'limit')
+    assert {name: tree.global_env[name] for name in names} == \
+        {name: compiled.global_env[name] for name in names}
+    assert compiled.global_env['after'] == 150 and compiled.global_env['limit'] == 100
+    assert compiled.global_env['grid'] == [[2, 0], [0, 6]]
+    assert compiled.global_env['applied'] == 6.0 and compiled.global_env['mapped'] == [8, 10]
+    assert compiled.frame is None and compiled.local_env is None
+    assert len(compiled.compiler.bodies) == 5
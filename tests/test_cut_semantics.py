@@ -0,0 +1,81 @@
+"""
+Execution tests for the cut operator (!) in the logical engine
+اختبارات تنفيذ عامل القطع (!) في المحرك المنطقي
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import Fact, Rule, Predicate, Term
+from bayan.ast_nodes import Cut
+from tests.logic_helpers import var, pred, fact, engine_with
+
+
+def _engine():
+    """q(a). q(b). s(1). s(2).  p(X) :- q(X), !.  p(z)."""
+    engine = engine_with([('q', 'a'), ('q', 'b'), ('s', 1), ('s', 2)],
+                         [Rule(pred('p', var('X')), [pred('q', var('X')), Cut()])])
+    # After the rule, so the cut in it prunes this clause
+    engine.add_fact(fact('p', 'z'))
+    return engine
+
+
+def _values(engine, goal, name):
+    return [s.lookup(name).value for s in engine.query(goal)]
+
+
+def test_cut_commits_to_first_solution_and_clause():
+    engine = _engine()
+    assert _values(engine, Predicate('p', [var('X')]), 'X') == ['a']
+
+
+def test_goals_after_cut_still_backtrack():
+    engine = _engine()
+    engine.add_rule(Rule(Predicate('r', [var('X'), var('Y')]),
+                         [Predicate('q', [var('X')]), Cut(), Predicate('s', [var('Y')])]))
+    results = engine.query(Predicate('r', [var('X'), var('Y')]))
+    assert [(s.lookup('X').value, s.lookup('Y').value) for s in results] == [('a', 1), ('a', 2)]
+
+
+def test_cut_is_local_to_its_invocation():
+    engine = _engine()
+    engine.add_rule(Rule(Predicate('t', [var('X')]), [Predicate('p', [var('X')])]))
+    engine.add_fact(Fact(Predicate('t', [Term('c')])))
+    assert _values(engine, Predicate('t', [var('X')]), 'X') == ['a', 'c']
+    goal = Predicate('findall', [var('X'), Predicate('p', [var('X')]), var('L')])
+    assert engine.query(goal)[0].lookup('L') == ['a']
+
+
+def test_pruned_alternatives_are_never_run():
+    # The second clause would recurse forever if it were ever tried
+    engine = _engine()
+    engine.add_rule(Rule(Predicate('p', [var('X')]), [Predicate('p', [var('X')])]))
+    assert _values(engine, Predicate('p', [var('X')]), 'X') == ['a']
+
+
+def test_cut_without_solution_does_not_prune():
+    engine = _engine()
+    engine.add_rule(Rule(Predicate('u', [var('X')]),
+                         [Predicate('q', [var('X')]), Predicate('s', [var('X')]), Cut()]))
+    engine.add_fact(Fact(Predicate('u', [Term('fallback')])))
+    assert _values(engine, Predicate('u', [var('X')]), 'X') == ['fallback']
+
+
+def test_deterministic_classification_from_source():
+    code = """
+hybrid {
+    rule classify(?X, "positive") :- ?X > 0, !.
+    rule classify(?X, "zero") :- ?X == 0, !.
+    fact classify_default("negative").
+    rule classify(?X, ?C) :- classify_default(?C).
+}
+"""
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    engine = interpreter.logical
+    for value, expected in [(5, ['positive']), (0, ['zero']), (-3, ['negative'])]:
+        assert _values(engine, Predicate('classify', [Term(value), var('C')]), 'C') == expected
@@ -116,3 +116,61 @@ def test_colored_code_frame_optional():
     assert ">1 |" in msg
     assert "^" in msg
 
+
+
+def test_stack_trace_lists_nodes_through_function_calls():
+    code = """
+def inner(x):
+{
+    return x / 0
+}
+def outer(x):
+{
+    return inner(x) + 1
+}
+r = outer(2)
+"""
+    with pytest.raises(Exception) as ei:
+        run(code)
+    msg = str(ei.value)
+    assert "ZeroDivisionError" in msg
+    stack = msg.split("Bayan stack: ")[1].split("\n")[0]
+    names = [frame.split("@")[0] for frame in stack.split(" -> ")]
+    assert names == ['Assignment', 'FunctionCall', 'Block', 'ReturnStatement', 'BinaryOp',
+                     'FunctionCall', 'Block', 'ReturnStatement', 'BinaryOp']
+
+
+def _stack_names(code, backend):
+    interpreter = HybridInterpreter(backend=backend)
+    with pytest.raises(Exception) as ei:
+        interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    stack = str(ei.value).split("Bayan stack: ")[1].split("\n")[0]
+    return [frame.split("@")[0] for frame in stack.split(" -> ")]
+
+
+@pytest.mark.parametrize("backend", ["tree", "compiled"])
+def test_statement_level_function_call_has_one_frame(backend):
+    code = """
+def f(x):
+{
+    return x / 0
+}
+f(3)
+"""
+    assert _stack_names(code, backend) == ['FunctionCall', 'Block', 'ReturnStatement', 'BinaryOp']
+
+
+@pytest.mark.parametrize("backend", ["tree", "compiled"])
+def test_statement_level_method_call_has_one_frame(backend):
+    code = """
+class C:
+{
+    def m(x):
+    {
+        return x / 0
+    }
+}
+c = C()
+c.m(1)
+"""
+    assert _stack_names(code, backend) == ['MethodCall', 'Block', 'ReturnStatement', 'BinaryOp']
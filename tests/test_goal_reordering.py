@@ -0,0 +1,94 @@
+"""
+Tests for cost-based reordering of rule bodies and explain()
+اختبارات إعادة ترتيب أهداف القواعد حسب الكلفة و explain()
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Rule, Predicate, Term
+from bayan.ast_nodes import Cut
+from tests.logic_helpers import var, pred, engine_with
+
+
+def _engine(reorder_goals=True, compile_rules=True):
+    engine = engine_with(compile_rules=compile_rules, reorder_goals=reorder_goals)
+    engine.load_facts(((f"x{i}", f"y{i % 50}") for i in range(1000)), 'big')
+    engine.load_facts([('y1',), ('y2',)], 'small')
+    # r(X, Y) :- big(X, Y), small(Y).
+    engine.add_rule(Rule(pred('r', var('X'), var('Y')), [pred('big', var('X'), var('Y')), pred('small', var('Y'))]))
+    return engine
+
+
+def _answers(engine, goal):
+    return sorted(tuple(sorted((k, repr(v)) for k, v in s.bindings.items())) for s in engine.query(goal))
+
+
+def test_statistics():
+    engine = _engine()
+    assert engine.statistics('big') == (1000, [1000, 50])
+    assert engine.statistics('small') == (2, [2])
+    assert engine.statistics('r') is None
+    assert engine.statistics('missing') is None
+
+
+def test_small_relation_goes_first():
+    goal = Predicate('r', [var('X'), var('Y')])
+    for compile_rules in (True, False):
+        engine = _engine(compile_rules=compile_rules)
+        assert _answers(engine, goal) == _answers(_engine(False, compile_rules), goal)
+        assert len(engine.query(goal)) == 40
+    plan = engine.explain(goal).splitlines()
+    assert plan[2:] == ['    1. small(?Y)  ~2 rows', '    2. big(?X, ?Y)  ~20 rows']
+    # A bound first argument makes big/2 the cheaper goal
+    plan = engine.explain(Predicate('r', [Term('x1'), var('Y')])).splitlines()
+    assert [line.split('.')[1].split('  ')[0].strip() for line in plan[2:]] == ['big(?X, ?Y)', 'small(?Y)']
+
+
+def test_written_order_without_reordering():
+    engine = _engine(reorder_goals=False)
+    plan = engine.explain(Predicate('r', [var('X'), var('Y')])).splitlines()
+    assert plan[2:] == ['    1. big(?X, ?Y)  ~1000 rows', '    2. small(?Y)  ~1 rows']
+    assert engine.explain(Predicate('big', [var('X'), var('Y')])).endswith('facts only')
+
+
+def test_impure_and_rule_goals_stay_in_place():
+    engine = _engine()
+    # s(X, Y) :- big(X, Y), !, r(Z, Y), small(Y).
+    engine.add_rule(Rule(Predicate('s', [var('X'), var('Y')]),
+                         [Predicate('big', [var('X'), var('Y')]), Cut(),
+                          Predicate('r', [var('Z'), var('Y')]), Predicate('small', [var('Y')])]))
+    lines = engine.explain(Predicate('s', [var('X'), var('Y')])).splitlines()[2:]
+    assert [line.split('. ', 1)[1].split('  ')[0] for line in lines] == \
+        ['big(?X, ?Y)', 'Cut(!)', 'r(?Z, ?Y)', 'small(?Y)']
+    # Recursive rules terminate: their calls are never moved before the facts
+    engine.load_facts([(f"n{i}", f"n{i + 1}") for i in range(20)], 'edge')
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]),
+                         [Predicate('edge', [var('X'), var('Z')]), Predicate('reach', [var('Z'), var('Y')])]))
+    assert len(engine.query(Predicate('reach', [Term('n0'), var('Y')]))) == 20
+
+
+def test_plans_follow_changing_statistics():
+    engine = _engine()
+    goal = Predicate('r', [var('X'), var('Y')])
+    assert 'small(?Y)' in engine.explain(goal).splitlines()[2]
+    engine.load_facts(((f"y{i}",) for i in range(3, 20000)), 'small')
+    assert 'big(?X, ?Y)' in engine.explain(goal).splitlines()[2]
+    assert len(engine.query(goal)) == 980  # every y but y0
+    # A fact predicate that gains a rule is no longer reordered
+    engine.add_rule(Rule(Predicate('small', [var('Y')]), [Predicate('big', [var('X'), var('Y')])]))
+    assert engine.statistics('small') is None
+
+
+def test_stored_predicate_statistics(tmp_path):
+    _engine().save_kb(str(tmp_path / 'kb'))
+    engine = LogicalEngine(reorder_goals=True)
+    store = engine.load_kb(str(tmp_path / 'kb'))
+    try:
+        assert engine.statistics('big') == (1000, [1000, 50])
+        assert 'small(?Y)' in engine.explain(Predicate('r', [var('X'), var('Y')])).splitlines()[2]
+        assert len(engine.query(Predicate('r', [var('X'), var('Y')]))) == 40
+    finally:
+        store.close()
@@ -0,0 +1,125 @@
+"""
+Tests for materialized predicates maintained incrementally in top-down mode
+اختبارات المسندات المجسّدة المحدَّثة تزايديًا في وضع الاستدلال التنازلي
+"""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.entity_engine import EntityEngine
+from tests.logic_helpers import var, pred, fact
+
+
+def _simulation(materialize):
+    """hungry(E) :- state(E, "hunger", V), V > 0.7.  alert(G) :- member(G, E), hungry(E)."""
+    engine = LogicalEngine()
+    entities = EntityEngine(engine)
+    for i in range(20):
+        entities.create_entity(f"e{i}", states={'hunger': 0.5, 'thirst': 0.5})
+        engine.add_fact(fact('member', f"g{i % 4}", f"e{i}"))
+    engine.add_rule(Rule(pred('hungry', var('E')),
+                         [pred('state', var('E'), 'hunger', var('V')), pred('_compare_>', var('V'), 0.7)]))
+    engine.add_rule(Rule(pred('alert', var('G')), [pred('member', var('G'), var('E')), pred('hungry', var('E'))]))
+    if materialize:
+        engine.materialize('alert')
+    return engine, entities
+
+
+def _values(engine, goal, name):
+    return sorted({s.lookup(name).value for s in engine.query(goal)})
+
+
+def test_only_declared_predicates_are_materialized():
+    engine, _ = _simulation(True)
+    model = engine._materialization
+    assert engine.mode == 'top_down'
+    assert engine.materialized == {'alert'}
+    assert model.derived == {'alert', 'hungry'}
+    assert model.inputs == {'alert', 'hungry', 'member', 'state'}
+    # A named predicate without Datalog rules is solved top-down
+    engine.add_rule(Rule(Predicate('calm', [var('E')]),
+                         [Predicate('member', [var('G'), var('E')]),
+                          Predicate('not', [Predicate('hungry', [var('E')])])]))
+    engine.materialize('calm')
+    assert 'calm' not in engine._materialization.derived
+    assert len(engine.query(Predicate('calm', [var('E')]))) == 20
+
+
+def test_state_updates_keep_derived_predicates_current():
+    engine, entities = _simulation(True)
+    reference, reference_entities = _simulation(False)
+    model = engine._materialization
+    rng = random.Random(3)
+    for _ in range(200):
+        name, key, value = f"e{rng.randrange(20)}", rng.choice(['hunger', 'thirst']), rng.choice([0.2, 0.6, 0.9])
+        entities.set_state(name, key, value)
+        reference_entities.set_state(name, key, value)
+        assert _values(engine, Predicate('alert', [var('G')]), 'G') == \
+            _values(reference, Predicate('alert', [var('G')]), 'G')
+        assert _values(engine, Predicate('hungry', [var('E')]), 'E') == \
+            _values(reference, Predicate('hungry', [var('E')]), 'E')
+    # Every update was propagated into the same model
+    assert engine._materialization is model
+
+
+def test_recursive_view_under_inserts_and_deletes():
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('reach', [var('X'), var('Y')]),
+                         [Predicate('reach', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]))
+    engine.materialize('reach')
+    for i in range(5):
+        engine.add_fact(Fact(Predicate('edge', [Term(i), Term(i + 1)])))
+    assert _values(engine, Predicate('reach', [Term(0), var('Y')]), 'Y') == [1, 2, 3, 4, 5]
+    engine.add_fact(Fact(Predicate('edge', [Term(0), Term(3)])))
+    engine.retract(Predicate('edge', [Term(1), Term(2)]))
+    assert _values(engine, Predicate('reach', [Term(0), var('Y')]), 'Y') == [1, 3, 4, 5]
+    engine.retract(Predicate('edge', [Term(0), Term(3)]))
+    assert _values(engine, Predicate('reach', [Term(0), var('Y')]), 'Y') == [1]
+
+
+def test_unchanged_state_is_not_reasserted():
+    engine, entities = _simulation(True)
+    generation = engine._generations['state']
+    entities.set_state('e1', 'hunger', 0.5)
+    assert engine._generations['state'] == generation
+    entities.set_state('e1', 'hunger', 0.9)
+    assert engine._generations['state'] > generation
+    assert _values(engine, Predicate('alert', [var('G')]), 'G') == ['g1']
+
+
+def test_materialized_answers_keep_top_down_order():
+    """friend(X, Y) :- likes(X, Y), person(Y).  known(X) :- person(X).  known(X) :- pet(X)."""
+    def build(materialize):
+        engine = LogicalEngine()
+        for name in ('alice', 'bob', 'carol', 'dave', 'eve'):
+            engine.add_fact(Fact(Predicate('person', [Term(name)])))
+        for name in ('rex', 'tom'):
+            engine.add_fact(Fact(Predicate('pet', [Term(name)])))
+        for x, y in [('eve', 'bob'), ('alice', 'dave'), ('alice', 'bob'), ('carol', 'rex'), ('bob', 'alice')]:
+            engine.add_fact(Fact(Predicate('likes', [Term(x), Term(y)])))
+        engine.add_rule(Rule(Predicate('friend', [var('X'), var('Y')]),
+                             [Predicate('likes', [var('X'), var('Y')]), Predicate('person', [var('Y')])]))
+        engine.add_rule(Rule(Predicate('known', [var('X')]), [Predicate('person', [var('X')])]))
+        engine.add_rule(Rule(Predicate('known', [var('X')]), [Predicate('pet', [var('X')])]))
+        if materialize:
+            engine.materialize('friend', 'known')
+        return engine
+
+    def answers(engine):
+        return ([[s.lookup(n).value for n in ('X', 'Y')] for s in engine.query(Predicate('friend', [var('X'), var('Y')]))],
+                [s.lookup('X').value for s in engine.query(Predicate('known', [var('X')]))],
+                [s.lookup('Y').value for s in engine.query(Predicate('friend', [Term('alice'), var('Y')]))])
+
+    top_down, materialized = build(False), build(True)
+    assert materialized.materialized == {'friend', 'known'}
+    assert answers(materialized) == answers(top_down)
+    # Tuples derived by later updates follow the existing ones
+    for engine in (top_down, materialized):
+        engine.add_fact(Fact(Predicate('person', [Term('zed')])))
+        engine.add_fact(Fact(Predicate('likes', [Term('alice'), Term('zed')])))
+    assert answers(materialized)[0] == answers(top_down)[0]
+    assert answers(materialized)[1] == ['alice', 'bob', 'carol', 'dave', 'eve', 'rex', 'tom', 'zed']
@@ -0,0 +1,96 @@
+"""
+Tests for the iterative (explicit-stack) solver
+اختبارات الحلّال التكراري (بمكدس صريح)
+"""
+
+import sys
+import os
+import inspect
+import pytest
+from contextlib import contextmanager
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from bayan.ast_nodes import IsExpression, BinaryOp, Variable, Number, Cut
+from tests.logic_helpers import var, engine_with, closure_rules
+
+
+@contextmanager
+def _shallow_stack(frames=150):
+    """Allow only a fixed number of Python frames beyond the current depth"""
+    old = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack(0)) + frames)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(old)
+
+
+def _chain_engine(n):
+    """edge(i, i+1).  reach(X, Y) :- edge(X, Y).  reach(X, Y) :- edge(X, Z), reach(Z, Y)."""
+    return engine_with([('edge', i, i + 1) for i in range(n)], closure_rules('reach', 'edge'))
+
+
+def test_long_chain_of_facts():
+    engine = _chain_engine(20000)
+    with _shallow_stack():
+        assert engine.has_solution(Predicate('reach', [Term(0), Term(20000)]))
+        assert len(engine.query(Predicate('reach', [Term(0), var('Y')]))) == 20000
+
+
+def test_list_walk_with_head_tail_pattern():
+    # len([], 0).  len([H|T], N) :- len(T, M), N is M + 1.
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('len', [[], Term(0)])))
+    engine.add_rule(Rule(Predicate('len', [{'list_pattern': True, 'head': [var('H')], 'tail': var('T')},
+                                           var('N')]),
+                         [Predicate('len', [var('T'), var('M')]),
+                          IsExpression(var('N'), BinaryOp('+', Variable('?M'), Number(1)))]))
+    items = [Term(i) for i in range(5000)]
+    with _shallow_stack():
+        solutions = engine.query(Predicate('len', [items, var('N')]))
+    assert [s.lookup('N') for s in solutions] == [5000]
+
+
+def test_tail_recursive_count_with_cut():
+    # count(N, N) :- !.  count(I, N) :- I < N, J is I + 1, count(J, N).
+    engine = LogicalEngine()
+    engine.add_rule(Rule(Predicate('count', [var('N'), var('N')]), [Cut()]))
+    engine.add_rule(Rule(Predicate('count', [var('I'), var('N')]),
+                         [Predicate('_compare_<', [var('I'), var('N')]),
+                          IsExpression(var('J'), BinaryOp('+', Variable('?I'), Number(1))),
+                          Predicate('count', [var('J'), var('N')])]))
+    with _shallow_stack():
+        assert len(engine.query(Predicate('count', [Term(0), Term(20000)]))) == 1
+
+
+def test_interpreted_path_still_available():
+    engine = _chain_engine(50)
+    engine.compile_rules = False
+    assert len(engine.query(Predicate('reach', [Term(0), var('Y')]))) == 50
+
+
+def test_solutions_report_only_query_variables():
+    engine = _chain_engine(5)
+    solution = engine.first_solution(Predicate('reach', [Term(0), var('Y')]))
+    assert list(solution.bindings) == ['Y']
+
+
+def test_non_terminating_rule_reaches_max_depth():
+    # p(X) :- p(X).
+    for compiled in (True, False):
+        engine = LogicalEngine(compile_rules=compiled)
+        engine.add_rule(Rule(Predicate('p', [var('X')]), [Predicate('p', [var('X')])]))
+        engine.max_depth = 500
+        # The recursive path may run into Python's own limit first
+        with pytest.raises(RuntimeError, match="(?i)maximum recursion depth exceeded"):
+            engine.query(Predicate('p', [Term('a')]))
+
+
+def test_deep_proof_within_max_depth():
+    engine = _chain_engine(300)
+    engine.max_depth = 400
+    assert engine.has_solution(Predicate('reach', [Term(0), Term(300)]))
+    engine.max_depth = 200
+    with pytest.raises(RuntimeError, match="Maximum recursion depth exceeded"):
+        engine.has_solution(Predicate('reach', [Term(0), Term(300)]))
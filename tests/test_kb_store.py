@@ -0,0 +1,117 @@
+"""
+Tests for persistent knowledge bases (save_kb / load_kb)
+اختبارات قواعد المعرفة الدائمة (save_kb / load_kb)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term
+from bayan.kb_store import StoredClauses
+from tests.logic_helpers import var, pred, engine_with, grandparent_rule, values
+
+
+def _engine():
+    facts = []
+    for child, parent, age in [('omar', 'ali', 35), ('sara', 'omar', 10), ('huda', 'omar', 8.5)]:
+        facts += [('parent', parent, child), ('age', child, age)]
+    facts.append(('parent', 'x'))  # another arity
+    facts.append(('pair', pred('f', 1), 'b'))
+    engine = engine_with(facts, [grandparent_rule()])
+    engine.table('grandparent')
+    return engine
+
+
+def _open(path):
+    engine = LogicalEngine()
+    store = engine.load_kb(str(path))
+    return engine, store
+
+
+def test_round_trip(tmp_path):
+    _engine().save_kb(str(tmp_path))
+    engine, store = _open(tmp_path)
+    try:
+        assert isinstance(engine.knowledge_base['parent'], StoredClauses)
+        assert len(engine.knowledge_base['parent']) == 4
+        assert values(engine, Predicate('parent', [Term('omar'), var('C')]), 'C') == [('sara',), ('huda',)]
+        assert values(engine, Predicate('parent', [var('P'), Term('sara')]), 'P') == [('omar',)]
+        assert values(engine, Predicate('parent', [var('X')]), 'X') == [('x',)]
+        assert values(engine, Predicate('grandparent', [var('G'), var('C')]), 'G', 'C') == \
+            [('ali', 'sara'), ('ali', 'huda')]
+        assert 'grandparent' in engine.tabled
+        assert engine.has_solution(Predicate('pair', [Predicate('f', [Term(1)]), Term('b')]))
+        # 35 and 35.0 are the same number; unknown constants match nothing
+        assert values(engine, Predicate('age', [var('C'), Term(35.0)]), 'C') == [('omar',)]
+        assert values(engine, Predicate('age', [var('C'), Term(8.5)]), 'C') == [('huda',)]
+        assert engine.query(Predicate('age', [Term('nobody'), var('A')])) == []
+        engine.compile_rules = False
+        assert len(engine.query(Predicate('grandparent', [Term('ali'), var('C')]))) == 2
+    finally:
+        store.close()
+
+
+def test_appends_and_retractions_persist(tmp_path):
+    _engine().save_kb(str(tmp_path))
+    engine, store = _open(tmp_path)
+    engine.assertz(Fact(Predicate('parent', [Term('sara'), Term('noor')])))
+    engine.assertz(Fact(Predicate('color', [Term('red')])))
+    assert engine.retract(Predicate('parent', [Term('omar'), Term('huda')]))
+    assert engine.retractall(Predicate('age', [var('C'), var('A')])) == 3
+    assert values(engine, Predicate('grandparent', [Term('omar'), var('C')]), 'C') == [('noor',)]
+    store.close()
+
+    engine, store = _open(tmp_path)
+    try:
+        assert values(engine, Predicate('parent', [var('P'), var('C')]), 'P', 'C') == \
+            [('ali', 'omar'), ('omar', 'sara'), ('sara', 'noor')]
+        assert values(engine, Predicate('color', [var('C')]), 'C') == [('red',)]
+        assert engine.query(Predicate('age', [var('C'), var('A')])) == []
+    finally:
+        store.close()
+
+
+def test_non_fact_clauses_move_predicate_into_memory(tmp_path):
+    _engine().save_kb(str(tmp_path))
+    engine, store = _open(tmp_path)
+    try:
+        engine.asserta(Fact(Predicate('parent', [Term('zaid'), Term('ali')])))
+        clauses = engine.knowledge_base['parent']
+        assert isinstance(clauses, list) and len(clauses) == 5
+        assert values(engine, Predicate('parent', [var('P'), Term('ali')]), 'P') == [('zaid',)]
+    finally:
+        store.close()
+
+
+def test_saving_a_loaded_store_compacts_it(tmp_path):
+    first, second = tmp_path / 'first', tmp_path / 'second'
+    _engine().save_kb(str(first))
+    engine, store = _open(first)
+    engine.assertz(Fact(Predicate('parent', [Term('sara'), Term('noor')])))
+    with pytest.raises(ValueError):
+        engine.save_kb(str(first))
+    engine.save_kb(str(second))
+    store.close()
+
+    engine, store = _open(second)
+    try:
+        assert not any(name.startswith('tail-') for name in os.listdir(second))
+        assert values(engine, Predicate('parent', [var('P'), Term('noor')]), 'P') == [('sara',)]
+    finally:
+        store.close()
+
+
+def test_load_refuses_defined_predicates(tmp_path):
+    _engine().save_kb(str(tmp_path))
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('age', [Term('a'), Term(1)])))
+    with pytest.raises(ValueError):
+        engine.load_kb(str(tmp_path))
+
+
+def test_save_refuses_foreign_directory(tmp_path):
+    (tmp_path / 'notes.txt').write_text('keep me')
+    with pytest.raises(FileExistsError):
+        _engine().save_kb(str(tmp_path))
@@ -0,0 +1,93 @@
+"""
+Tests for bulk fact loading (load_facts)
+اختبارات التحميل المجمّع للحقائق (load_facts)
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from tests.logic_helpers import var, values
+
+
+def test_load_from_csv_by_column_names(tmp_path):
+    path = tmp_path / 'people.csv'
+    path.write_text('name,city,age\nali,cairo,60\nsara,amman,10\n', encoding='utf-8')
+    engine = LogicalEngine()
+    assert engine.load_facts(str(path), 'lives', columns=['name', 'city']) == 2
+    assert engine.load_facts(path, 'age', columns=['name', 2]) == 2
+    assert values(engine, Predicate('lives', [var('P'), Term('amman')]), 'P') == [('sara',)]
+    # CSV fields stay strings, as numbers in parsed facts do
+    assert values(engine, Predicate('age', [Term('ali'), var('A')]), 'A') == [('60',)]
+    assert engine.has_solution(Predicate('age', [var('P'), Term('10')]))
+
+
+def test_load_from_tsv_without_header(tmp_path):
+    path = tmp_path / 'edges.tsv'
+    path.write_text('a\tb\nb\tc\n', encoding='utf-8')
+    engine = LogicalEngine()
+    assert engine.load_facts(path, 'edge', header=False) == 2
+    assert values(engine, Predicate('edge', [var('X'), var('Y')]), 'X', 'Y') == [('a', 'b'), ('b', 'c')]
+    with pytest.raises(ValueError):
+        engine.load_facts(path, 'edge', columns=['src'], header=False)
+
+
+def test_load_from_jsonl(tmp_path):
+    path = tmp_path / 'scores.jsonl'
+    path.write_text('\n'.join(json.dumps(row) for row in
+                              [{'who': 'ali', 'score': 7}, {'who': 'sara', 'score': 9.5}]) + '\n',
+                    encoding='utf-8')
+    engine = LogicalEngine()
+    assert engine.load_facts(path, 'score', columns=['who', 'score']) == 2
+    assert values(engine, Predicate('score', [var('W'), var('S')]), 'W', 'S') == [('ali', 7), ('sara', 9.5)]
+    with pytest.raises(ValueError):
+        engine.load_facts(tmp_path / 'scores.xml', 'score')
+
+
+def test_load_streams_from_generator():
+    engine = LogicalEngine()
+    consumed = []
+
+    def rows():
+        for i in range(1000):
+            consumed.append(i)
+            yield (f"n{i}", f"n{i + 1}")
+
+    assert engine.load_facts(rows(), 'edge') == 1000
+    assert len(consumed) == 1000
+    assert engine.load_facts(iter([{'a': 'x', 'b': 'y'}]), 'edge', columns=['b', 'a']) == 1
+    assert values(engine, Predicate('edge', [var('X'), Term('x')]), 'X') == [('y',)]
+    assert values(engine, Predicate('edge', [Term('n500'), var('Y')]), 'Y') == [('n501',)]
+
+
+def test_loaded_facts_update_index_and_tables():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('edge', [Term('a'), Term('b')])))
+    engine.add_rule(Rule(Predicate('path', [var('X'), var('Y')]), [Predicate('edge', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('path', [var('X'), var('Y')]),
+                         [Predicate('path', [var('X'), var('Z')]), Predicate('edge', [var('Z'), var('Y')])]))
+    engine.table('path')
+    # Build the index and the table before loading
+    assert values(engine, Predicate('path', [Term('a'), var('Y')]), 'Y') == [('b',)]
+    engine.load_facts([('b', 'c'), ('c', 'd')], 'edge')
+    assert values(engine, Predicate('edge', [Term('c'), var('Y')]), 'Y') == [('d',)]
+    assert sorted(values(engine, Predicate('path', [Term('a'), var('Y')]), 'Y')) == [('b',), ('c',), ('d',)]
+
+
+def test_load_into_stored_predicate(tmp_path):
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('edge', [Term('a'), Term('b')])))
+    engine.save_kb(str(tmp_path / 'kb'))
+    loaded = LogicalEngine()
+    store = loaded.load_kb(str(tmp_path / 'kb'))
+    assert loaded.load_facts([('b', 'c')], 'edge') == 1
+    store.close()
+    reopened = LogicalEngine()
+    store = reopened.load_kb(str(tmp_path / 'kb'))
+    try:
+        assert values(reopened, Predicate('edge', [var('X'), var('Y')]), 'X', 'Y') == [('a', 'b'), ('b', 'c')]
+    finally:
+        store.close()
@@ -0,0 +1,71 @@
+"""
+Tests for negation as failure and existence checks that stop at the first proof
+اختبارات النفي بالفشل وفحص الوجود مع التوقف عند أول برهان
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import Rule, Predicate, Term, Substitution
+from bayan.ast_nodes import IsExpression, BinaryOp, Variable, Number
+from tests.logic_helpers import var, pred, engine_with
+
+
+def _naturals():
+    """nat(0).  nat(N) :- nat(M), N is M + 1.  (infinitely many answers)"""
+    return engine_with([('nat', 0)],
+                       [Rule(pred('nat', var('N')),
+                             [pred('nat', var('M')),
+                              IsExpression(var('N'), BinaryOp('+', Variable('?M'), Number(1)))])])
+
+
+def _run(code):
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    return interpreter
+
+
+def test_negation_stops_at_first_proof():
+    engine = _naturals()
+    # Both would loop forever if every answer of nat/1 were enumerated
+    assert not engine.has_solution(Predicate('not', [Predicate('nat', [var('X')])]))
+    assert not engine.has_solution(Predicate('\\+', [Predicate('nat', [var('X')])]))
+    assert engine.has_solution(Predicate('nat', [var('X')]))
+
+
+def test_has_solution_keeps_the_caller_substitution():
+    engine = _naturals()
+    substitution = Substitution({'Y': Term(3)})
+    assert engine.has_solution(Predicate('nat', [var('X')]), substitution)
+    assert substitution.bindings == {'Y': Term(3)}
+
+
+def test_negation_syntax_in_rule_bodies():
+    interpreter = _run("""
+hybrid {
+    fact item("a"). fact item("b"). fact item("c").
+    fact sold("a"). fact broken("b").
+    rule left1(?X) :- item(?X), not(sold(?X)).
+    rule left2(?X) :- item(?X), not sold(?X), \\+ broken(?X).
+    rule left3(?X) :- item(?X), \\+(sold(?X)).
+}
+""")
+    engine = interpreter.logical
+    for name, expected in (('left1', ['b', 'c']), ('left2', ['c']), ('left3', ['b', 'c'])):
+        goal = Predicate(name, [var('X')])
+        assert [s.lookup('X').value for s in engine.query(goal)] == expected
+
+
+def test_traditional_call_with_logical_variables_is_an_existence_check():
+    interpreter = _run("""
+hybrid {
+    fact nat(0).
+    rule nat(?N) :- nat(?M), ?N is ?M + 1.
+}
+found = nat(?N)
+""")
+    assert interpreter.traditional.global_env.get('found') is True
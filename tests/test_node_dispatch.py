@@ -0,0 +1,44 @@
+"""
+Tests for the per-class node dispatch tables of the interpreters
+اختبارات جداول توجيه العُقد حسب الصنف في المفسّرات
+"""
+
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.traditional_interpreter import TraditionalInterpreter, BayanRuntimeError
+from bayan.ast_nodes import ASTNode, Number, BinaryOp, Program, Assignment, LogicalFact
+from bayan.logical_engine import Predicate, Term
+
+
+class _Seven(Number):
+    """A node subclass, dispatched like its base class"""
+    def __init__(self):
+        super().__init__(7)
+
+
+def test_handlers_are_resolved_once_per_class():
+    interpreter = TraditionalInterpreter()
+    assert interpreter.interpret(BinaryOp('*', Number(2), Number(3))) == 6
+    handlers = interpreter._dispatch.handlers
+    assert handlers[Number] == interpreter.visit_literal
+    assert handlers[BinaryOp] == interpreter.visit_binary_op
+    assert interpreter.interpret(_Seven()) == 7
+    assert handlers[_Seven] == interpreter.visit_literal
+
+
+def test_unknown_node_is_an_error():
+    with pytest.raises(BayanRuntimeError, match='Unknown node type'):
+        TraditionalInterpreter().interpret(ASTNode())
+
+
+def test_hybrid_interpreter_delegates_other_nodes():
+    interpreter = HybridInterpreter()
+    interpreter.interpret(Program([Assignment('x', Number(4)),
+                                   LogicalFact(Predicate('p', [Term('a')]))]))
+    assert interpreter.traditional.global_env['x'] == 4
+    assert interpreter.logical.has_solution(Predicate('p', [Term('a')]))
+    assert interpreter._dispatch.handlers[Assignment] == interpreter.traditional.interpret
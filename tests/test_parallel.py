@@ -0,0 +1,77 @@
+"""
+Tests for parallel query evaluation across processes
+اختبارات تقييم الاستعلامات بالتوازي عبر العمليات
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+import pytest
+import bayan
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution
+from bayan.ast_nodes import Cut
+from tests.logic_helpers import var, pred, engine_with, closure_rules, answers
+
+
+def _engine():
+    edges = [('edge', f"n{i}", target) for i in range(30) for target in (f"n{i + 1}", f"m{i}")]
+    # Several OR-branches of one predicate
+    routes = [Rule(pred('route', i, var('Y')), [pred('reach', f"n{i * 5}", var('Y'))]) for i in range(6)]
+    return engine_with(edges, closure_rules('reach', 'edge') + routes)
+
+
+def test_query_all_matches_sequential_order():
+    engine = _engine()
+    goals = [Predicate('reach', [Term(f"n{i}"), var('Y')]) for i in range(30)]
+    goals.append(Predicate('reach', [Term('nowhere'), var('Y')]))
+    with engine.parallel(workers=3) as solver:
+        results = solver.query_all(goals)
+    assert [answers(r) for r in results] == [answers(engine.query(g)) for g in goals]
+    assert results[-1] == []
+
+
+def test_or_branches_merge_in_clause_order():
+    engine = _engine()
+    goal = Predicate('route', [var('R'), var('Y')])
+    with engine.parallel(workers=4) as solver:
+        assert len(solver._branches(goal, Substitution())) == 3
+        assert answers(solver.query(goal)) == answers(engine.query(goal))
+
+
+def test_cut_keeps_the_query_whole():
+    engine = _engine()
+    engine.add_rule(Rule(Predicate('pick', [var('Y')]), [Predicate('edge', [Term('n0'), var('Y')]), Cut()]))
+    engine.add_rule(Rule(Predicate('pick', [var('Y')]), [Predicate('edge', [Term('n1'), var('Y')])]))
+    goal = Predicate('pick', [var('Y')])
+    with engine.parallel(workers=2) as solver:
+        assert solver._branches(goal, Substitution()) is None
+        assert answers(solver.query(goal)) == [{'Y': 'n1'}]
+
+
+def test_workers_see_a_snapshot():
+    engine = _engine()
+    goal = Predicate('edge', [Term('n0'), var('Y')])
+    with engine.parallel(workers=2) as solver:
+        engine.add_fact(Fact(Predicate('edge', [Term('n0'), Term('late')])))
+        assert answers(solver.query(goal)) == [{'Y': 'n1'}, {'Y': 'm0'}]
+
+
+def test_spawned_workers_open_a_saved_store(monkeypatch):
+    # Spawned workers import the package afresh: make them find the one this test uses
+    monkeypatch.syspath_prepend(os.path.dirname(os.path.dirname(bayan.__file__)))
+    engine = _engine()
+    goals = [Predicate('route', [Term(i), var('Y')]) for i in range(6)]
+    with engine.parallel(workers=2, start_method='spawn') as solver:
+        assert [answers(r) for r in solver.query_all(goals)] == [answers(engine.query(g)) for g in goals]
+        path = solver._snapshot_path
+        assert os.path.exists(os.path.join(path, 'manifest.json'))
+    assert not os.path.exists(path)
+
+
+def test_worker_errors_reach_the_caller():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('p', [Term(1)])))
+    with engine.parallel(workers=1) as solver:
+        with pytest.raises(ValueError):
+            solver.query_all([Predicate('aggregate_all', [Term('median'), Predicate('p', [var('X')]), var('R')])])
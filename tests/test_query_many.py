@@ -0,0 +1,72 @@
+"""
+Tests for batched queries (query_many)
+اختبارات الاستعلامات المجمّعة (query_many)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution, atom
+from tests.logic_helpers import var, answers
+
+
+def _engine():
+    engine = LogicalEngine()
+    engine.load_facts([(f"e{i}", key, f"{key}{i}") for i in range(10) for key in ('hunger', 'thirst')], 'state')
+    return engine
+
+
+def _expected(engine, goal, bindings):
+    return {tuple(b.values()): answers(engine.query(goal, Substitution({k: atom(v) for k, v in b.items()})))
+            for b in bindings}
+
+
+def _results(results):
+    return {key: answers(solutions) for key, solutions in results.items()}
+
+
+GOAL = Predicate('state', [var('E'), Term('hunger'), var('V')])
+INPUTS = [{'E': 'e3'}, {'E': 'e7'}, {'E': 'e3'}, {'E': 'nobody'}]
+
+
+def test_join_matches_single_queries():
+    engine = _engine()
+    results = engine.query_many(GOAL, INPUTS)
+    assert list(results) == [('e3',), ('e7',), ('nobody',)]
+    assert _results(results) == _expected(engine, GOAL, INPUTS)
+    assert answers(results[('e7',)]) == [{'E': 'e7', 'V': 'hunger7'}]
+    assert results[('nobody',)] == []
+
+
+def test_top_down_when_join_does_not_pay():
+    engine = _engine()
+    engine.join_ratio = 0
+    assert _results(engine.query_many(GOAL, INPUTS)) == _expected(engine, GOAL, INPUTS)
+
+
+def test_several_bound_variables():
+    engine = _engine()
+    goal = Predicate('state', [var('E'), var('K'), var('V')])
+    inputs = [{'K': 'thirst', 'E': 'e1'}, {'K': 'hunger', 'E': 'e2'}, {'K': 'mood', 'E': 'e2'}]
+    results = engine.query_many(goal, inputs)
+    assert list(results) == [('thirst', 'e1'), ('hunger', 'e2'), ('mood', 'e2')]
+    assert _results(results) == _expected(engine, goal, inputs)
+
+
+def test_open_facts_and_rules_fall_back_to_proofs():
+    engine = _engine()
+    # A fact with a variable argument matches every entity, in KB order
+    engine.add_fact(Fact(Predicate('state', [var('Anyone'), Term('hunger'), Term('unknown')])))
+    assert _results(engine.query_many(GOAL, INPUTS)) == _expected(engine, GOAL, INPUTS)
+
+    engine.add_rule(Rule(Predicate('hungry', [var('E')]),
+                         [Predicate('state', [var('E'), Term('hunger'), var('V')])]))
+    goal = Predicate('hungry', [var('E')])
+    results = engine.query_many(goal, INPUTS)
+    assert _results(results) == _expected(engine, goal, INPUTS)
+    assert len(results[('nobody',)]) == 1
+
+
+def test_empty_input():
+    assert _engine().query_many(GOAL, []) == {}
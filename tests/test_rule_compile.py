@@ -0,0 +1,97 @@
+"""
+Tests for rules compiled into closures
+اختبارات القواعد المترجمة إلى دوال مغلقة
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Rule, Predicate, Term
+from bayan.ast_nodes import Cut
+from tests.logic_helpers import var, answers
+
+
+PROGRAM = """
+hybrid {
+    fact parent("ali", "omar").
+    fact parent("omar", "sara").
+    fact parent("omar", "huda").
+    fact age("ali", 60).
+    fact age("omar", 35).
+    fact age("sara", 10).
+    fact age("huda", 8).
+
+    rule grandparent(?X, ?Z) :- parent(?X, ?Y), parent(?Y, ?Z).
+    rule same(?X, ?X) :- age(?X, ?A).
+    rule elder(?X) :- age(?X, ?A), ?A > 30.
+    rule first_child(?P, ?C) :- parent(?P, ?C), !.
+    rule next_age(?X, ?N) :- age(?X, ?A), ?N is ?A + 1.
+}
+"""
+
+
+def _engine(compile_rules):
+    interpreter = HybridInterpreter()
+    interpreter.logical.compile_rules = compile_rules
+    interpreter.interpret(HybridParser(HybridLexer(PROGRAM).tokenize()).parse())
+    engine = interpreter.logical
+    # children(P, L) :- findall(C, parent(P, C), L).
+    engine.add_rule(Rule(Predicate('children', [var('P'), var('L')]),
+                         [Predicate('findall', [var('C'), Predicate('parent', [var('P'), var('C')]),
+                                                var('L')])]))
+    # tagged(X, pair(X, Y)) :- parent(X, Y).  (compound head argument)
+    engine.add_rule(Rule(Predicate('tagged', [var('X'), Predicate('pair', [var('X'), var('Y')])]),
+                         [Predicate('parent', [var('X'), var('Y')])]))
+    return engine
+
+
+GOALS = [
+    Predicate('grandparent', [var('G'), var('C')]),
+    Predicate('grandparent', [Term('ali'), Term('huda')]),
+    Predicate('same', [Term('sara'), var('Y')]),
+    Predicate('same', [Term('sara'), Term('huda')]),
+    Predicate('elder', [var('X')]),
+    Predicate('first_child', [Term('omar'), var('C')]),
+    Predicate('next_age', [Term('sara'), var('N')]),
+    Predicate('children', [Term('omar'), var('L')]),
+    Predicate('tagged', [var('X'), var('P')]),
+    Predicate('tagged', [var('X'), Predicate('pair', [var('X'), Term('sara')])]),
+]
+
+
+def test_compiled_rules_match_interpreted_rules():
+    compiled = _engine(True)
+    interpreted = _engine(False)
+    for goal in GOALS:
+        assert answers(compiled.query(goal)) == answers(interpreted.query(goal)), goal
+
+
+def test_compiled_answers():
+    engine = _engine(True)
+    assert answers(engine.query(GOALS[0])) == [{'G': 'ali', 'C': 'sara'}, {'G': 'ali', 'C': 'huda'}]
+    assert engine.has_solution(GOALS[1])
+    assert answers(engine.query(GOALS[2])) == [{'Y': 'sara'}]
+    assert not engine.has_solution(GOALS[3])
+    assert answers(engine.query(GOALS[5])) == [{'C': 'sara'}]
+    assert engine.query(GOALS[6])[0].lookup('N') == 11
+
+
+def test_rule_is_compiled_when_added():
+    engine = LogicalEngine()
+    rule = Rule(Predicate('p', [var('X')]),
+                [Predicate('q', [var('X')]), Cut(), Predicate('r', [var('X')])])
+    engine.add_rule(rule)
+    template = rule.template
+    assert callable(template.head)
+    assert [kind for kind, _ in template.goals] == ['call', 'cut', 'call']
+    assert template.cut_follows == [True, False, False]
+
+
+def test_solutions_omit_renamed_variables():
+    engine = _engine(True)
+    for solution in engine.query(GOALS[0]):
+        assert all('#' not in name for name in solution.bindings)
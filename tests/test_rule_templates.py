@@ -0,0 +1,71 @@
+"""
+Tests for precompiled rule templates (variable renaming)
+اختبارات قوالب القواعد المترجمة مسبقاً (إعادة تسمية المتغيرات)
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Predicate, Term, RuleTemplate
+from tests.logic_helpers import var, grandparent_rule
+
+
+def test_slots_numbered_when_rule_is_added():
+    engine = LogicalEngine()
+    rule = grandparent_rule()
+    engine.add_rule(rule)
+    assert isinstance(rule.template, RuleTemplate)
+    assert rule.template.var_names == ['X', 'Z', 'Y']
+    assert len(rule.template.new_frame()) == 3
+
+
+def test_fresh_variables_are_unique_per_call():
+    rule = grandparent_rule()
+    template = RuleTemplate(rule)
+    first = template.instantiate(template.body[0], template.new_frame(), 1)
+    second = template.instantiate(template.body[0], template.new_frame(), 2)
+    assert first.args[1] != second.args[1]
+    # The original rule is never modified
+    assert rule.body[0].args[1] == var('Y')
+
+
+def test_rules_shared_between_engines_and_threads():
+    rule = grandparent_rule()
+    engines = []
+    for i in range(4):
+        engine = LogicalEngine()
+        engine.add_fact(Fact(Predicate('parent', [Term(f"a{i}"), Term(f"b{i}")])))
+        engine.add_fact(Fact(Predicate('parent', [Term(f"b{i}"), Term(f"c{i}")])))
+        engine.add_rule(rule)
+        engines.append(engine)
+
+    results = {}
+
+    def run(i):
+        goal = Predicate('grandparent', [Term(f"a{i}"), var('Who')])
+        results[i] = [engines[i].query(goal)[0].lookup('Who').value for _ in range(200)]
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for i in range(4):
+        assert set(results[i]) == {f"c{i}"}
+
+
+def test_is_expression_variables_renamed_with_rule():
+    code = """
+hybrid {
+    rule double(?X, ?Y) :- ?Y is ?X * 2.
+}
+    """
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    goal = Predicate('double', [Term(21), var('Y')])
+    assert interpreter.logical.query(goal)[0].lookup('Y') == 42
@@ -0,0 +1,61 @@
+"""
+Tests for lazy solution streaming in the logical engine
+اختبارات التوليد الكسول للحلول في المحرك المنطقي
+"""
+
+import sys
+import os
+import types
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from tests.logic_helpers import var, pred, engine_with
+
+
+def _infinite_engine():
+    """Engine whose nat/1 has infinitely many solutions"""
+    return engine_with([('nat', 0)], [Rule(pred('nat', var('N')), [pred('nat', var('M'))])])
+
+
+def test_solve_is_a_generator():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('color', [Term('red')])))
+    engine.add_fact(Fact(Predicate('color', [Term('blue')])))
+
+    solutions = engine.solve(Predicate('color', [var('C')]))
+    assert isinstance(solutions, types.GeneratorType)
+    assert next(solutions).lookup('C').value == 'red'
+    assert next(solutions).lookup('C').value == 'blue'
+    assert next(solutions, None) is None
+
+
+def test_first_solution_of_infinite_relation():
+    engine = _infinite_engine()
+    goal = Predicate('nat', [var('X')])
+    assert engine.has_solution(goal)
+    assert engine.first_solution(goal).lookup('X').value == 0
+    assert engine.call_stack == []
+
+
+def test_solve_streams_without_enumerating_all():
+    engine = _infinite_engine()
+    solutions = engine.solve(Predicate('nat', [var('X')]))
+    first_five = [next(solutions) for _ in range(5)]
+    solutions.close()
+    assert len(first_five) == 5
+
+
+def test_not_stops_after_first_solution():
+    engine = _infinite_engine()
+    goal = Predicate('not', [Predicate('nat', [var('X')])])
+    assert engine.query(goal) == []
+
+
+def test_rule_alternatives_do_not_share_bindings():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('p', [Term('a'), Term(1)])))
+    engine.add_rule(Rule(Predicate('p', [var('X'), Term(2)]), []))
+    engine.add_fact(Fact(Predicate('p', [Term('a'), Term(4)])))
+
+    solutions = engine.query(Predicate('p', [Term('a'), var('N')]))
+    assert [s.lookup('N').value for s in solutions] == [1, 2, 4]
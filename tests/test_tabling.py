@@ -0,0 +1,91 @@
+"""
+Tests for tabled (memoized) evaluation of recursive predicates
+اختبارات التقييم المجدول (المحفوظ) للمسندات التعاودية
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.lexer import HybridLexer
+from bayan.parser import HybridParser
+from bayan.hybrid_interpreter import HybridInterpreter
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term
+from tests.logic_helpers import var, engine_with, closure_rules
+
+
+def _left_recursive_engine(edges):
+    """ancestor(X, Y) :- parent(X, Y).  ancestor(X, Y) :- ancestor(X, Z), parent(Z, Y)."""
+    engine = engine_with([('parent', a, b) for a, b in edges],
+                         closure_rules('ancestor', 'parent', left_recursive=True))
+    engine.table('ancestor')
+    return engine
+
+
+def _descendants(engine, who):
+    goal = Predicate('ancestor', [Term(who), var('Y')])
+    return sorted(s.lookup('Y').value for s in engine.query(goal))
+
+
+def test_left_recursion_terminates():
+    engine = _left_recursive_engine([('a', 'b'), ('b', 'c'), ('c', 'd')])
+    assert _descendants(engine, 'a') == ['b', 'c', 'd']
+
+
+def test_cyclic_graph_answers_are_deduplicated():
+    engine = _left_recursive_engine([(i, (i + 1) % 50) for i in range(50)])
+    assert _descendants(engine, 0) == list(range(50))
+    assert engine.tables['ancestor']
+
+
+def test_mutual_recursion():
+    engine = LogicalEngine()
+    engine.table('p')
+    engine.table('q')
+    for a, b in [(1, 2), (2, 3), (3, 1)]:
+        engine.add_fact(Fact(Predicate('e', [Term(a), Term(b)])))
+    engine.add_rule(Rule(Predicate('p', [var('X'), var('Y')]), [Predicate('q', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('p', [var('X'), var('Y')]), [Predicate('e', [var('X'), var('Y')])]))
+    engine.add_rule(Rule(Predicate('q', [var('X'), var('Y')]),
+                         [Predicate('p', [var('X'), var('Z')]), Predicate('e', [var('Z'), var('Y')])]))
+
+    solutions = engine.query(Predicate('q', [var('X'), var('Y')]))
+    pairs = sorted((s.lookup('X').value, s.lookup('Y').value) for s in solutions)
+    assert pairs == [(x, y) for x in (1, 2, 3) for y in (1, 2, 3)]
+
+
+def test_tables_invalidated_by_assert_and_retract():
+    engine = _left_recursive_engine([('a', 'b'), ('b', 'c')])
+    assert _descendants(engine, 'a') == ['b', 'c']
+
+    engine.assertz(Fact(Predicate('parent', [Term('c'), Term('d')])))
+    assert 'ancestor' not in engine.tables
+    assert _descendants(engine, 'a') == ['b', 'c', 'd']
+
+    engine.retract(Predicate('parent', [Term('b'), Term('c')]))
+    assert _descendants(engine, 'a') == ['b']
+
+    # Unrelated predicates leave the tables alone
+    engine.assertz(Fact(Predicate('color', [Term('red')])))
+    assert 'ancestor' in engine.tables
+
+
+def test_table_declaration_in_bayan_source():
+    code = """
+hybrid {
+    table path/2.
+    edge(a, b).
+    edge(b, c).
+    edge(c, a).
+    rule path(?X, ?Y) :- path(?X, ?Z), edge(?Z, ?Y).
+    rule path(?X, ?Y) :- edge(?X, ?Y).
+    table = "still an identifier"
+}
+    """
+    interpreter = HybridInterpreter()
+    interpreter.interpret(HybridParser(HybridLexer(code).tokenize()).parse())
+    assert 'path' in interpreter.logical.tabled
+    assert interpreter.traditional.global_env['table'] == "still an identifier"
+
+    goal = Predicate('path', [Term('a'), var('Y')])
+    assert sorted(s.lookup('Y').value for s in interpreter.logical.query(goal)) == ['a', 'b', 'c']
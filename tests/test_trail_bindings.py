@@ -0,0 +1,71 @@
+"""
+Tests for trail-based variable bindings in the logical engine
+اختبارات الربط القائم على المسار (trail) في المحرك المنطقي
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'bayan'))
+
+from bayan.logical_engine import LogicalEngine, Fact, Rule, Predicate, Term, Substitution
+from tests.logic_helpers import var
+
+
+def test_undo_unbinds_back_to_mark():
+    sub = Substitution()
+    sub.bind('X', Term('a'))
+    mark = sub.mark()
+    sub.bind('Y', Term('b'))
+    sub.bind('Z', var('Y'))
+    sub.undo(mark)
+    assert sub.bindings == {'X': Term('a')}
+    assert sub.trail == ['X']
+
+
+def test_failed_unification_is_undone_by_solver():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('pair', [Term(1), Term(2)])))
+    engine.add_fact(Fact(Predicate('pair', [Term(3), Term(4)])))
+    # pair(?A, ?A) binds ?A while unifying the first argument, then fails
+    assert engine.query(Predicate('pair', [var('A'), var('A')])) == []
+    solutions = engine.query(Predicate('pair', [var('A'), var('B')]))
+    assert [(s.lookup('A').value, s.lookup('B').value) for s in solutions] == [(1, 2), (3, 4)]
+
+
+def test_solutions_are_independent_snapshots():
+    engine = LogicalEngine()
+    for color in ('red', 'green', 'blue'):
+        engine.add_fact(Fact(Predicate('color', [Term(color)])))
+    engine.add_rule(Rule(Predicate('shade', [var('C')]), [Predicate('color', [var('C')])]))
+
+    solutions = list(engine.solve(Predicate('shade', [var('X')])))
+    assert [s.lookup('X').value for s in solutions] == ['red', 'green', 'blue']
+
+
+def test_rule_variable_names_do_not_leak_into_query():
+    engine = LogicalEngine()
+    engine.add_fact(Fact(Predicate('q', [Term(1), Term(2)])))
+    engine.add_rule(Rule(Predicate('p', [var('X'), var('Y')]),
+                         [Predicate('q', [var('X'), var('Y')])]))
+
+    # The query names its variables the other way round from the rule
+    solution = engine.query(Predicate('p', [var('Y'), var('X')]))[0]
+    assert solution.lookup('Y').value == 1
+    assert solution.lookup('X').value == 2
+
+
+def test_deep_recursion_leaves_trail_empty_after_backtracking():
+    engine = LogicalEngine()
+    for i in range(200):
+        engine.add_fact(Fact(Predicate('edge', [Term(i), Term(i + 1)])))
+    engine.add_fact(Fact(Predicate('path', [var('X'), var('X')])))
+    engine.add_rule(Rule(Predicate('path', [var('X'), var('Z')]),
+                         [Predicate('edge', [var('X'), var('Y')]),
+                          Predicate('path', [var('Y'), var('Z')])]))
+
+    store = Substitution()
+    solutions = 0
+    for _ in engine._solve_goal(Predicate('path', [Term(0), Term(200)]), store):
+        solutions += 1
+    assert solutions == 1
+    assert store.bindings == {} and store.trail == []